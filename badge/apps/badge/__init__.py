@@ -5,14 +5,11 @@ sys.path.insert(0, "/system/apps/badge")
 os.chdir("/system/apps/badge")
 
 
-from badgeware import io, brushes, shapes, Image, run, PixelFont, screen, Matrix, file_exists
+from badgeware import io, brushes, shapes, Image, run, PixelFont, screen, Matrix, file_exists, net, jsonstream, httpcache, tasks, text
 import random
 import math
-import network
-from urllib.urequest import urlopen
 import gc
 import sys
-import json
 
 
 phosphor = brushes.color(211, 250, 55, 150)
@@ -21,149 +18,144 @@ faded = brushes.color(235, 245, 255, 100)
 small_font = PixelFont.load("/system/assets/fonts/ark.ppf")
 large_font = PixelFont.load("/system/assets/fonts/absolute.ppf")
 
-WIFI_TIMEOUT = 60
 CONTRIB_URL = "https://github.com/{user}.contribs"
 USER_AVATAR = "https://wsrv.nl/?url=https://github.com/{user}.png&w=75&output=png"
 DETAILS_URL = "https://api.github.com/users/{user}"
 
-WIFI_PASSWORD = None
-WIFI_SSID = None
+# Seconds a downloaded file is trusted before asking GitHub whether it changed
+CACHE_TTL = 3600
+AVATAR_TTL = 24 * 3600
+
+# Download chunk sizes: start small, double while reads come back full
+# (a fast link) and halve when they come back mostly empty
+CHUNK_MIN = 256
+CHUNK_START = 512
+CHUNK_MAX = 4096
+
+# Attempts per download, as long as each one makes some progress
+FETCH_ATTEMPTS = 3
+
 GITHUB_TOKEN = None
 
-wlan = None
 connected = False
-ticks_start = None
 
 
 def message(text):
     print(text)
 
 
-def get_connection_details(user):
-    global WIFI_PASSWORD, WIFI_SSID, GITHUB_TOKEN, GITHUB_USERNAME
+_fetch_buffer = None
 
-    if WIFI_SSID is not None and user.handle is not None:
-        return True
 
-    try:
-        # Prefer a local 'secrets.py' placed at the badge repository root ("/badge/secrets.py")
-        # Insert '/' (root of the badge filesystem) at the front of sys.path so a local
-        # `secrets.py` can be imported on the device. Clean up sys.path afterwards.
-        sys.path.insert(0, "/")
-        try:
-            from secrets import WIFI_PASSWORD, WIFI_SSID, GITHUB_USERNAME, GITHUB_TOKEN
-        finally:
-            # ensure we remove the path we inserted even if import fails
-            try:
-                sys.path.pop(0)
-            except Exception:
-                pass
-    except ImportError as e:
-        # If the user hasn't created a secrets.py file, fall back to None so
-        # the rest of the app can detect missing credentials and show helpful UI.
-        WIFI_PASSWORD = None
-        WIFI_SSID = None
-        GITHUB_USERNAME = None
-        GITHUB_TOKEN = None
-    except Exception as e:
-        WIFI_PASSWORD = None
-        WIFI_SSID = None
-        GITHUB_USERNAME = None
-        GITHUB_TOKEN = None
+def fetch_buffer():
+    """Receive buffer for downloads, allocated once at the largest chunk size."""
+    global _fetch_buffer
+    if _fetch_buffer is None:
+        _fetch_buffer = bytearray(CHUNK_MAX)
+    return _fetch_buffer
 
-    if not WIFI_SSID:
-        return False
 
-    if not GITHUB_USERNAME:
-        return False
+def next_chunk_size(size, received):
+    if received >= size:
+        return min(size * 2, CHUNK_MAX)
+    if received < size // 2:
+        return max(size // 2, CHUNK_MIN)
+    return size
 
-    user.handle = GITHUB_USERNAME
 
-    return True
+def get_connection_details(user):
+    global GITHUB_TOKEN
 
+    if user.handle is not None:
+        return True
 
-def wlan_start():
-    global wlan, ticks_start, connected, WIFI_PASSWORD, WIFI_SSID
+    # WiFi details and GitHub username come from 'secrets.py' at the root of
+    # the badge filesystem; without them the app shows a helpful setup screen.
+    if not net.has_credentials():
+        return False
 
-    if ticks_start is None:
-        ticks_start = io.ticks
+    handle = net.secret("GITHUB_USERNAME")
+    if not handle:
+        return False
 
-    if connected:
-        return True
+    user.handle = handle
+    GITHUB_TOKEN = net.secret("GITHUB_TOKEN")
 
-    if wlan is None:
-        wlan = network.WLAN(network.STA_IF)
-        wlan.active(True)
-        
-        if wlan.isconnected():
-            connected = True
-            return True
-        
-        wlan.connect(WIFI_SSID, WIFI_PASSWORD)
-        print("Connecting to WiFi...")
-
-    connected = wlan.isconnected()
-    
-    if io.ticks - ticks_start < WIFI_TIMEOUT * 1000:
-        if connected:
-            print("WiFi connected!")
-            return True
-    elif not connected:
-        return False
-    
     return True
 
-def async_fetch_to_disk(url, file, force_update=False, timeout_ms=25000):
+
+async def async_fetch_to_disk(url, file, force_update=False, timeout_ms=25000, ttl=CACHE_TTL):
     """
-    Fetch a URL to disk as a generator, yielding between chunks so callers
-    can interleave UI updates. If timeout_ms is provided, abort the fetch
+    Fetch a URL to disk as a background task, pausing between chunks so the
+    badge keeps drawing. If timeout_ms is provided, abort the fetch
     after that many milliseconds have elapsed (based on io.ticks).
-    """
-    if not force_update and file_exists(file):
-        return
 
+    The file doubles as an httpcache entry: it is reused for `ttl` seconds,
+    then revalidated with a conditional request (force_update skips straight
+    to revalidating), and a failed fetch leaves the previous copy in place.
+
+    Whatever arrived before an error or timeout is kept, and the next
+    attempt (straight away if the connection dropped mid-body, otherwise on
+    the next refresh) asks for just the rest with a Range request, so large
+    files get there on a flaky connection instead of restarting each time.
+    """
     start_ticks = io.ticks
-    try:
-        # Prepare headers with authentication if token is available
-        headers = {"User-Agent": "GitHub Universe Badge 2025"}
-        if GITHUB_TOKEN and url.startswith("https://api.github.com"):
-            headers["Authorization"] = f"token {GITHUB_TOKEN}"
-
-        # Grab the data
-        response = urlopen(url, headers=headers)
-        data = bytearray(512)
-        total = 0
-        with open(file, "wb") as f:
+
+    # Prepare headers with authentication if token is available
+    headers = {"User-Agent": "GitHub Universe Badge 2025"}
+    if GITHUB_TOKEN and url.startswith("https://api.github.com"):
+        headers["Authorization"] = f"token {GITHUB_TOKEN}"
+
+    view = memoryview(fetch_buffer())
+    size = CHUNK_START
+    for attempt in range(1, FETCH_ATTEMPTS + 1):
+        response = None
+        received = 0
+        try:
+            response = httpcache.urlopen(url, headers=headers, ttl=ttl, path=file,
+                                         refresh=force_update, resume=True)
+            if response.cached:
+                message(f"Using cached {file}{' (stale)' if response.stale else ''}")
+                return
+            if response.offset:
+                message(f"Resuming {file} from {response.offset} bytes")
+
+            # Stream the body through the cache (which writes it to `file`)
+            total = response.offset
             while True:
                 # enforce timeout if requested
                 if timeout_ms is not None and (io.ticks - start_ticks) > timeout_ms:
                     raise TimeoutError(f"Fetch timed out after {timeout_ms} ms")
 
-                if (length := response.readinto(data)) == 0:
+                if (length := response.readinto(view[:size])) == 0:
                     break
+                received += length
                 total += length
                 message(f"Fetched {total} bytes")
-                f.write(data[:length])
-                yield
-        del data
-        del response
-    except Exception as e:
-        # Clean up a partial file if present
-        try:
-            if file_exists(file):
-                os.remove(file)
-        except Exception:
-            pass
-        # Wrap timeout specifically so callers can react differently if needed
-        if isinstance(e, TimeoutError):
-            raise
-        raise RuntimeError(f"Fetch from {url} to {file} failed. {e}") from e
+                size = next_chunk_size(size, length)
+                await tasks.pause()
+            return
+        except Exception as e:
+            # Wrap timeout specifically so callers can react differently if needed
+            if isinstance(e, TimeoutError):
+                raise
+            # a connection that dropped mid-body is worth resuming right away
+            if received and attempt < FETCH_ATTEMPTS:
+                message(f"Fetch of {file} interrupted ({e}), resuming")
+                size = CHUNK_START
+                continue
+            raise RuntimeError(f"Fetch from {url} to {file} failed. {e}") from e
+        finally:
+            # keeps a partial download for resuming; `file` itself is only
+            # replaced once the whole body has arrived
+            if response is not None:
+                response.close()
 
 
-def get_user_data(user, force_update=False):
+async def get_user_data(user, force_update=False):
     message(f"Getting user data for {user.handle}...")
     try:
-        yield from async_fetch_to_disk(DETAILS_URL.format(user=user.handle), "/user_data.json", force_update)
+        await async_fetch_to_disk(DETAILS_URL.format(user=user.handle), "/user_data.json", force_update)
     except Exception as e:
         # Check if it's a rate limit error
         error_msg = str(e).lower()
@@ -183,7 +175,8 @@ def get_user_data(user, force_update=False):
             return
     
     try:
-        r = json.loads(open("/user_data.json", "r").read())
+        # The GitHub user document is mostly URLs we never show
+        r = jsonstream.extract(open("/user_data.json", "rb"), ["name", "login", "followers", "public_repos"])
         user.name = r.get("name", user.handle) # Fallback to handle if user does not have a name
         user.handle = r.get("login", "Unknown Handle")
         user.followers = r.get("followers", 0)
@@ -197,13 +190,13 @@ def get_user_data(user, force_update=False):
         user.repos = 0
 
 
-def get_contrib_data(user, force_update=False):
+async def get_contrib_data(user, force_update=False):
     message(f"Getting contribution data for {user.handle}...")
     # Attempt the network fetch, but handle any network errors so the UI
     # doesn't get stuck if the endpoint is unreachable or returns invalid data.
     try:
         # 15 second timeout for contribution fetch to avoid blocking forever
-        yield from async_fetch_to_disk(CONTRIB_URL.format(user=user.handle), "/contrib_data.json", force_update, timeout_ms=15000)
+        await async_fetch_to_disk(CONTRIB_URL.format(user=user.handle), "/contrib_data.json", force_update, timeout_ms=15000)
     except TimeoutError as e:
         message(f"Contrib fetch timed out: {e}")
         user.contribs = 0
@@ -216,55 +209,55 @@ def get_contrib_data(user, force_update=False):
         user.contribution_data = [[0 for _ in range(53)] for _ in range(7)]
         return
 
-    try:
-        r = json.loads(open("/contrib_data.json", "r").read())
-    except Exception as e:
-        message(f"Failed to parse contrib JSON: {e}")
-        user.contribs = 0
-        user.contribution_data = [[0 for _ in range(53)] for _ in range(7)]
-        return
-
-    # Safely extract expected fields from the JSON, using defaults if missing.
-    total = r.get("total_contributions")
-    weeks = r.get("weeks") or []
-
-    # Build an empty 7x53 grid and only populate up to available weeks
-    max_weeks = min(len(weeks), 53)
+    # Build an empty 7x53 grid and only populate the weeks present in the file
     user.contribution_data = [[0 for _ in range(53)] for _ in range(7)]
+    computed = [0]
 
-    # Populate grid and compute total if missing or zero
-    computed_total = 0
-    for w in range(max_weeks):
-        week = weeks[w] or {}
-        days = week.get("contribution_days") or []
-        for d in range(min(len(days), 7)):
-            day = days[d] or {}
-            # contribution level (for color) and count (for totals)
-            level = day.get("level", 0)
-            count = day.get("count", 0)
+    def on_day(name, path, value):
+        # path is ("weeks", w, "contribution_days", d, "level" | "count")
+        w, d = int(path[1]), int(path[3])
+        if w >= 53 or d >= 7:
+            return
+        if name.endswith("level"):
             # ensure level is a valid index into User.levels
             try:
-                lvl_index = int(level)
+                lvl_index = int(value)
                 if lvl_index < 0 or lvl_index >= len(User.levels):
                     lvl_index = 0
             except Exception:
                 lvl_index = 0
             user.contribution_data[d][w] = lvl_index
-            computed_total += int(count)
+        else:
+            computed[0] += int(value or 0)
+
+    # Stream the days out of the file rather than decoding every date string
+    try:
+        r = jsonstream.extract(open("/contrib_data.json", "rb"), [
+            "total_contributions",
+            "weeks.*.contribution_days.*.level",
+            "weeks.*.contribution_days.*.count",
+        ], callback=on_day)
+    except Exception as e:
+        message(f"Failed to parse contrib JSON: {e}")
+        user.contribs = 0
+        user.contribution_data = [[0 for _ in range(53)] for _ in range(7)]
+        return
 
+    # Use the computed total if it is missing or zero
+    total = r.get("total_contributions")
     if total is None or total == 0:
-        user.contribs = computed_total
+        user.contribs = computed[0]
     else:
         user.contribs = int(total)
     del r
     gc.collect()
 
 
-def get_avatar(user, force_update=False):
+async def get_avatar(user, force_update=False):
     message(f"Getting avatar for {user.handle}...")
     avatar_path = "/avatar.png"
     try:
-        yield from async_fetch_to_disk(USER_AVATAR.format(user=user.handle), avatar_path, force_update)
+        await async_fetch_to_disk(USER_AVATAR.format(user=user.handle), avatar_path, force_update, ttl=AVATAR_TTL)
         # Verify file exists before loading
         if file_exists(avatar_path):
             user.avatar = Image.load(avatar_path)
@@ -309,6 +302,9 @@ class User:
         self.update()
 
     def update(self, force_update=False):
+        # drop any fetch still running for the previous data
+        if getattr(self, "_task", None):
+            self._task.cancel()
         self.name = None
         self.followers = None
         self.contribs = None
@@ -362,37 +358,29 @@ class User:
             if not self.name:
                 handle = "fetching user data..."
                 if not self._task:
-                    self._task = get_user_data(self, self._force_update)
+                    self._task = tasks.spawn(get_user_data(self, self._force_update))
             elif self.contribs is None:
                 handle = "fetching contribs..."
                 if not self._task:
-                    self._task = get_contrib_data(self, self._force_update)
+                    self._task = tasks.spawn(get_contrib_data(self, self._force_update))
             else:
                 handle = "fetching avatar..."
                 if not self._task:
-                    self._task = get_avatar(self, self._force_update)
+                    self._task = tasks.spawn(get_avatar(self, self._force_update))
 
-            try:
-                next(self._task)
-            except StopIteration:
+            # the fetch runs between frames; start the next one once it's done
+            if self._task.done():
                 self._task = None
-            except:
-                self._task = None
-                handle = "fetch error"
 
         if not connected:
             handle = "connecting..."
 
-        w, _ = screen.measure_text(handle)
         screen.brush = white
-        screen.text(handle, 80 - (w / 2), 2)
+        center_text(handle, 2, large_font)
 
         # draw name
-        screen.font = small_font
         screen.brush = phosphor
-        name = placeholder_if_none(self.name)
-        w, _ = screen.measure_text(name)
-        screen.text(name, 80 - (w / 2), 16)
+        center_text(placeholder_if_none(self.name), 16, small_font)
 
         # draw statistics
         self.draw_stat("followers", self.followers, 88, 33)
@@ -424,24 +412,19 @@ connected = file_exists("/contrib_data.json") and file_exists("/user_data.json")
 force_update = False
 
 
-def center_text(text, y):
-  w, h = screen.measure_text(text)
-  screen.text(text, 80 - (w / 2), y)
+def center_text(label, y, font):
+  text.draw(text.layout(label, font, 160, align="center"), 0, y)
 
 
-def wrap_text(text, x, y):
-  lines = text.splitlines()
-  for line in lines:
-    _, h = screen.measure_text(line)
-    screen.text(line, x, y)
-    y += h * 0.8
+def wrap_text(label, x, y, font):
+  text.draw(text.layout(label, font, spacing=0.8), x, y)
 
 
 # tell the user where to fill in their details
 def no_secrets_error():
   screen.font = large_font
   screen.brush = white
-  center_text("Missing Details!", 5)
+  center_text("Missing Details!", 5, large_font)
 
   screen.text("1:", 10, 23)
   screen.text("2:", 10, 55)
@@ -449,29 +432,29 @@ def no_secrets_error():
 
   screen.brush = phosphor
   screen.font = small_font
-  wrap_text("""Put your badge into\ndisk mode (tap\nRESET twice)""", 30, 24)
+  wrap_text("""Put your badge into\ndisk mode (tap\nRESET twice)""", 30, 24, small_font)
 
-  wrap_text("""Edit 'secrets.py' to\nset WiFi details and\nGitHub username.""", 30, 56)
+  wrap_text("""Edit 'secrets.py' to\nset WiFi details and\nGitHub username.""", 30, 56, small_font)
 
-  wrap_text("""Reload to see your\nsweet sweet stats!""", 30, 88)
+  wrap_text("""Reload to see your\nsweet sweet stats!""", 30, 88, small_font)
 
 
 # tell the user that the connection failed :-(
 def connection_error():
   screen.font = large_font
   screen.brush = white
-  center_text("Connection Failed!", 5)
+  center_text("Connection Failed!", 5, large_font)
 
   screen.text("1:", 10, 63)
   screen.text("2:", 10, 95)
 
   screen.brush = phosphor
   screen.font = small_font
-  wrap_text("""Could not connect\nto the WiFi network.\n\n:-(""", 16, 20)
+  wrap_text("""Could not connect\nto the WiFi network.\n\n:-(""", 16, 20, small_font)
 
-  wrap_text("""Edit 'secrets.py' to\nset WiFi details and\nGitHub username.""", 30, 65)
+  wrap_text("""Edit 'secrets.py' to\nset WiFi details and\nGitHub username.""", 30, 65, small_font)
 
-  wrap_text("""Reload to see your\nsweet sweet stats!""", 30, 96)
+  wrap_text("""Reload to see your\nsweet sweet stats!""", 30, 96, small_font)
 
 
 def update():
@@ -487,7 +470,9 @@ def update():
         user.update(True)
 
     if get_connection_details(user):
-        if wlan_start():
+        if not connected:
+            connected = net.connect()
+        if not net.failed():
             user.draw(connected)
         else:  # Connection Failed
             connection_error()
@@ -1,7 +1,7 @@
 import sys
 import os
 
-from badgeware import screen, PixelFont, shapes, brushes, io, run
+from badgeware import screen, PixelFont, shapes, brushes, io, run, collide, pool
 import random
 
 # GitHub contribution graph colors (dark mode)
@@ -51,15 +51,19 @@ class GameState:
     WIN = 4
 
 class Brick:
-    def __init__(self, x, y, color):
+    # made once by the brick pool and reset for every level
+    __slots__ = ("x", "y", "color", "brush", "alive", "active")
+    
+    def reset(self, x, y, color):
         self.x = x
         self.y = y
         self.color = color
+        self.brush = brushes.color(*color)
         self.alive = True
     
     def draw(self):
         if self.alive:
-            screen.brush = brushes.color(*self.color)
+            screen.brush = self.brush
             screen.draw(shapes.rectangle(self.x, self.y, BRICK_WIDTH, BRICK_HEIGHT))
     
     def get_bounds(self):
@@ -73,18 +77,19 @@ class Paddle:
     def find_target_brick(self, bricks):
         """Find the brightest green brick (target) for optimized play."""
         brightest_green = COMMIT_COLORS[-1]  # (86, 211, 100) - brightest green
-        green_bricks = [b for b in bricks if b.alive and b.color == brightest_green]
-        
-        if green_bricks:
-            # Return leftmost bright green brick (systematic approach)
-            return min(green_bricks, key=lambda b: (b.x, b.y))
-        
-        # No bright green bricks, target any alive brick
-        alive_bricks = [b for b in bricks if b.alive]
-        if alive_bricks:
-            return min(alive_bricks, key=lambda b: (b.x, b.y))
-        
-        return None
+        # Leftmost bright green brick (systematic approach), else the leftmost
+        # alive brick; one pass, without building lists every frame
+        green = None
+        leftmost = None
+        for b in bricks:
+            if not b.alive:
+                continue
+            if leftmost is None or b.x < leftmost.x or (b.x == leftmost.x and b.y < leftmost.y):
+                leftmost = b
+            if b.color == brightest_green:
+                if green is None or b.x < green.x or (b.x == green.x and b.y < green.y):
+                    green = b
+        return green if green is not None else leftmost
     
     def update(self, ball=None, auto_play=False, bricks=None):
         # Check for manual input - returns True if player is taking control
@@ -162,6 +167,8 @@ class Paddle:
 
 class Ball:
     def __init__(self):
+        self.box = [0, 0, BALL_SIZE, BALL_SIZE]   # reused for the brick queries
+        self.hits = []
         self.reset()
     
     def reset(self):
@@ -193,7 +200,7 @@ class Ball:
             self.x = max(0, min(self.x, SCREEN_WIDTH - BALL_SIZE))
         
         # Top collision - bounce at brick level if all bricks cleared
-        bricks_remaining = any(brick.alive for brick in bricks)
+        bricks_remaining = len(brick_grid) > 0
         ceiling = 0 if bricks_remaining else BRICK_OFFSET_Y
         
         if self.y <= ceiling:
@@ -225,34 +232,31 @@ class Ball:
                 if auto_play and abs(self.vx) < 1:
                     self.vx = BALL_SPEED if ball_center > paddle_center else -BALL_SPEED
         
-        # Brick collisions
-        for brick in bricks:
-            if not brick.alive:
-                continue
+        # Brick collisions: only the bricks near the ball, top row first
+        self.box[0] = self.x
+        self.box[1] = self.y
+        brick = None
+        for b in brick_grid.query(self.box, self.hits):
+            if brick is None or b.y < brick.y or (b.y == brick.y and b.x < brick.x):
+                brick = b
+        if brick is not None:
+            brick.alive = False
+            brick_grid.remove(brick)
             
+            # Determine bounce direction
             brick_bounds = brick.get_bounds()
-            if (self.x + BALL_SIZE >= brick_bounds[0] and
-                self.x <= brick_bounds[2] and
-                self.y + BALL_SIZE >= brick_bounds[1] and
-                self.y <= brick_bounds[3]):
-                
-                brick.alive = False
-                
-                # Determine bounce direction
-                ball_center_x = self.x + BALL_SIZE // 2
-                ball_center_y = self.y + BALL_SIZE // 2
-                brick_center_x = (brick_bounds[0] + brick_bounds[2]) // 2
-                brick_center_y = (brick_bounds[1] + brick_bounds[3]) // 2
-                
-                dx = abs(ball_center_x - brick_center_x)
-                dy = abs(ball_center_y - brick_center_y)
-                
-                if dx > dy:
-                    self.vx = -self.vx
-                else:
-                    self.vy = -self.vy
-                
-                return True
+            ball_center_x = self.x + BALL_SIZE // 2
+            ball_center_y = self.y + BALL_SIZE // 2
+            brick_center_x = (brick_bounds[0] + brick_bounds[2]) // 2
+            brick_center_y = (brick_bounds[1] + brick_bounds[3]) // 2
+            
+            dx = abs(ball_center_x - brick_center_x)
+            dy = abs(ball_center_y - brick_center_y)
+            
+            if dx > dy:
+                self.vx = -self.vx
+            else:
+                self.vy = -self.vy
         
         return True
     
@@ -261,7 +265,9 @@ class Ball:
         screen.draw(shapes.rectangle(int(self.x), int(self.y), BALL_SIZE, BALL_SIZE))
 
 # Initialize game objects
-bricks = []
+brick_pool = pool.Pool(Brick, BRICK_ROWS * BRICK_COLS)
+bricks = brick_pool.active  # this level's bricks, standing or not
+brick_grid = collide.SpatialHash(UNIT * 2)  # the bricks still standing
 paddle = Paddle()
 ball = Ball()
 state = GameState.INTRO
@@ -270,14 +276,16 @@ score = 0
 auto_play = False
 
 def create_bricks():
-    global bricks
-    bricks = []
+    brick_pool.clear()
+    brick_grid.clear()
     for row in range(BRICK_ROWS):
         for col in range(BRICK_COLS):
             x = BRICK_OFFSET_X + (col * UNIT)
             y = BRICK_OFFSET_Y + (row * UNIT)
             color = random.choice(COMMIT_COLORS)
-            bricks.append(Brick(x, y, color))
+            brick = brick_pool.acquire()
+            brick.reset(x, y, color)
+            brick_grid.insert(brick, (x, y, BRICK_WIDTH, BRICK_HEIGHT))
 
 def update():
     global state, lives, score
@@ -373,7 +381,7 @@ def play():
                 ball.reset()
     
     # Check for win
-    if all(not brick.alive for brick in bricks):
+    if not len(brick_grid):
         if auto_play:
             # Auto-restart: reset game with auto mode still enabled
             score = 0
@@ -385,7 +393,7 @@ def play():
             state = GameState.WIN
     
     # Count score
-    score = sum(1 for brick in bricks if not brick.alive)
+    score = len(bricks) - len(brick_grid)
     
     # Draw game objects
     for brick in bricks:
@@ -1,6 +1,11 @@
-import random
+import sys
+import os
+
+sys.path.insert(0, "/system/apps/connect4")
+os.chdir("/system/apps/connect4")
 
 from badgeware import screen, PixelFont, shapes, brushes, io, run
+import engine
 
 # Board geometry
 COLS = 7
@@ -41,8 +46,9 @@ board_shape = shapes.rounded_rectangle(
     BOARD_LEFT - 6, BOARD_TOP - 6, BOARD_WIDTH + 12, BOARD_HEIGHT + 12, 6
 )
 
-DIRECTIONS = [(1, 0), (0, 1), (1, 1), (1, -1)]
 AI_DELAY = 600  # ms delay for a more natural CPU turn
+AI_THINK_TIME = 1500  # ms the CPU may search before it must move
+AI_FRAME_BUDGET = 12  # ms of searching per frame, so the screen keeps animating
 
 
 class GameState:
@@ -52,18 +58,23 @@ class GameState:
     GAME_OVER = 3
 
 
-board = [[0 for _ in range(COLS)] for _ in range(ROWS)]
+position = engine.Position()
+table = engine.Table()  # transposition table, kept across CPU turns
+search = None
 state = GameState.INTRO
 selected_col = COLS // 2
 message = "Press B to play"
 winner = 0
 winning_cells = []
 ai_ready_time = 0
+ai_deadline = 0
 
 
 def reset_game():
-    global board, selected_col, state, message, winner, winning_cells, ai_ready_time
-    board = [[0 for _ in range(COLS)] for _ in range(ROWS)]
+    global position, search, selected_col, state, message, winner, winning_cells, ai_ready_time
+    position = engine.Position()
+    table.clear()
+    search = None
     selected_col = COLS // 2
     state = GameState.PLAYER_TURN
     message = "Your turn"
@@ -72,110 +83,22 @@ def reset_game():
     ai_ready_time = 0
 
 
-def available_columns():
-    return [col for col in range(COLS) if board[0][col] == 0]
-
-
-def get_available_row(col):
-    for row in range(ROWS - 1, -1, -1):
-        if board[row][col] == 0:
-            return row
-    return None
-
-
-def drop_piece(col, player):
-    row = get_available_row(col)
-    if row is None:
+def drop_piece(col):
+    if not position.can_play(col):
         return None
-    board[row][col] = player
-    return row
-
-
-def find_connect_four(player):
-    for row in range(ROWS):
-        for col in range(COLS):
-            if board[row][col] != player:
-                continue
-            for dx, dy in DIRECTIONS:
-                cells = []
-                for step in range(4):
-                    r = row + dy * step
-                    c = col + dx * step
-                    if 0 <= r < ROWS and 0 <= c < COLS and board[r][c] == player:
-                        cells.append((r, c))
-                    else:
-                        break
-                if len(cells) == 4:
-                    return cells
-    return None
-
-
-def find_open_three(player):
-    for row in range(ROWS):
-        for col in range(COLS):
-            if board[row][col] != player:
-                continue
-            for dx, dy in DIRECTIONS:
-                cells = []
-                for step in range(4):
-                    r = row + dy * step
-                    c = col + dx * step
-                    if 0 <= r < ROWS and 0 <= c < COLS and board[r][c] == player:
-                        cells.append((r, c))
-                    else:
-                        break
-                if len(cells) == 3:
-                    return is_extensible(cells)
-    return None
-
-
-def is_extensible(cells):
-    (r1,c1) = cells[0]
-    (r2,c2) = cells[-1]
-    if r1 < r2 and c1 == c2:
-        # same column vertical
-        (dx,dy) = DIRECTIONS[1]
-        if r2 < ROWS-1 and board[r1+dy][c1] == 0:
-            return c1
-    elif r1 == r2 and c1 < c2:
-        # same row, so it's horizontal
-        (dx,dy) = DIRECTIONS[0]
-        if c1>0 and board[r1][c1-dx] == 0:
-            return c1-dx
-        elif c2<COLS-1 and board[r1][c2+dx]==0:
-            return c2+dx
-    elif r1 < r2 and c1 < c2:
-        #up to the right
-        (dx,dy) = DIRECTIONS[2]
-        if c1>0 and r1>0 and board[r1-dy][c1-dx]==0:
-            return c1-dx
-        if c2<COLS-1 and r2 < ROWS-1 and board[r2+dy][c2+dx]==0:
-            return c2+dx
-    elif r1 < r2 and c1 < c2:
-        # down to the right
-        (dx,dy) = DIRECTIONS[3]
-        if c2<COLS-1 and r2 >0 and board[r2+dy][c2-dx]==0:
-            return c2-dx
-        if c1>0 and r1<ROWS-1 and board[r1-dy][c1+dx]==0:
-            return c1+dx
-    else:
-        return None
-
-
-def board_full():
-    return all(board[0][col] != 0 for col in range(COLS))
+    return position.play(col)
 
 
 def conclude_move(player):
     global state, winner, winning_cells, message
-    cells = find_connect_four(player)
+    cells = position.four(player - 1)
     if cells:
         winning_cells[:] = cells
         winner = player
         state = GameState.GAME_OVER
         message = "You win!" if player == 1 else "Computer wins"
         return True
-    if board_full():
+    if position.full():
         winner = 0
         state = GameState.GAME_OVER
         message = "It's a draw"
@@ -191,85 +114,45 @@ def handle_player_input():
         selected_col = (selected_col + 1) % COLS
 
     if (io.BUTTON_B in io.pressed) or (io.BUTTON_DOWN in io.pressed):
-        row = drop_piece(selected_col, 1)
+        row = drop_piece(selected_col)
         if row is None:
             message = "Column full"
             return
         if conclude_move(1):
             return
-        state = GameState.COMPUTER_TURN
-        ai_ready_time = io.ticks + AI_DELAY
-        message = "Computer thinking..."
+        start_computer_turn()
+
+
+def start_computer_turn():
+    global state, message, search, ai_ready_time, ai_deadline
+    state = GameState.COMPUTER_TURN
+    ai_ready_time = io.ticks + AI_DELAY
+    ai_deadline = io.ticks + AI_THINK_TIME
+    message = "Computer thinking..."
+    search = engine.Search(position, table=table)
 
 
 def computer_turn():
-    global state, message
-    if io.ticks < ai_ready_time:
+    global state, message, search
+    # Search a slice per frame, deeper each time, until it has looked as far
+    # as it can or its time is up; the move is never made before AI_DELAY
+    if not search.done and io.ticks < ai_deadline:
+        search.run(AI_FRAME_BUDGET)
+    if io.ticks < ai_ready_time or (not search.done and io.ticks < ai_deadline):
         return
-    col = choose_ai_column()
+    col = search.best
+    search = None
     if col is None:
         state = GameState.GAME_OVER
         message = "It's a draw"
         return
-    drop_piece(col, 2)
+    drop_piece(col)
     if conclude_move(2):
         return
     state = GameState.PLAYER_TURN
     message = "Your turn"
 
 
-def choose_ai_column():
-    columns = available_columns()
-    if not columns:
-        return None
-
-    # Winning move
-    for col in columns:
-        row = get_available_row(col)
-        board[row][col] = 2
-        win = find_connect_four(2)
-        board[row][col] = 0
-        if win:
-            return col
-
-    # Block player
-    for col in columns:
-        row = get_available_row(col)
-        board[row][col] = 1
-        win = find_connect_four(1)
-        board[row][col] = 0
-        if win:
-            return col
-
-    # extend open three
-    for col in columns:
-        row = get_available_row(col)
-        board[row][col] = 2
-        win = find_open_three(2)
-        board[row][col] = 0
-        if win:
-            return col
-
-    # Block open three
-    for col in columns:
-        row = get_available_row(col)
-        board[row][col] = 1
-        win = find_open_three(1)
-        board[row][col] = 0
-        if win:
-            return col
-
-
-    center = COLS // 2
-    if center in columns:
-        return center
-
-    columns.sort(key=lambda c: abs(center - c))
-    best_distance = abs(center - columns[0])
-    best_options = [c for c in columns if abs(center - c) == best_distance]
-    return random.choice(best_options)
-
-
 def draw_board():
     screen.brush = BOARD_BRUSH
     screen.draw(board_shape)
@@ -278,7 +161,7 @@ def draw_board():
         for col in range(COLS):
             cx = BOARD_LEFT + col * CELL_SIZE + CELL_SIZE // 2
             cy = BOARD_TOP + row * CELL_SIZE + CELL_SIZE // 2
-            occupant = board[row][col]
+            occupant = position.owner(row, col)
             if occupant == 1:
                 screen.brush = PLAYER_BRUSH
             elif occupant == 2:
@@ -300,7 +183,10 @@ def draw_selector():
         active_brush = SELECTOR_CPU_BRUSH
     else:
         active_brush = SELECTOR_PLAYER_BRUSH
-    x = BOARD_LEFT + selected_col * CELL_SIZE + 2
+    col = selected_col
+    if state == GameState.COMPUTER_TURN and search is not None and search.best is not None:
+        col = search.best  # the move the CPU favours so far
+    x = BOARD_LEFT + col * CELL_SIZE + 2
     width = CELL_SIZE - 4
     screen.brush = active_brush
     screen.draw(shapes.rectangle(x, BOARD_TOP - 12, width, 4))
@@ -0,0 +1,333 @@
+# Connect Four engine: bitboards and a time-sliced negamax search.
+#
+# A position is two ints, one per player, with a bit per cell laid out a
+# column at a time: bit `col * 7 + row` (row 0 at the bottom) and an
+# always-empty seventh bit on top of each column so shifts between columns
+# never wrap. Four in a row is then a handful of shifts and ANDs, and the
+# empty cells that would complete a line for a player come out of the
+# same trick, which is what the evaluation counts.
+#
+# `Search` runs negamax with alpha-beta pruning and a small transposition
+# table by iterative deepening, depth 1, 2, 3, ... Each `run(budget_ms)`
+# call searches until its budget is spent, so the app can call it once
+# per frame and keep drawing; a depth cut short is started again on the
+# next call, mostly out of the table. `best` is the move of the deepest
+# search that finished.
+#
+# The table lives in flat arrays allocated once (`Table`), 13 bytes a
+# slot: with TABLE_SIZE slots that is about 27 KB for the whole game, and
+# probing or storing an entry allocates nothing. Keys are split in two
+# 25-bit halves so they stay small ints on MicroPython.
+
+from array import array
+
+try:
+    from time import ticks_ms, ticks_add, ticks_diff
+except ImportError:
+    import time
+
+    def ticks_ms():
+        return int(time.monotonic() * 1000)
+
+    def ticks_add(a, b):
+        return a + b
+
+    def ticks_diff(a, b):
+        return a - b
+
+COLS = 7
+ROWS = 6
+STRIDE = ROWS + 1   # bits per column, with the empty guard bit on top
+
+BOTTOM = 0          # the lowest cell of every column
+for _col in range(COLS):
+    BOTTOM |= 1 << (_col * STRIDE)
+BOARD = BOTTOM * ((1 << ROWS) - 1)   # every playable cell
+CENTER = ((1 << ROWS) - 1) << (COLS // 2 * STRIDE)
+
+WIN = 1000          # scores of wins and losses; sooner ones score further from 0
+ORDER = [3, 2, 4, 1, 5, 0, 6]   # centre columns first: better cutoffs
+
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+TABLE_SIZE = 2053   # transposition table entries (prime, for the key modulo)
+KEY_BITS = 25       # keys are below 2 ** 49: stored as two halves of this many bits
+KEY_MASK = (1 << KEY_BITS) - 1
+CHECK_EVERY = 32    # nodes between clock checks
+
+
+def is_win(discs):
+    """True if `discs` hold four in a row."""
+    for shift in (1, STRIDE, STRIDE - 1, STRIDE + 1):
+        pairs = discs & (discs >> shift)
+        if pairs & (pairs >> (2 * shift)):
+            return True
+    return False
+
+
+def winning_cells(discs):
+    """Cells that would complete four in a row for `discs` (taken or not)."""
+    # vertical: three above each other, the cell on top
+    cells = (discs << 1) & (discs << 2) & (discs << 3)
+    for shift in (STRIDE, STRIDE - 1, STRIDE + 1):
+        # horizontal and both diagonals: the gap at either end or in the middle
+        pair = (discs << shift) & (discs << (2 * shift))
+        cells |= pair & (discs << (3 * shift))
+        cells |= pair & (discs >> shift)
+        pair = (discs >> shift) & (discs >> (2 * shift))
+        cells |= pair & (discs << shift)
+        cells |= pair & (discs >> (3 * shift))
+    return cells & BOARD
+
+
+def popcount(bits):
+    count = 0
+    while bits:
+        bits &= bits - 1
+        count += 1
+    return count
+
+
+class Position:
+    """A board as two bitboards; player 0 moves first."""
+
+    def __init__(self):
+        self.discs = [0, 0]
+        self.heights = [col * STRIDE for col in range(COLS)]   # next free bit of each column
+        self.moves = 0
+        self.history = []
+
+    def copy(self):
+        other = Position()
+        other.discs = list(self.discs)
+        other.heights = list(self.heights)
+        other.moves = self.moves
+        other.history = list(self.history)
+        return other
+
+    def to_move(self):
+        return self.moves & 1
+
+    def can_play(self, col):
+        return self.heights[col] < col * STRIDE + ROWS
+
+    def columns(self):
+        return [col for col in ORDER if self.can_play(col)]
+
+    def full(self):
+        return self.moves == COLS * ROWS
+
+    def play(self, col):
+        """Drop the next disc in `col`; returns its row counted from the top."""
+        bit = self.heights[col]
+        self.discs[self.moves & 1] |= 1 << bit
+        self.heights[col] = bit + 1
+        self.moves += 1
+        self.history.append(col)
+        return ROWS - 1 - (bit - col * STRIDE)
+
+    def undo(self):
+        col = self.history.pop()
+        self.moves -= 1
+        self.heights[col] -= 1
+        self.discs[self.moves & 1] ^= 1 << self.heights[col]
+
+    def wins_with(self, col):
+        """True if the player to move completes four by playing `col`."""
+        return is_win(self.discs[self.moves & 1] | (1 << self.heights[col]))
+
+    def owner(self, row, col):
+        """0 for an empty cell, else 1 or 2 for the first or second player; row 0 is the top."""
+        bit = 1 << (col * STRIDE + ROWS - 1 - row)
+        if self.discs[0] & bit:
+            return 1
+        if self.discs[1] & bit:
+            return 2
+        return 0
+
+    def four(self, player):
+        """The (row, col) cells of a four in a row of `player` (0 or 1), or None."""
+        discs = self.discs[player]
+        for shift in (1, STRIDE, STRIDE - 1, STRIDE + 1):
+            pairs = discs & (discs >> shift)
+            starts = pairs & (pairs >> (2 * shift))
+            if starts:
+                bit = 0
+                while not starts & (1 << bit):
+                    bit += 1
+                cells = []
+                for step in range(4):
+                    b = bit + step * shift
+                    cells.append((ROWS - 1 - b % STRIDE, b // STRIDE))
+                return cells
+        return None
+
+    def key(self):
+        # the discs to move plus every occupied cell: unique per position
+        return self.discs[self.moves & 1] + (self.discs[0] | self.discs[1])
+
+    def evaluate(self):
+        """Score for the player to move: open lines to finish and the centre."""
+        me = self.discs[self.moves & 1]
+        them = self.discs[(self.moves & 1) ^ 1]
+        empty = BOARD & ~(me | them)
+        return (4 * (popcount(winning_cells(me) & empty) - popcount(winning_cells(them) & empty))
+                + 2 * (popcount(me & CENTER) - popcount(them & CENTER)))
+
+
+class Table:
+    """Transposition table in preallocated arrays; a slot with depth 0 is empty."""
+
+    def __init__(self, size=TABLE_SIZE):
+        self.size = size
+        zeros = [0] * size
+        self.key_lo = array("I", zeros)
+        self.key_hi = array("I", zeros)
+        self.depth = bytearray(size)
+        self.flag = bytearray(size)
+        self.move = bytearray(size)
+        self.score = array("h", zeros)
+
+    def clear(self):
+        depth = self.depth
+        for slot in range(self.size):
+            depth[slot] = 0
+
+    def store(self, slot, key, depth, flag, score, move):
+        self.key_lo[slot] = key & KEY_MASK
+        self.key_hi[slot] = key >> KEY_BITS
+        self.depth[slot] = depth
+        self.flag[slot] = flag
+        self.score[slot] = score
+        self.move[slot] = move
+
+
+class OutOfTime(Exception):
+    pass
+
+
+class Search:
+    """Iterative deepening negamax for the player to move in `position`."""
+
+    def __init__(self, position, max_depth=COLS * ROWS, table=None):
+        self.position = position.copy()
+        self.root_moves = self.position.moves
+        self.max_depth = min(max_depth, COLS * ROWS - self.position.moves)
+        self.table = table if table is not None else Table()
+        self.depth = 1          # depth being searched
+        self.best = None        # best move of the deepest finished search
+        self.score = 0
+        self.done = False
+        self.nodes = 0
+        self.deadline = None
+        columns = self.position.columns()
+        if not columns:
+            self.done = True
+        else:
+            self.best = columns[0]
+            for col in columns:
+                if self.position.wins_with(col):
+                    self.best = col
+                    self.score = WIN
+                    self.done = True
+                    break
+
+    def run(self, budget_ms=None):
+        """Search for up to `budget_ms` (None: to the end); True once finished."""
+        self.deadline = None if budget_ms is None else ticks_add(ticks_ms(), budget_ms)
+        while not self.done:
+            try:
+                score, move = self.root(self.depth)
+            except OutOfTime:
+                while self.position.moves > self.root_moves:
+                    self.position.undo()
+                return False
+            self.best = move
+            self.score = score
+            # a forced result needs no deeper look
+            if self.depth >= self.max_depth or abs(score) >= WIN - COLS * ROWS:
+                self.done = True
+            self.depth += 1
+        return True
+
+    def root(self, depth):
+        position = self.position
+        columns = position.columns()
+        # the previous depth's choice first
+        if self.best in columns:
+            columns.remove(self.best)
+            columns.insert(0, self.best)
+        alpha = -WIN - 1
+        best = columns[0]
+        for col in columns:
+            position.play(col)
+            score = -self.negamax(depth - 1, -WIN - 1, -alpha)
+            position.undo()
+            if score > alpha:
+                alpha = score
+                best = col
+        return alpha, best
+
+    def negamax(self, depth, alpha, beta):
+        self.nodes += 1
+        if self.deadline is not None and self.nodes % CHECK_EVERY == 0:
+            if ticks_diff(ticks_ms(), self.deadline) > 0:
+                raise OutOfTime()
+
+        position = self.position
+        columns = position.columns()
+        if not columns:
+            return 0  # draw
+        # a win now beats anything deeper; sooner wins score higher
+        for col in columns:
+            if position.wins_with(col):
+                return WIN - position.moves
+        if depth <= 0:
+            return position.evaluate()
+
+        table = self.table
+        key = position.key()
+        slot = key % table.size
+        entry_depth = table.depth[slot]
+        first = None
+        if (entry_depth and table.key_lo[slot] == key & KEY_MASK
+                and table.key_hi[slot] == key >> KEY_BITS):
+            flag = table.flag[slot]
+            value = table.score[slot]
+            first = table.move[slot]
+            if entry_depth >= depth:
+                if flag == EXACT:
+                    return value
+                if flag == LOWER and value >= beta:
+                    return value
+                if flag == UPPER and value <= alpha:
+                    return value
+        if first in columns:
+            columns.remove(first)
+            columns.insert(0, first)
+
+        original_alpha = alpha
+        best_score = -WIN - 1
+        best = columns[0]
+        for col in columns:
+            position.play(col)
+            score = -self.negamax(depth - 1, -beta, -alpha)
+            position.undo()
+            if score > best_score:
+                best_score = score
+                best = col
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                break
+
+        if best_score <= original_alpha:
+            flag = UPPER
+        elif best_score >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        table.store(slot, key, depth, flag, best_score, best)
+        return best_score
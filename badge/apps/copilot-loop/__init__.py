@@ -4,8 +4,10 @@ import os
 sys.path.insert(0, "/system/apps/copilot-loop")
 os.chdir("/system/apps/copilot-loop")
 
-from badgeware import Image, screen, run, io
+from badgeware import screen, run, io, frames
 
+# packed by tools/pack_frames.py: most frames only redraw the part that moved
+animation = frames.FrameSequence("frames", prefetch=2, loop=True)
 
 
 frame_index = 1
@@ -26,8 +28,13 @@ def update():
         last_frame_time = io.ticks
         
     # Draw the current frame
-    screen.blit(Image.load(f"frames/frame_{frame_index:04d}.png"), 0, 0)
-    
+    animation.draw(screen, 0, 0, frame_index - 1)
+
+
+def on_exit():
+    animation.close()
+
+
 if __name__ == "__main__":
     run(update)
 
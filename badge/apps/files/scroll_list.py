@@ -1,14 +1,11 @@
-from badgeware import PixelFont, screen, brushes, shapes, io
+from badgeware import PixelFont, screen, brushes, shapes, io, text
 
 small_font = PixelFont.load("/system/assets/fonts/ark.ppf")
-small_char_width = 7
 large_font = PixelFont.load("/system/assets/fonts/absolute.ppf")
 
 SCREEN_WIDTH = 160
 SCREEN_HEIGHT = 120
 
-CHAR_COUNT_WIDTH = SCREEN_WIDTH // small_char_width
-
 ROW_HEIGHT = 10
 
 HOLD_DELAY = 10
@@ -112,12 +109,10 @@ class ScrollList:
     def render_subtitle(self):
         if self.subtitle_text:
             screen.brush = brushes.color(100, 100, 100)
-            screen.font = small_font
-            screen.text(
-                self.subtitle_text[-CHAR_COUNT_WIDTH:],
-                self.padding,
-                self._current_render_y,
-            )
+            # keep the end of long paths, where the current folder is
+            runs = text.layout(self.subtitle_text, small_font, SCREEN_WIDTH - 2 * self.padding,
+                               ellipsis=True, cut="start")
+            text.draw(runs, self.padding, self._current_render_y)
             self._current_render_y += 10
 
     def render_contents(self):
@@ -139,7 +134,7 @@ class ScrollList:
             screen.brush = brushes.color(0, 50, 0)
             screen.draw(shapes.rectangle(0, self._current_render_y, SCREEN_WIDTH, 12))
 
-        screen.font = small_font
         screen.brush = brush
-        screen.text(item, self.padding, self._current_render_y)
+        runs = text.layout(item, small_font, SCREEN_WIDTH - 2 * self.padding, ellipsis=True)
+        text.draw(runs, self.padding, self._current_render_y)
         self._current_render_y += 10
@@ -25,6 +25,7 @@ class TextFileViewer(ScrollList):
     def load_file(self, file_path=None):
         try:
             with open(file_path, "r") as f:
-                return f.readlines()
+                # without line endings, which the layout would take as line breaks
+                return [line.rstrip("\r\n") for line in f.readlines()]
         except Exception as e:
             return [f"Error loading file: {e}"]
@@ -4,13 +4,14 @@ import os
 sys.path.insert(0, "/system/apps/flappy")
 os.chdir("/system/apps/flappy")
 
-from badgeware import screen, Image, PixelFont, SpriteSheet, io, brushes, shapes, run, State
+from badgeware import screen, PixelFont, SpriteSheet, io, brushes, shapes, run, State
+from badgeware import assets
 from mona import Mona
 from obstacle import Obstacle
 
-background = Image.load("assets/background.png")
-grass = Image.load("assets/grass.png")
-cloud = Image.load("assets/cloud.png")
+background = assets.load("assets/background.png")
+grass = assets.load("assets/grass.png")
+cloud = assets.load("assets/cloud.png")
 large_font = PixelFont.load("/system/assets/fonts/ziplock.ppf")
 small_font = PixelFont.load("/system/assets/fonts/nope.ppf")
 ghost = SpriteSheet("/system/assets/mona-sprites/mona-dead.png", 7, 1).animation()
@@ -78,7 +79,7 @@ def intro():
         global new_high_score_achieved
         state = GameState.PLAYING
         new_high_score_achieved = False
-        Obstacle.obstacles = []
+        Obstacle.pool.clear()
         Obstacle.next_spawn_time = io.ticks + 500
         mona = Mona()
 
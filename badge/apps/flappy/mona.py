@@ -1,4 +1,4 @@
-from badgeware import screen, SpriteSheet, io
+from badgeware import screen, SpriteSheet, io, collide
 from obstacle import Obstacle
 
 sprites = SpriteSheet("assets/mona.png", 7, 2)
@@ -46,14 +46,7 @@ class Mona:
             # perform an intersection test between mona's hit box and the hit box
             # of this obstacles top and bottom sections
             for obstacle_bounds in obstacle.bounds():
-                x1 = max(obstacle_bounds[0], mona_bounds[0])
-                y1 = max(obstacle_bounds[1], mona_bounds[1])
-                x2 = min(
-                    obstacle_bounds[0] + obstacle_bounds[2], mona_bounds[0] + mona_bounds[2])
-                y2 = min(
-                    obstacle_bounds[1] + obstacle_bounds[3], mona_bounds[1] + mona_bounds[3])
-
-                if x1 < x2 and y1 < y2:  # true if the two bounds overlap
+                if collide.overlaps(obstacle_bounds, mona_bounds):
                     self.die()
 
             # if we haven't passed this obstacle before but we are past it now then
@@ -1,23 +1,34 @@
 import random
-from badgeware import SpriteSheet, io, screen
+from badgeware import SpriteSheet, io, screen, pool
 
 sprites = SpriteSheet("assets/obstacles.png", 2, 1)
+pipe = sprites.sprite(0, 0)
+spikes = sprites.sprite(1, 0)
 
 
 class Obstacle:
-    # the list of active obstacles
+    __slots__ = ("x", "gap_height", "gap_y", "passed", "active")
+
+    # the obstacles are made once, in a pool; `obstacles` is the list of
+    # active ones and is emptied in place, never replaced
+    pool = None
     obstacles = []
     next_spawn_time = None
 
     def spawn():
-        # create a new obstacle and reset the obstacle spawn timer
-        Obstacle.obstacles.append(Obstacle())
-        Obstacle.next_spawn_time = io.ticks + 1500
+        # hand obstacles that are now off screen back to the pool
+        for o in Obstacle.obstacles:
+            if o.x <= -24:
+                o.active = False
+        Obstacle.pool.sweep()
 
-        # clean up any obstacles that are now off screen and can be removed
-        Obstacle.obstacles = [o for o in Obstacle.obstacles if o.x > -24]
+        # reuse an obstacle and reset the obstacle spawn timer
+        obstacle = Obstacle.pool.acquire()
+        if obstacle:
+            obstacle.reset()
+        Obstacle.next_spawn_time = io.ticks + 1500
 
-    def __init__(self):
+    def reset(self):
         # position the new obstacle off the right hand side of the screen and
         # randomise the height of the gap
         self.x = screen.width
@@ -41,17 +52,21 @@ class Obstacle:
 
     def draw(self):
         # draw the top half off the obstacle
-        screen.scale_blit(sprites.sprite(0, 0), self.x,
+        screen.scale_blit(pipe, self.x,
                           self.gap_y - 72, 24, 24)
-        screen.scale_blit(sprites.sprite(0, 0), self.x,
+        screen.scale_blit(pipe, self.x,
                           self.gap_y - 48, 24, 24)
-        screen.scale_blit(sprites.sprite(1, 0), self.x,
+        screen.scale_blit(spikes, self.x,
                           self.gap_y - 24, 24, 24)  # spikes, yikes!
 
         # draw the bottom half off the obstacle
-        screen.scale_blit(sprites.sprite(1, 0), self.x, self.gap_y +
+        screen.scale_blit(spikes, self.x, self.gap_y +
                           self.gap_height, 24, -24)  # spikes, yikes!
-        screen.scale_blit(sprites.sprite(0, 0), self.x,
+        screen.scale_blit(pipe, self.x,
                           self.gap_y + self.gap_height + 24, 24, -24)
-        screen.scale_blit(sprites.sprite(0, 0), self.x,
+        screen.scale_blit(pipe, self.x,
                           self.gap_y + self.gap_height + 48, 24, -24)
+
+
+Obstacle.pool = pool.Pool(Obstacle, 8)
+Obstacle.obstacles = Obstacle.pool.active
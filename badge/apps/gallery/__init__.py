@@ -5,6 +5,7 @@ sys.path.insert(0, "/system/apps/gallery")
 os.chdir("/system/apps/gallery")
 
 from badgeware import PixelFont, Image, screen, run, io, brushes, shapes
+from badgeware.prefetch import ImagePrefetcher
 
 screen.font = PixelFont.load("/system/assets/fonts/nope.ppf")
 screen.antialias = Image.X2
@@ -34,6 +35,9 @@ ui_hidden = False
 image_changed_at = None
 current_image = None
 
+# decodes the neighbouring images while the current one is shown
+prefetcher = ImagePrefetcher(depth=2)
+
 
 def clamp_index(i):
     return i % len(files)
@@ -52,8 +56,8 @@ def load_image(i):
     filepath = f"images/{filename}"
     
     try:
-        # Load PNG using badgeware Image
-        current_image = Image.load(filepath)
+        # Load PNG using badgeware Image (usually already decoded in the background)
+        current_image = prefetcher.get(filepath)
         error = None
     except OSError as e:
         error = f"File error: {e}"
@@ -62,6 +66,18 @@ def load_image(i):
         error = f"Load failed: {e}"
         current_image = None
 
+    # the next and previous images are the likely next requests
+    prefetcher.prefetch([image_path(i + 1), image_path(i - 1)])
+
+
+def image_path(i):
+    name = files[clamp_index(i)]["name"]
+    return f"images/{name}" if name else None
+
+
+def on_exit():
+    prefetcher.close()
+
 
 # Load first image
 load_image(index)
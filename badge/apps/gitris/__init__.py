@@ -87,7 +87,8 @@ state = {
     "level": 1,          # RELEASE
     "lines": 0,          # MERGES
     "hiscore": 0,
-    "board": None,
+    "board": None,       # colour index per cell, for drawing
+    "rows": None,        # occupancy bitmask per row, for collisions
     "bag": [],
     "curr": None,
     "next": None,
@@ -157,6 +158,26 @@ L = [
 ]
 SHAPES = [I, O, T, S, Z, J, L]
 
+# ---------------- Row bitmasks ----------------
+# Each board row is also an int with bit PAD+x set for a taken cell x, and
+# wall bits on both sides so a piece hanging over an edge collides like
+# one hitting a block. Below the field are FLOOR rows that are all wall.
+# A piece rotation is a few (dy, mask) rows with bit dx per cell: shifted
+# by x+PAD and ANDed with the board rows, it collides or it doesn't.
+PAD = 3                                     # wall bits left of column 0
+FLOOR = 4                                   # solid rows below the field
+FULL = (1 << (PAD + GRID_W + 4)) - 1        # every bit: walls and cells
+CELLS = ((1 << GRID_W) - 1) << PAD          # the field's columns
+WALLS = FULL ^ CELLS                        # an empty row
+
+def _row_masks(cells):
+    rows = {}
+    for dx, dy in cells:
+        rows[dy] = rows.get(dy, 0) | (1 << dx)
+    return [(dy, rows[dy]) for dy in sorted(rows)]
+
+PIECE_ROWS = [[_row_masks(rot) for rot in shape] for shape in SHAPES]
+
 KICKS = {  # simple wall-kicks
     (0,1): [(0,0), (-1,0), (-1,-1), (0,2), (-1,2)],
     (1,0): [(0,0), (1,0),  (1,1),   (0,-2),(1,-2)],
@@ -172,6 +193,9 @@ KICKS = {  # simple wall-kicks
 def _new_board():
     return [[0]*GRID_W for _ in range(GRID_H)]
 
+def _new_rows():
+    return [WALLS]*GRID_H + [FULL]*FLOOR
+
 def _refill_bag():
     bag = list(range(len(SHAPES)))
     # Fisher–Yates shuffle using safe _randint
@@ -187,6 +211,8 @@ def _push_conflict_row():
     row = [8]*GRID_W  # 8 = conflict cell (special color)
     row[gap] = 0
     state["board"].append(row)
+    state["rows"].pop(0)
+    state["rows"].insert(GRID_H-1, FULL ^ (1 << (PAD + gap)))
     _toast("Merge conflict! Resolve it.")
 
 def _spawn():
@@ -216,15 +242,24 @@ def _cells_at(x, y, rot, shape_idx=None):
         yield x + dx, y + dy
 
 def _collides(nx, ny, nrot):
-    for cx, cy in _cells_at(nx, ny, nrot):
-        if cx < 0 or cx >= GRID_W or cy >= GRID_H:
+    # further out than PAD columns, every cell of the piece is off the field
+    if nx < -PAD or nx >= GRID_W:
+        return True
+    rows = state["rows"]
+    shift = nx + PAD
+    for dy, mask in PIECE_ROWS[state["curr"]][nrot % 4]:
+        cy = ny + dy
+        if (rows[cy] if cy >= 0 else WALLS) & (mask << shift):
             return True
-        if cy >= 0:
-            v = state["board"][cy][cx]
-            if v: return True
     return False
 
 def _lock_piece():
+    rows = state["rows"]
+    shift = state["x"] + PAD
+    for dy, mask in PIECE_ROWS[state["curr"]][state["rot"]]:
+        cy = state["y"] + dy
+        if 0 <= cy < GRID_H:
+            rows[cy] |= (mask << shift) & CELLS
     for cx, cy in _cells_at(state["x"], state["y"], state["rot"]):
         if 0 <= cy < GRID_H and 0 <= cx < GRID_W:
             state["board"][cy][cx] = state["curr"] + 1
@@ -239,14 +274,15 @@ def _announce_merge(cleared):
     _toast(msg)
 
 def _clear_lines():
-    rows = state["board"]
-    kept = [r for r in rows if not all(r)]  # any zero keeps the row
-    cleared = GRID_H - len(kept)
+    rows = state["rows"]
+    full = [y for y in range(GRID_H) if rows[y] == FULL]
+    cleared = len(full)
     if cleared:
-        # add empty rows up top
-        for _ in range(cleared):
-            kept.insert(0, [0]*GRID_W)
-        state["board"] = kept
+        # drop the full rows and add empty ones up top
+        board = state["board"]
+        for y in full:
+            rows.pop(y); rows.insert(0, WALLS)
+            board.pop(y); board.insert(0, [0]*GRID_W)
         # scoring
         scores = {1:40, 2:100, 3:300, 4:1200}
         state["score"] += scores.get(cleared, 0) * state["level"]
@@ -276,18 +312,26 @@ def _rotate_cw():
     return False
 
 def _hard_drop():
-    while _move(0, 1):
-        pass
+    state["y"] = _ghost_y()
     _lock_piece()
 
 def _ghost_y():
-    gx, gy, gr = state["x"], state["y"], state["rot"]
-    while not _collides(gx, gy+1, gr):
+    # the piece's rows shifted into place once, then tested a row lower at a time
+    gx, gy = state["x"], state["y"]
+    if gx < -PAD or gx >= GRID_W:
+        return gy
+    rows = state["rows"]
+    masks = [(dy, mask << (gx + PAD)) for dy, mask in PIECE_ROWS[state["curr"]][state["rot"]]]
+    while True:
+        for dy, mask in masks:
+            cy = gy + 1 + dy
+            if (rows[cy] if cy >= 0 else WALLS) & mask:
+                return gy
         gy += 1
-    return gy
 
 def _reset_run():
     state["board"] = _new_board()
+    state["rows"] = _new_rows()
     state["bag"] = _refill_bag()
     state["score"] = 0
     state["level"] = 1
@@ -406,7 +450,10 @@ def _draw_grid():
     screen.draw(shapes.rectangle(PF_X-1, PF_Y-1, GRID_W*CELL+2, GRID_H*CELL+2))
 
 def _draw_board():
+    rows = state["rows"]
     for y in range(GRID_H):
+        if rows[y] == WALLS:
+            continue  # nothing in this row
         row = state["board"][y]
         for x in range(GRID_W):
             v = row[x]
@@ -500,4 +547,5 @@ def update():
 # Initialize a fresh board so title renders
 if state["board"] is None:
     state["board"] = _new_board()
+    state["rows"] = _new_rows()
     _reset_run(); _to_title()
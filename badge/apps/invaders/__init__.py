@@ -5,11 +5,29 @@ import random
 sys.path.insert(0, "/system/apps/invaders")
 os.chdir("/system/apps/invaders")
 
-from badgeware import screen, PixelFont, io, brushes, shapes, run
+from badgeware import screen, PixelFont, SpriteSheet, io, brushes, shapes, run
+from badgeware import palette, collide, pool
 
 large_font = PixelFont.load("/system/assets/fonts/ziplock.ppf")
 small_font = PixelFont.load("/system/assets/fonts/nope.ppf")
 
+ALIEN_COLORS = [
+    (255, 50, 50),   # Red
+    (255, 150, 50),  # Orange
+    (255, 255, 50),  # Yellow
+]
+ALIEN_BODY = 1  # palette entry of the body in assets/alien.png
+
+# One copy of the two-frame alien sprite per colour: each copy's palette
+# is recoloured once here, so drawing an alien is a single blit
+alien_sheet = SpriteSheet("assets/alien.png", 2, 1)
+alien_sprites = []
+for alien_color in ALIEN_COLORS:
+    frames = [alien_sheet.sprite(0, 0), alien_sheet.sprite(1, 0)]
+    palette.Palette(frames[0], frames[1:]).swap({ALIEN_BODY: alien_color})
+    alien_sprites.append(frames)
+sprites_recoloured = palette.supported(alien_sprites[0][0])
+
 
 class GameState:
     INTRO = 1
@@ -37,7 +55,7 @@ class Player:
     
     def shoot(self):
         if self.can_shoot():
-            bullets.append(Bullet(self.x + self.width // 2, self.y - 2, -3))
+            fire(self.x + self.width // 2, self.y - 2, -3)
             self.shoot_cooldown = 15
     
     def update(self):
@@ -59,13 +77,14 @@ class Player:
 
 
 class Alien:
-    def __init__(self, x, y, alien_type=0):
+    def __init__(self, x, y, alien_type=0, order=0):
         self.x = x
         self.y = y
         self.width = 10
         self.height = 8
         self.alive = True
         self.alien_type = alien_type
+        self.order = order  # position in the formation, for picking between hits
         
     def draw(self):
         if not self.alive:
@@ -75,13 +94,12 @@ class Alien:
         anim_frame = (io.ticks // 500) % 2
         
         # Different colors for different alien types
-        if self.alien_type == 0:
-            color = (255, 50, 50)  # Red
-        elif self.alien_type == 1:
-            color = (255, 150, 50)  # Orange
-        else:
-            color = (255, 255, 50)  # Yellow
-            
+        color_index = min(self.alien_type, len(ALIEN_COLORS) - 1)
+        if sprites_recoloured:
+            screen.blit(alien_sprites[color_index][anim_frame], self.x, self.y)
+            return
+
+        color = ALIEN_COLORS[color_index]
         screen.brush = brushes.color(*color)
         
         # Body
@@ -105,11 +123,13 @@ class Alien:
 
 
 class Bullet:
-    def __init__(self, x, y, dy):
+    # made once by the bullet pool and reset for every shot
+    __slots__ = ("x", "y", "dy", "active")
+
+    def reset(self, x, y, dy):
         self.x = x
         self.y = y
         self.dy = dy  # negative for player bullets, positive for alien bullets
-        self.active = True
         
     def update(self):
         self.y += self.dy
@@ -155,28 +175,21 @@ class Shield:
                     by = self.y + row * self.block_height
                     screen.draw(shapes.rectangle(bx, by, self.block_width, self.block_height))
     
-    def hit(self, bullet_bounds):
-        """Check if bullet hits shield and damage it"""
-        bx, by, bw, bh = bullet_bounds
-        
+    def add_blocks(self, layer):
+        """File the intact blocks in a collision layer as (shield, row, col)"""
         for row in range(len(self.blocks)):
             for col in range(len(self.blocks[row])):
                 if self.blocks[row][col] == 1:
                     block_x = self.x + col * self.block_width
                     block_y = self.y + row * self.block_height
-                    
-                    if check_collision(bullet_bounds, 
-                                     (block_x, block_y, self.block_width, self.block_height)):
-                        self.blocks[row][col] = 0
-                        return True
-        return False
+                    layer.insert((self, row, col), (block_x, block_y, self.block_width, self.block_height))
 
 
 # Game variables
 state = GameState.INTRO
 player = None
 aliens = []
-bullets = []
+bullets = pool.Pool(Bullet, 12)
 shields = []
 score = 0
 wave = 1
@@ -185,12 +198,38 @@ alien_move_timer = 0
 alien_move_speed = 30
 alien_shoot_timer = 0
 
+# Shield blocks stay put until shot (static layer); the aliens move in
+# the dynamic layer. The boxes and hit lists are reused every frame.
+world = collide.World(8)
+probe = [0, 0, 0, 0]
+target = [0, 0, 0, 0]
+hits = []
+
+
+def first_block(blocks):
+    # leftmost shield, then top row and left column first
+    first = None
+    for block in blocks:
+        if first is None or block[0].x < first[0].x:
+            first = block
+        elif block[0] is first[0] and (block[1] < first[1] or (block[1] == first[1] and block[2] < first[2])):
+            first = block
+    return first
+
+
+def set_box(box, x, y, width, height):
+    box[0] = x
+    box[1] = y
+    box[2] = width
+    box[3] = height
+    return box
+
 
 def init_game():
-    global player, aliens, bullets, shields, score, wave, alien_move_direction, alien_move_speed
+    global player, aliens, shields, score, wave, alien_move_direction, alien_move_speed
     player = Player()
     aliens = []
-    bullets = []
+    bullets.clear()
     shields = []
     score = 0
     wave = 1
@@ -210,19 +249,30 @@ def spawn_aliens():
             alien_type = min(row, 2)  # 0, 1, or 2
             x = 15 + col * 16
             y = 15 + row * 12
-            aliens.append(Alien(x, y, alien_type))
+            aliens.append(Alien(x, y, alien_type, len(aliens)))
+    world.dynamic.clear()
+    place_aliens()
+
+
+def place_aliens():
+    for alien in aliens:
+        if alien.alive:
+            world.dynamic.move(alien, set_box(probe, alien.x, alien.y, alien.width, alien.height))
 
 
 def spawn_shields():
     global shields
     shields = []
+    world.static.clear()
     
     # Create 4 shields
     shield_y = 88
     spacing = 37
     for i in range(4):
         x = 12 + i * spacing
-        shields.append(Shield(x, shield_y))
+        shield = Shield(x, shield_y)
+        shield.add_blocks(world.static)
+        shields.append(shield)
 
 
 def update():
@@ -277,10 +327,8 @@ def play():
     player.update()
     
     # Update bullets
-    for bullet in bullets[:]:
+    for bullet in bullets.active:
         bullet.update()
-        if not bullet.active:
-            bullets.remove(bullet)
     
     # Move aliens
     alien_move_timer += 1
@@ -295,31 +343,34 @@ def play():
         alien_shoot()
     
     # Check bullet-shield collisions
-    for bullet in bullets[:]:
+    for bullet in bullets.active:
         if bullet.active:
-            for shield in shields:
-                if shield.hit(bullet.bounds()):
-                    bullet.active = False
-                    if bullet in bullets:
-                        bullets.remove(bullet)
-                    break
+            block = first_block(world.static.query(set_box(probe, bullet.x, bullet.y, 2, 4), hits))
+            if block is not None:
+                shield, row, col = block
+                shield.blocks[row][col] = 0
+                world.static.remove(block)
+                bullet.active = False
     
     # Check bullet-alien collisions
-    for bullet in bullets[:]:
-        if bullet.dy < 0:  # Player bullet
-            for alien in aliens:
-                if alien.alive and check_collision(bullet.bounds(), alien.bounds()):
-                    alien.alive = False
-                    bullet.active = False
-                    score += (3 - alien.alien_type) * 10
-                    if bullet in bullets:
-                        bullets.remove(bullet)
-                    break
+    for bullet in bullets.active:
+        if bullet.active and bullet.dy < 0:  # Player bullet
+            set_box(probe, bullet.x, bullet.y, 2, 4)
+            alien = None
+            for a in world.dynamic.query(probe, hits):
+                if alien is None or a.order < alien.order:
+                    alien = a
+            if alien is not None:
+                alien.alive = False
+                world.dynamic.remove(alien)
+                bullet.active = False
+                score += (3 - alien.alien_type) * 10
     
     # Check bullet-player collisions
-    for bullet in bullets[:]:
-        if bullet.dy > 0:  # Alien bullet
-            if check_collision(bullet.bounds(), (player.x, player.y, player.width, player.height)):
+    for bullet in bullets.active:
+        if bullet.active and bullet.dy > 0:  # Alien bullet
+            if collide.touching(set_box(probe, bullet.x, bullet.y, 2, 4),
+                                set_box(target, player.x, player.y, player.width, player.height)):
                 state = GameState.GAME_OVER
     
     # Check if aliens reached player
@@ -333,8 +384,11 @@ def play():
         alien_move_speed = max(10, alien_move_speed - 3)
         spawn_aliens()
     
+    # Spent bullets go back to the pool
+    bullets.sweep()
+    
     # Draw everything
-    for bullet in bullets:
+    for bullet in bullets.active:
         bullet.draw()
     
     for alien in aliens:
@@ -374,6 +428,7 @@ def move_aliens():
         for alien in aliens:
             if alien.alive:
                 alien.x += alien_move_direction * 2
+    place_aliens()
 
 
 def alien_shoot():
@@ -381,14 +436,14 @@ def alien_shoot():
     alive_aliens = [a for a in aliens if a.alive]
     if alive_aliens:
         shooter = random.choice(alive_aliens)
-        bullets.append(Bullet(shooter.x + shooter.width // 2, shooter.y + shooter.height, 2))
+        fire(shooter.x + shooter.width // 2, shooter.y + shooter.height, 2)
 
 
-def check_collision(bounds1, bounds2):
-    x1, y1, w1, h1 = bounds1
-    x2, y2, w2, h2 = bounds2
-    
-    return not (x1 + w1 < x2 or x2 + w2 < x1 or y1 + h1 < y2 or y2 + h2 < y1)
+def fire(x, y, dy):
+    # no shot if every pooled bullet is still in flight
+    bullet = bullets.acquire()
+    if bullet:
+        bullet.reset(x, y, dy)
 
 
 def game_over():
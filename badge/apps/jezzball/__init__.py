@@ -3,9 +3,8 @@ JezzBall - Classic area capturing game
 Trap bouncing balls by creating dividers to claim territory
 """
 
-from badgeware import screen, Image, PixelFont, io, brushes, shapes, run
+from badgeware import screen, Image, PixelFont, io, brushes, shapes, run, fastmath
 import random
-import math
 
 # Screen dimensions
 WIDTH = 160
@@ -51,11 +50,169 @@ state = {
     "won_level": False,
     "ready": True,  # Waiting for player to start
     "completed_dividers": [],  # List of completed dividers for collision
-    "claimed_areas": [],  # List of rectangles for claimed areas
+    "area": None,  # AreaMap of the play area's regions
     "cursor_x": 80,  # Cursor position
     "cursor_y": 60,
 }
 
+class AreaMap:
+    """The play area as a grid of GRID_SIZE cells, split into regions by dividers.
+
+    `labels` holds each cell's region number, 0 for cells under a divider.
+    When a divider is finished its cells become walls and only the region
+    it cut through is flood filled again, into one new region per piece,
+    each with its size and the rectangles that cover it. Counting the balls
+    in each region is then one lookup per ball, and a point's region, the
+    claimed percentage and the drawing all come from those tables.
+    """
+
+    def __init__(self):
+        self.cols = PLAY_AREA_WIDTH // GRID_SIZE
+        self.rows = PLAY_AREA_HEIGHT // GRID_SIZE
+        self.labels = bytearray(b"\x01" * (self.cols * self.rows))
+        self.sizes = [0, self.cols * self.rows]
+        self.rects = [[], [(PLAY_AREA_X, PLAY_AREA_Y, PLAY_AREA_WIDTH, PLAY_AREA_HEIGHT)]]
+        self.ball_counts = [0, 0]
+        self.free = []  # region numbers no longer in use
+
+    def cell(self, x, y):
+        """Index of the cell under (x, y), or -1 outside the play area."""
+        col = int(x - PLAY_AREA_X) // GRID_SIZE
+        row = int(y - PLAY_AREA_Y) // GRID_SIZE
+        if x < PLAY_AREA_X or y < PLAY_AREA_Y or col >= self.cols or row >= self.rows:
+            return -1
+        return row * self.cols + col
+
+    def label_at(self, x, y):
+        i = self.cell(x, y)
+        return self.labels[i] if i >= 0 else 0
+
+    def count_balls(self, balls):
+        counts = [0] * len(self.sizes)
+        for ball in balls:
+            counts[self.label_at(ball.x, ball.y)] += 1
+        counts[0] = 0  # not a region
+        self.ball_counts = counts
+
+    def is_claimed(self, x, y):
+        """True if no ball can reach (x, y): a wall, or a region without balls."""
+        label = self.label_at(x, y)
+        return label == 0 or not self.ball_counts[label]
+
+    def claimed_percent(self):
+        total = self.cols * self.rows
+        unclaimed = 0
+        for label, count in enumerate(self.ball_counts):
+            if count:
+                unclaimed += self.sizes[label]
+        return int((total - unclaimed) * 100 / total)
+
+    def near_wall(self, x, y, reach):
+        """True if a divider's cell lies within `reach` pixels of (x, y) on either axis."""
+        steps = reach // GRID_SIZE
+        for d in range(-steps, steps + 1):
+            for i in (self.cell(x + d * GRID_SIZE, y), self.cell(x, y + d * GRID_SIZE)):
+                if i >= 0 and self.labels[i] == 0:
+                    return True
+        return False
+
+    def add_divider(self, divider):
+        """Wall off a finished divider's cells and split the regions it crossed."""
+        if divider.direction == "horizontal":
+            first = self.cell(max(divider.x - divider.left_length, PLAY_AREA_X), divider.y)
+            last = self.cell(min(divider.x + divider.right_length, PLAY_AREA_X + PLAY_AREA_WIDTH - 1), divider.y)
+            step = 1
+        else:
+            first = self.cell(divider.x, max(divider.y - divider.top_length, PLAY_AREA_Y))
+            last = self.cell(divider.x, min(divider.y + divider.bottom_length, PLAY_AREA_Y + PLAY_AREA_HEIGHT - 1))
+            step = self.cols
+        if first < 0 or last < 0:
+            return
+        crossed = set()
+        for i in range(first, last + 1, step):
+            if self.labels[i]:
+                crossed.add(self.labels[i])
+                self.labels[i] = 0
+        for label in crossed:
+            self.split(label)
+
+    def split(self, label):
+        """Give each connected piece of region `label` a region of its own."""
+        labels = self.labels
+        for i in range(len(labels)):
+            if labels[i] == label:
+                new = self.free.pop() if self.free else len(self.sizes)
+                if new == len(self.sizes):
+                    self.sizes.append(0)
+                    self.rects.append([])
+                self.sizes[new] = self.fill(i, label, new)
+                self.rects[new] = self.cover(new)
+        self.sizes[label] = 0
+        self.rects[label] = []
+        self.free.append(label)
+
+    def fill(self, start, old, new):
+        """Scanline flood fill of the `old` cells joined to `start`; returns their count."""
+        labels, cols = self.labels, self.cols
+        filled = 0
+        stack = [start]
+        while stack:
+            i = stack.pop()
+            if labels[i] != old:
+                continue
+            # the whole run of the row this cell is in
+            row_start = i - i % cols
+            row_end = row_start + cols - 1
+            left = i
+            while left > row_start and labels[left - 1] == old:
+                left -= 1
+            right = i
+            while right < row_end and labels[right + 1] == old:
+                right += 1
+            for j in range(left, right + 1):
+                labels[j] = new
+            filled += right - left + 1
+            # one seed per run of `old` cells in the rows above and below
+            for offset in (-cols, cols):
+                if 0 <= left + offset < len(labels):
+                    inside = False
+                    for j in range(left + offset, right + offset + 1):
+                        if labels[j] == old:
+                            if not inside:
+                                stack.append(j)
+                                inside = True
+                        else:
+                            inside = False
+        return filled
+
+    def cover(self, label):
+        """Rectangles covering region `label`: its runs in each row, stacked where they line up."""
+        labels, cols = self.labels, self.cols
+        rects = []
+        above = {}  # (first, last) column of each run in the row above -> its rectangle
+        for row in range(self.rows):
+            base = row * cols
+            runs = {}
+            col = 0
+            while col < cols:
+                if labels[base + col] != label:
+                    col += 1
+                    continue
+                end = col
+                while end + 1 < cols and labels[base + end + 1] == label:
+                    end += 1
+                rect = above.get((col, end))
+                if rect is None:
+                    rect = [col, row, end - col + 1, 0]
+                    rects.append(rect)
+                rect[3] += 1
+                runs[(col, end)] = rect
+                col = end + 1
+            above = runs
+        return [(PLAY_AREA_X + x * GRID_SIZE, PLAY_AREA_Y + y * GRID_SIZE, w * GRID_SIZE, h * GRID_SIZE)
+                for x, y, w, h in rects]
+
+
 class Ball:
     def __init__(self, x, y, vx, vy, color_index):
         self.x = x
@@ -244,38 +401,6 @@ class Divider:
             if self.top_complete and self.bottom_complete:
                 self.growing = False
     
-    def has_captured_area_beyond(self, x, y, direction):
-        """Check if there's a captured area beyond a divider intersection"""
-        # Sample a few pixels beyond the intersection point to check for captured areas
-        test_offset = 10
-        
-        for area in state["claimed_areas"]:
-            ax1, ay1 = area["x"], area["y"]
-            ax2, ay2 = area["x"] + area["width"], area["y"] + area["height"]
-            
-            if direction == "left":
-                # Check if there's captured area to the left of this x position
-                test_x = x - test_offset
-                if ax1 <= test_x <= ax2 and ay1 <= y <= ay2:
-                    return True
-            elif direction == "right":
-                # Check if there's captured area to the right of this x position
-                test_x = x + test_offset
-                if ax1 <= test_x <= ax2 and ay1 <= y <= ay2:
-                    return True
-            elif direction == "top":
-                # Check if there's captured area above this y position
-                test_y = y - test_offset
-                if ax1 <= x <= ax2 and ay1 <= test_y <= ay2:
-                    return True
-            elif direction == "bottom":
-                # Check if there's captured area below this y position
-                test_y = y + test_offset
-                if ax1 <= x <= ax2 and ay1 <= test_y <= ay2:
-                    return True
-        
-        return False
-    
     def collides_with_ball(self, ball):
         """Check if divider is touching a ball on an incomplete side"""
         if self.direction == "horizontal":
@@ -341,12 +466,7 @@ def start_level():
     state["dividers"] = []
     state["completed_dividers"] = []
     # Initialize with one region covering the entire play area (unclaimed)
-    state["claimed_areas"] = [{
-        "x": PLAY_AREA_X,
-        "y": PLAY_AREA_Y,
-        "width": PLAY_AREA_WIDTH,
-        "height": PLAY_AREA_HEIGHT
-    }]
+    state["area"] = AreaMap()
     state["divider_active"] = False
     state["percent_claimed"] = 0
     state["won_level"] = False
@@ -360,58 +480,22 @@ def start_level():
     for i in range(num_balls):
         x = PLAY_AREA_X + PLAY_AREA_WIDTH / 2 + random.uniform(-20, 20)
         y = PLAY_AREA_Y + PLAY_AREA_HEIGHT / 2 + random.uniform(-20, 20)
-        angle = random.uniform(0, 2 * math.pi)
+        turn = random.random()
         speed = BALL_SPEED
-        vx = math.cos(angle) * speed
-        vy = math.sin(angle) * speed
+        vx = fastmath.cos_turns(turn) * speed
+        vy = fastmath.sin_turns(turn) * speed
         ball = Ball(x, y, vx, vy, i)
         state["balls"].append(ball)
+    state["area"].count_balls(state["balls"])
 
 def is_point_in_claimed_area(x, y):
     """Check if a point is in a TRULY CLAIMED area (no balls can reach it)"""
-    # Since claimed_areas now tracks UNCLAIMED regions (where balls are),
-    # we need to check if point is NOT in any ball region
-    for area in state["claimed_areas"]:
-        if (area["x"] < x < area["x"] + area["width"] and
-            area["y"] < y < area["y"] + area["height"]):
-            # Point is in a ball region - check if balls are actually there
-            has_ball = False
-            for ball in state["balls"]:
-                if (area["x"] < ball.x < area["x"] + area["width"] and
-                    area["y"] < ball.y < area["y"] + area["height"]):
-                    has_ball = True
-                    break
-            
-            # If no balls in this region, it's claimed - don't allow divider
-            if not has_ball:
-                return True
-            # If balls are here, it's unclaimed - allow divider
-            return False
-    
-    # Point is not in any tracked region, so it's claimed by default
-    return True
+    return state["area"].is_claimed(x, y)
 
 def is_point_on_divider(x, y):
     """Check if a point is on top of an existing divider"""
     threshold = 5  # Distance threshold
-    for divider in state["completed_dividers"]:
-        if divider.direction == "horizontal":
-            # Check if point is near this horizontal divider
-            if abs(y - divider.y) < threshold:
-                # Check if point is within the divider's x range
-                x1 = max(PLAY_AREA_X, divider.x - divider.length)
-                x2 = min(PLAY_AREA_X + PLAY_AREA_WIDTH, divider.x + divider.length)
-                if x1 <= x <= x2:
-                    return True
-        else:
-            # Check if point is near this vertical divider
-            if abs(x - divider.x) < threshold:
-                # Check if point is within the divider's y range
-                y1 = max(PLAY_AREA_Y, divider.y - divider.length)
-                y2 = min(PLAY_AREA_Y + PLAY_AREA_HEIGHT, divider.y + divider.length)
-                if y1 <= y <= y2:
-                    return True
-    return False
+    return state["area"].near_wall(x, y, threshold - 1)
 
 def create_divider():
     """Create a new divider at cursor position"""
@@ -434,127 +518,11 @@ def create_divider():
     state["dividers"].append(divider)
     state["divider_active"] = True
 
-def calculate_overlap_with_claimed(area):
-    """Calculate how much of an area overlaps with already claimed areas"""
-    if not state["claimed_areas"]:
-        return 0
-    
-    new_x1 = area["x"]
-    new_y1 = area["y"]
-    new_x2 = area["x"] + area["width"]
-    new_y2 = area["y"] + area["height"]
-    
-    total_overlap = 0
-    for claimed in state["claimed_areas"]:
-        c_x1 = claimed["x"]
-        c_y1 = claimed["y"]
-        c_x2 = claimed["x"] + claimed["width"]
-        c_y2 = claimed["y"] + claimed["height"]
-        
-        # Calculate intersection
-        overlap_x1 = max(new_x1, c_x1)
-        overlap_y1 = max(new_y1, c_y1)
-        overlap_x2 = min(new_x2, c_x2)
-        overlap_y2 = min(new_y2, c_y2)
-        
-        if overlap_x1 < overlap_x2 and overlap_y1 < overlap_y2:
-            overlap_area = (overlap_x2 - overlap_x1) * (overlap_y2 - overlap_y1)
-            total_overlap += overlap_area
-    
-    return total_overlap
-
-def split_area_by_divider(divider):
-    """Split existing ball regions by this divider"""
-    new_regions = []
-    
-    # For each existing region, check if this divider splits it
-    for region in state["claimed_areas"]:
-        if divider.direction == "horizontal":
-            # Horizontal divider
-            div_left = divider.x - divider.left_length
-            div_right = divider.x + divider.right_length
-            div_y = divider.y
-            
-            # Check if divider crosses this region
-            if (div_left < region["x"] + region["width"] and 
-                div_right > region["x"] and
-                region["y"] < div_y < region["y"] + region["height"]):
-                # Split the region into above and below
-                above = {
-                    "x": region["x"],
-                    "y": region["y"],
-                    "width": region["width"],
-                    "height": div_y - region["y"]
-                }
-                below = {
-                    "x": region["x"],
-                    "y": div_y,
-                    "width": region["width"],
-                    "height": region["y"] + region["height"] - div_y
-                }
-                
-                if above["height"] > 0:
-                    new_regions.append(above)
-                if below["height"] > 0:
-                    new_regions.append(below)
-            else:
-                # Divider doesn't split this region, keep it
-                new_regions.append(region)
-        
-        else:  # vertical
-            # Vertical divider
-            div_top = divider.y - divider.top_length
-            div_bottom = divider.y + divider.bottom_length
-            div_x = divider.x
-            
-            # Check if divider crosses this region
-            if (div_top < region["y"] + region["height"] and 
-                div_bottom > region["y"] and
-                region["x"] < div_x < region["x"] + region["width"]):
-                # Split the region into left and right
-                left = {
-                    "x": region["x"],
-                    "y": region["y"],
-                    "width": div_x - region["x"],
-                    "height": region["height"]
-                }
-                right = {
-                    "x": div_x,
-                    "y": region["y"],
-                    "width": region["x"] + region["width"] - div_x,
-                    "height": region["height"]
-                }
-                
-                if left["width"] > 0:
-                    new_regions.append(left)
-                if right["width"] > 0:
-                    new_regions.append(right)
-            else:
-                # Divider doesn't split this region, keep it
-                new_regions.append(region)
-    
-    state["claimed_areas"] = new_regions
-
 def calculate_claimed_area():
     """Calculate percentage - regions with balls are UNCLAIMED"""
-    total_area = PLAY_AREA_WIDTH * PLAY_AREA_HEIGHT
-    
-    # Sum up regions that have balls (unclaimed)
-    unclaimed = 0
-    for area in state["claimed_areas"]:
-        # Check if any ball is in this area
-        has_ball = False
-        for ball in state["balls"]:
-            if (area["x"] < ball.x < area["x"] + area["width"] and
-                area["y"] < ball.y < area["y"] + area["height"]):
-                has_ball = True
-                break
-        
-        if has_ball:
-            unclaimed += area["width"] * area["height"]
-    
-    # Percentage claimed is 100% minus unclaimed percentage
-    state["percent_claimed"] = int(((total_area - unclaimed) / total_area) * 100)
+    area = state["area"]
+    area.count_balls(state["balls"])
+    state["percent_claimed"] = area.claimed_percent()
     
     # Check if level is won (75% claimed)
     if state["percent_claimed"] >= 75:
@@ -633,7 +601,7 @@ def update():
                     # Divider completed successfully
                     state["dividers"].remove(divider)
                     state["completed_dividers"].append(divider)
-                    split_area_by_divider(divider)
+                    state["area"].add_divider(divider)
                     state["divider_active"] = False
             
             # Calculate claimed area percentage
@@ -644,19 +612,12 @@ def update():
     screen.draw(shapes.rectangle(PLAY_AREA_X, PLAY_AREA_Y, PLAY_AREA_WIDTH, PLAY_AREA_HEIGHT))
     
     # Draw unclaimed regions (where balls can be) with darker color
-    for area in state["claimed_areas"]:
-        # Check if any ball is in this area
-        has_ball = False
-        for ball in state["balls"]:
-            if (area["x"] < ball.x < area["x"] + area["width"] and
-                area["y"] < ball.y < area["y"] + area["height"]):
-                has_ball = True
-                break
-        
-        # Only draw unclaimed regions (with balls)
-        if has_ball:
-            screen.brush = BACKGROUND
-            screen.draw(shapes.rectangle(int(area["x"]), int(area["y"]), int(area["width"]), int(area["height"])))
+    area = state["area"]
+    screen.brush = BACKGROUND
+    for label, count in enumerate(area.ball_counts):
+        if count:
+            for x, y, w, h in area.rects[label]:
+                screen.draw(shapes.rectangle(x, y, w, h))
     
     # Draw play area border
     screen.brush = WALL_COLOR
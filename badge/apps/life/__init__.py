@@ -1,6 +1,11 @@
 from badgeware import screen, PixelFont, shapes, brushes, io, run, Matrix
 import random
 
+try:
+    import numpy  # simulator only: steps the full-resolution board
+except ImportError:
+    numpy = None
+
 
 # Multiple color palettes for neighbor count
 NEIGHBOR_PALETTES = {
@@ -102,6 +107,9 @@ GRID_SIZE = 4  # Size of each square (includes 1px gap)
 SQUARE_SIZE = 3  # Actual drawn size (GRID_SIZE - 1 for gap)
 GRID_WIDTH = 40  # 160 / 4
 GRID_HEIGHT = 30  # 120 / 4
+# Full resolution (A button): one cell per pixel, the whole screen
+FULL_WIDTH = screen.width
+FULL_HEIGHT = screen.height
 
 # Probability of injecting static life patterns when stagnant
 STATIC_LIFE_PROBABILITY = 0.4
@@ -109,9 +117,6 @@ STATIC_LIFE_PROBABILITY = 0.4
 # Load font
 small_font = PixelFont.load("/system/assets/fonts/nope.ppf")
 
-# Pre-create shape for cells (reused for all cells)
-cell_rect = shapes.rectangle(0, 0, SQUARE_SIZE, SQUARE_SIZE)
-
 # Interesting Life patterns (name, pattern as list of (x, y) offsets)
 PATTERNS = {
     # Spaceships (moving patterns)
@@ -151,65 +156,139 @@ STATIC_LIFE = {
     'barge': [(1, 0), (2, 0), (0, 1), (3, 1), (0, 2), (3, 2), (1, 3), (2, 3)],
 }
 
+# Stagnation history keeps one 64-bit hash per generation: the XOR of a
+# per-row hash, so a generation only rehashes the rows that changed
+HASH_MASK = (1 << 64) - 1
+
+
+def make_row_keys(count):
+    """Fixed odd 64-bit multipliers, one per row (xorshift64)."""
+    keys = []
+    x = 0x9E3779B97F4A7C15
+    for _ in range(count):
+        x ^= (x << 13) & HASH_MASK
+        x ^= x >> 7
+        x ^= (x << 17) & HASH_MASK
+        keys.append(x | 1)
+    return keys
+
+
 class GameOfLife:
-    def __init__(self):
-        self.grid = [[False for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)]
-        self.next_grid = [[False for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)]
-        self.neighbor_counts = [[0 for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)]
+    """Life on a torus, one int per row: bit x of rows[y] is the cell at (x, y).
+
+    Neighbour counts are kept as four bit planes (ones, twos, fours, eights)
+    added up with full adders across whole rows at once, so a generation
+    costs a few dozen integer operations per row instead of eight lookups
+    per cell. The planes of the current grid both colour the cells and
+    decide the next generation.
+
+    Cells are `pitch` pixels apart and drawn `size` pixels square; with no
+    gap between them (full resolution, one cell per pixel) a run of touching
+    cells of one colour is drawn as a single rectangle.
+    """
+
+    def __init__(self, width=GRID_WIDTH, height=GRID_HEIGHT, pitch=GRID_SIZE, size=SQUARE_SIZE):
+        self.width = width
+        self.height = height
+        self.pitch = pitch
+        self.size = size
+        self.cell = shapes.rectangle(0, 0, size, size)
+        self.make_grid()
+        self.shown = None  # (rows, counts) as last drawn; None redraws everything
         self.generation = 0
         self.last_update = 0
-        self.update_interval = 100  # milliseconds
-        self.history = []  # Store recent grid states for pattern detection
+        self.update_interval = 40  # milliseconds
+        self.history = []  # Hashes of recent grid states for pattern detection
         self.history_size = 10  # Check last 10 states
         self.stagnant_count = 0  # How many generations have been static/oscillating
         self.last_regen = 0  # Track time of last full regeneration
         self.regen_interval = 600000  # 10 minutes in milliseconds
         self.randomize()
-    
+
+    def make_grid(self):
+        """An empty grid."""
+        self.mask = (1 << self.width) - 1
+        self.rows = [0] * self.height
+        self.counts = ([0] * self.height, [0] * self.height, [0] * self.height, [0] * self.height)
+        self.row_keys = make_row_keys(self.height)
+        self.hash = 0
+        for y in range(self.height):
+            self.hash ^= self.row_hash(y, 0)
+
     def randomize(self):
         """Initialize grid with random cells"""
-        for y in range(GRID_HEIGHT):
-            for x in range(GRID_WIDTH):
-                self.grid[y][x] = random.random() < 0.35  # 35% chance of being alive
+        self.fill_random(0.35)  # 35% chance of being alive
         self.generation = 0
         self.history = []
         self.stagnant_count = 0
         self.last_regen = io.ticks
-        self.calculate_neighbors()
-    
-    def count_neighbors(self, x, y):
-        """Count alive neighbors for a given cell position"""
-        y_prev = (y - 1) % GRID_HEIGHT
-        y_next = (y + 1) % GRID_HEIGHT
-        x_prev = (x - 1) % GRID_WIDTH
-        x_next = (x + 1) % GRID_WIDTH
-        
-        count = 0
-        if self.grid[y_prev][x_prev]: count += 1
-        if self.grid[y_prev][x]: count += 1
-        if self.grid[y_prev][x_next]: count += 1
-        if self.grid[y][x_prev]: count += 1
-        if self.grid[y][x_next]: count += 1
-        if self.grid[y_next][x_prev]: count += 1
-        if self.grid[y_next][x]: count += 1
-        if self.grid[y_next][x_next]: count += 1
-        
-        return count
-    
-    def get_grid_hash(self):
-        """Create a hashable representation of current grid state"""
-        return tuple(tuple(row) for row in self.grid)
-    
+
+    def fill_random(self, density):
+        rows = []
+        for y in range(self.height):
+            row = 0
+            for x in range(self.width):
+                if random.random() < density:
+                    row |= 1 << x
+            rows.append(row)
+        self.set_rows(rows)
+
+    def row_hash(self, y, row):
+        return ((row + 1) * self.row_keys[y]) & HASH_MASK
+
+    def set_rows(self, rows):
+        """Replace the grid, rehashing only the rows that differ."""
+        for y in range(self.height):
+            if rows[y] != self.rows[y]:
+                self.hash ^= self.row_hash(y, self.rows[y]) ^ self.row_hash(y, rows[y])
+        self.rows = rows
+        self.counts = self.count_neighbors(rows)
+
+    def add_cells(self, cells):
+        """Bring the (x, y) cells to life."""
+        rows = list(self.rows)
+        for x, y in cells:
+            rows[y] |= 1 << x
+        self.set_rows(rows)
+
+    def count_neighbors(self, rows):
+        """Neighbour counts of every cell as bit planes: ones, twos, fours, eights."""
+        width, mask = self.width, self.mask
+        # west[y] has bit x set when the cell to the west of x is alive
+        west = [((row << 1) | (row >> (width - 1))) & mask for row in rows]
+        east = [(row >> 1) | ((row & 1) << (width - 1)) for row in rows]
+        ones, twos, fours, eights = [], [], [], []
+        last = self.height - 1
+        for y in range(self.height):
+            up = y - 1 if y else last
+            down = y + 1 if y < last else 0
+            # the three cells above and the three below: full adders
+            a, b, c = west[up], rows[up], east[up]
+            up1 = a ^ b ^ c
+            up2 = (a & b) | (c & (a ^ b))
+            a, b, c = west[down], rows[down], east[down]
+            down1 = a ^ b ^ c
+            down2 = (a & b) | (c & (a ^ b))
+            # the two beside: a half adder
+            a, b = west[y], east[y]
+            side1 = a ^ b
+            side2 = a & b
+            # sum the ones, carrying into the twos
+            ones.append(up1 ^ down1 ^ side1)
+            carry = (up1 & down1) | (side1 & (up1 ^ down1))
+            # sum the twos and the carry, carrying into the fours and eights
+            t = up2 ^ down2 ^ side2
+            t4 = (up2 & down2) | (side2 & (up2 ^ down2))
+            twos.append(t ^ carry)
+            carry &= t
+            fours.append(t4 ^ carry)
+            eights.append(t4 & carry)
+        return ones, twos, fours, eights
+
     def is_stagnant(self):
         """Check if grid is static or oscillating"""
-        current = self.get_grid_hash()
-        
-        # Check if current state matches any recent state
-        for old_state in self.history:
-            if current == old_state:
-                return True
-        return False
-    
+        return self.hash in self.history
+
     def inject_pattern(self, pattern_name):
         """Inject an interesting pattern at a random location"""
         # Check if it's a static life or regular pattern
@@ -217,47 +296,36 @@ class GameOfLife:
             pattern = STATIC_LIFE[pattern_name]
         else:
             pattern = PATTERNS[pattern_name]
-        
+
         # Find pattern bounds
         max_x = max(p[0] for p in pattern)
         max_y = max(p[1] for p in pattern)
-        
+
         # Choose random position with padding
-        start_x = random.randint(2, GRID_WIDTH - max_x - 3)
-        start_y = random.randint(2, GRID_HEIGHT - max_y - 3)
-        
+        start_x = random.randint(2, self.width - max_x - 3)
+        start_y = random.randint(2, self.height - max_y - 3)
+
         # Place pattern
-        for dx, dy in pattern:
-            x = (start_x + dx) % GRID_WIDTH
-            y = (start_y + dy) % GRID_HEIGHT
-            self.grid[y][x] = True
-        
+        self.add_cells([((start_x + dx) % self.width, (start_y + dy) % self.height)
+                        for dx, dy in pattern])
+
         # Reset stagnancy tracking
         self.history = []
         self.stagnant_count = 0
-        self.calculate_neighbors()
-    
+
+    def step(self):
+        # Alive next generation: exactly 3 neighbours, or 2 and alive now
+        # (counts of 6-8 have the fours or eights bit set)
+        ones, twos, fours, eights = self.counts
+        rows = self.rows
+        self.set_rows([twos[y] & ~(fours[y] | eights[y]) & (ones[y] | rows[y])
+                       for y in range(self.height)])
+
     def update(self):
         """Apply Conway's Game of Life rules"""
-        # First pass: count neighbors and apply rules
-        for y in range(GRID_HEIGHT):
-            for x in range(GRID_WIDTH):
-                # Count neighbors using helper method
-                count = self.count_neighbors(x, y)
-                
-                # Apply Conway's rules
-                is_alive = self.grid[y][x]
-                
-                # Optimized rules check
-                if is_alive:
-                    self.next_grid[y][x] = (count == 2 or count == 3)
-                else:
-                    self.next_grid[y][x] = (count == 3)
-        
-        # Swap grids (avoid allocation)
-        self.grid, self.next_grid = self.next_grid, self.grid
+        self.step()
         self.generation += 1
-        
+
         # Check for stagnation and inject patterns if needed
         if self.is_stagnant():
             self.stagnant_count += 1
@@ -270,7 +338,7 @@ class GameOfLife:
                     for _ in range(num_static_lifes):
                         pattern = random.choice(static_life_names)
                         self.inject_pattern(pattern)
-                
+
                 # Add a moving or oscillating pattern
                 pattern_pool = [
                     'glider', 'glider', 'glider',  # 3x weight
@@ -286,51 +354,150 @@ class GameOfLife:
                 self.inject_pattern(pattern)
         else:
             self.stagnant_count = 0
-        
+
         # Update history for pattern detection
-        self.history.append(self.get_grid_hash())
+        self.history.append(self.hash)
         if len(self.history) > self.history_size:
             self.history.pop(0)
-        
-        # Second pass: calculate neighbor counts for the NEW grid state (for coloring)
-        for y in range(GRID_HEIGHT):
-            for x in range(GRID_WIDTH):
-                self.neighbor_counts[y][x] = self.count_neighbors(x, y)
-    
-    def calculate_neighbors(self):
-        """Calculate neighbor counts for all cells (used only on init)"""
-        for y in range(GRID_HEIGHT):
-            for x in range(GRID_WIDTH):
-                self.neighbor_counts[y][x] = self.count_neighbors(x, y)
-    
+
+    def invalidate(self):
+        """Redraw every cell on the next draw()."""
+        self.shown = None
+
+    def fill(self, x, y, run, colour):
+        """Paint `run` cells from (x, y) along the row in NEIGHBOR_BRUSHES[colour]."""
+        screen.brush = NEIGHBOR_BRUSHES[colour]
+        if run == 1:
+            self.cell.transform = Matrix().translate(x * self.pitch, y * self.pitch)
+            screen.draw(self.cell)
+        else:
+            screen.draw(shapes.rectangle(x * self.pitch, y * self.pitch, run * self.pitch, self.size))
+
     def draw(self):
-        """Draw the grid with colors based on neighbor count"""
-        # Use pre-created shape and brushes for performance
-        for y in range(GRID_HEIGHT):
-            py = y * GRID_SIZE
-            for x in range(GRID_WIDTH):
-                if self.grid[y][x]:
-                    # Alive cells - color based on neighbor count
-                    neighbors = self.neighbor_counts[y][x]
-                    screen.brush = NEIGHBOR_BRUSHES[neighbors]
-                    cell_rect.transform = Matrix().translate(x * GRID_SIZE, py)
-                    screen.draw(cell_rect)
+        """Draw the cells whose state or neighbour count changed since the last draw"""
+        ones, twos, fours, eights = self.counts
+        full = self.shown is None
+        if full:
+            screen.brush = BACKGROUND_BRUSH
+            screen.clear()
+        else:
+            shown_rows, (shown1, shown2, shown4, shown8) = self.shown
+        # touching cells can share a rectangle; cells with gaps can't
+        merge = self.pitch == self.size
+
+        for y in range(self.height):
+            row = self.rows[y]
+            n1, n2, n4, n8 = ones[y], twos[y], fours[y], eights[y]
+            if full:
+                changed = row
+            else:
+                # flipped cells, and live cells whose colour changed
+                changed = (row ^ shown_rows[y]) | (row & (
+                    (n1 ^ shown1[y]) | (n2 ^ shown2[y]) | (n4 ^ shown4[y]) | (n8 ^ shown8[y])))
+            x = 0
+            run = 0  # cells waiting to be painted from run_x, all in run_colour
+            while changed:
+                if changed & 1:
+                    # Alive cells - color based on neighbor count; dead ones
+                    # take entry 0, the background
+                    if row & 1:
+                        colour = (n1 & 1) | (n2 & 1) << 1 | (n4 & 1) << 2 | (n8 & 1) << 3
+                    else:
+                        colour = 0
+                    if run and merge and colour == run_colour:
+                        run += 1
+                    else:
+                        if run:
+                            self.fill(run_x, y, run, run_colour)
+                        run_x, run, run_colour = x, 1, colour
+                elif run:
+                    self.fill(run_x, y, run, run_colour)
+                    run = 0
+                changed >>= 1
+                row >>= 1
+                n1 >>= 1
+                n2 >>= 1
+                n4 >>= 1
+                n8 >>= 1
+                x += 1
+            if run:
+                self.fill(run_x, y, run, run_colour)
+
+        self.shown = (self.rows, self.counts)
+
+
+class NumpyLife(GameOfLife):
+    """The same automaton on numpy arrays, one cell per pixel.
+
+    A generation is a handful of whole-array operations, and drawing is one
+    blit_indexed() of every cell's colour index (its neighbour count if it
+    is alive, 0 if not) with the palette as the lookup table, so the whole
+    board is repainted each frame. Needs numpy and the simulator's bulk
+    pixel write; the badge runs full resolution on GameOfLife instead.
+    """
+
+    def __init__(self, width, height):
+        super().__init__(width, height, 1, 1)
+
+    def make_grid(self):
+        self.set_cells(numpy.zeros((self.height, self.width), numpy.uint8))
+
+    def set_cells(self, cells):
+        self.cells = cells
+        self.counts = self.count_neighbors(cells)
+        self.hash = hash(cells.tobytes())
+
+    def fill_random(self, density):
+        self.set_cells((numpy.random.random((self.height, self.width)) < density).astype(numpy.uint8))
+
+    def count_neighbors(self, cells):
+        """Neighbour count of every cell, wrapping at the edges."""
+        # each cell plus the ones above and below, then those columns
+        # either side, less the cell itself
+        column = cells + numpy.roll(cells, 1, 0) + numpy.roll(cells, -1, 0)
+        return column + numpy.roll(column, 1, 1) + numpy.roll(column, -1, 1) - cells
+
+    def add_cells(self, cells):
+        grid = self.cells.copy()
+        for x, y in cells:
+            grid[y, x] = 1
+        self.set_cells(grid)
+
+    def step(self):
+        counts = self.counts
+        self.set_cells(((counts == 3) | ((counts == 2) & (self.cells == 1))).astype(numpy.uint8))
+
+    def draw(self):
+        screen.blit_indexed(0, 0, self.width, self.height, self.cells * self.counts, NEIGHBOR_COLORS)
+
+def make_game(full):
+    """The board of 4px cells, or one cell per pixel when `full`."""
+    if not full:
+        return GameOfLife()
+    if numpy is not None and hasattr(screen, "blit_indexed"):
+        return NumpyLife(FULL_WIDTH, FULL_HEIGHT)
+    return GameOfLife(FULL_WIDTH, FULL_HEIGHT, 1, 1)
 
 # Game state
-game = GameOfLife()
+full_resolution = False
+game = make_game(full_resolution)
 show_info = False
 info_timer = 0
 info_message = ""
 
 def update():
-    global show_info, info_timer, info_message
-    
-    # Clear screen with pre-created brush
-    screen.brush = BACKGROUND_BRUSH
-    screen.clear()
-    
+    global game, full_resolution, show_info, info_timer, info_message
+
+    # The screen keeps last frame's cells: game.draw() only repaints the
+    # ones that changed, and invalidate() repaints the lot
 
     # Handle input
+    if io.BUTTON_A in io.pressed:
+        full_resolution = not full_resolution
+        game = make_game(full_resolution)
+        show_info = True
+        info_message = "Full resolution" if full_resolution else "Cells"
+        info_timer = io.ticks + 1000
     if io.BUTTON_B in io.pressed:
         game.randomize()
         show_info = True
@@ -342,6 +509,7 @@ def update():
         current_index = palette_names.index(ACTIVE_PALETTE)
         next_index = (current_index + 1) % len(palette_names)
         set_palette(palette_names[next_index])
+        game.invalidate()
         show_info = True
         info_message = f"Palette: {palette_names[next_index]}"
         info_timer = io.ticks + 1000  # Show palette name for 1 second
@@ -355,7 +523,9 @@ def update():
         game.last_update = io.ticks
         game.update()
     
-    # Draw the grid
+    # Draw the grid (all of it under the translucent message box)
+    if show_info:
+        game.invalidate()
     game.draw()
     
     # Show info message
@@ -368,6 +538,8 @@ def update():
         screen.brush = TEXT_BRUSH
         screen.text(info_message, 80 - (w // 2), 56)
     elif io.ticks >= info_timer:
+        if show_info:
+            game.invalidate()  # paint over the message next frame
         show_info = False
 
 if __name__ == "__main__":
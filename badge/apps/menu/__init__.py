@@ -8,23 +8,25 @@ import math
 from badgeware import screen, PixelFont, Image, SpriteSheet, is_dir, file_exists, shapes, brushes, io, run
 from icon import Icon
 import ui
+import manifest
 
 mona = SpriteSheet("/system/assets/mona-sprites/mona-default.png", 11, 1)
 screen.font = PixelFont.load("/system/assets/fonts/ark.ppf")
 # screen.antialias = Image.X2
 
-# Auto-discover apps with __init__.py
+# Installed apps (with __init__.py) and their icons, from the app index
 apps = []
+icon_for = {}
+atlas = None
 try:
-    for entry in os.listdir("/system/apps"):
-        app_path = f"/system/apps/{entry}"
-        if is_dir(app_path):
-            has_init = file_exists(f"{app_path}/__init__.py")
-            if has_init:
-                # Skip menu and startup apps
-                if entry not in ("menu", "startup"):
-                    # Use directory name as display name
-                    apps.append((entry, entry))
+    index = manifest.load()
+    for app in index["apps"]:
+        # Use directory name as display name
+        apps.append((app["name"], app["path"]))
+        icon_for[app["path"]] = app["icon"]
+    if index.get("atlas") and index.get("slots"):
+        atlas = SpriteSheet(index["atlas"], index["slots"], 1)
+    del index
 except Exception as e:
     print(f"Error discovering apps: {e}")
 
@@ -43,20 +45,25 @@ def load_page_icons(page):
         app = apps[i]
         name, path = app[0], app[1]
         
-        if is_dir(f"/system/apps/{path}"):
-            icon_idx = i - start_idx
-            x = icon_idx % 3
-            y = math.floor(icon_idx / 3)
-            pos = (x * 48 + 33, y * 48 + 42)
-            try:
-                # Try to load app-specific icon, fall back to default
-                icon_path = f"/system/apps/{path}/icon.png"
-                if not file_exists(icon_path):
-                    icon_path = "/system/apps/menu/default_icon.png"
-                sprite = Image.load(icon_path)
-                icons.append(Icon(pos, name, icon_idx % APPS_PER_PAGE, sprite))
-            except Exception as e:
-                print(f"Error loading icon for {path}: {e}")
+        icon_idx = i - start_idx
+        x = icon_idx % 3
+        y = math.floor(icon_idx / 3)
+        pos = (x * 48 + 33, y * 48 + 42)
+        try:
+            # Icons in the atlas are cut out of the already decoded sheet;
+            # others (not 24x24, or added since the last build) are loaded
+            icon = icon_for[path]
+            if isinstance(icon, int) and atlas is not None:
+                sprite = atlas.sprite(icon, 0)
+            else:
+                if isinstance(icon, int):
+                    icon = f"/system/apps/{path}/icon.png"
+                    if not file_exists(icon):
+                        icon = "/system/apps/menu/default_icon.png"
+                sprite = Image.load(icon)
+            icons.append(Icon(pos, name, icon_idx % APPS_PER_PAGE, sprite))
+        except Exception as e:
+            print(f"Error loading icon for {path}: {e}")
     return icons
 
 icons = load_page_icons(current_page)
@@ -1,5 +1,4 @@
-import math
-from badgeware import brushes, shapes, io, Matrix, screen
+from badgeware import brushes, shapes, io, Matrix, screen, fastmath
 
 # bright icon colours
 bold = [
@@ -58,7 +57,7 @@ class Icon:
             frame = io.ticks - self.spin_start
 
             # calculate the width of the tile during this part of the animation
-            width = round(math.cos(frame / speed) * 3) / 3
+            width = round(fastmath.cos(frame / speed) * 3) / 3
 
             # ensure the width never reduces to zero or the icon disappears
             width = max(0.1, width) if width > 0 else min(-0.1, width)
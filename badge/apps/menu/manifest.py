@@ -0,0 +1,82 @@
+import os
+import json
+from badgeware import is_dir, file_exists
+
+# The menu used to list /system/apps and probe every directory on each
+# launch, then decode a PNG per icon on every page change. Instead it reads
+# one index of the installed apps, whose icons (the 24x24 ones) are packed
+# into a single atlas image by tools/build_menu_index.py. When apps are
+# added or removed on the badge the index is rebuilt here and kept on the
+# writable partition, keyed on the names in /system/apps (FAT doesn't
+# reliably touch a directory's mtime when files are copied into it) and
+# the modification time of the shipped index.
+
+APPS_DIR = "/system/apps"
+SHIPPED_INDEX = "/system/apps/menu/apps.index"  # written by the build step
+INDEX = "/apps.index"                           # rebuilt on the badge
+DEFAULT_ICON = "/system/apps/menu/default_icon.png"
+HIDDEN = ("menu", "startup")
+
+
+def _mtime(path):
+    try:
+        return os.stat(path)[8]
+    except OSError:
+        return None
+
+
+def _read(path):
+    try:
+        with open(path, "r") as f:
+            return json.loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def scan(entries, slots, default):
+    """Discover the installed apps among `entries`; `slots` maps app -> atlas slot."""
+    apps = []
+    for entry in entries:
+        path = f"{APPS_DIR}/{entry}"
+        if entry in HIDDEN or not is_dir(path) or not file_exists(f"{path}/__init__.py"):
+            continue
+        icon = slots.get(entry)
+        if icon is None:
+            icon = f"{path}/icon.png" if file_exists(f"{path}/icon.png") else default
+        apps.append({"name": entry, "path": entry, "icon": icon})
+    return apps
+
+
+def load():
+    """The menu index: {"apps": [{"name", "path", "icon"}], "atlas", "slots"}.
+
+    An app's "icon" is its slot in the atlas (an int) or an image path.
+    """
+    entries = sorted(os.listdir(APPS_DIR))
+    key = [entries, _mtime(SHIPPED_INDEX)]
+    index = _read(INDEX)
+    if index is not None and index.get("key") == key:
+        return index
+
+    shipped = _read(SHIPPED_INDEX) or {}
+    slots = {}
+    for app in shipped.get("apps", []):
+        if isinstance(app.get("icon"), int):
+            slots[app["path"]] = app["icon"]
+    default = shipped.get("default", DEFAULT_ICON)
+
+    apps = scan(entries, slots, default)
+    fresh = {
+        "key": key,
+        "atlas": shipped.get("atlas"),
+        "slots": shipped.get("slots", 0),
+        "default": default,
+        "apps": apps,
+    }
+    if fresh != index:
+        try:
+            with open(INDEX, "w") as f:
+                f.write(json.dumps(fresh))
+        except OSError as e:
+            print(f"Error writing app index: {e}")
+    return fresh
@@ -1,6 +1,5 @@
-import math
 import random
-from badgeware import brushes, shapes, io, screen, Matrix, get_battery_level, is_charging
+from badgeware import brushes, shapes, io, screen, Matrix, get_battery_level, is_charging, fastmath
 
 black = brushes.color(0, 0, 0)
 background = brushes.color(35, 41, 37)
@@ -87,7 +86,7 @@ def draw_terminal():
 
 def draw_header():
     # create animated header text
-    dots = "." * int(math.sin(io.ticks / 250) * 2 + 2)
+    dots = "." * int(fastmath.sin(io.ticks / 250) * 2 + 2)
     label = f"Mona-OS v4.03{dots}"
     pos = (5, 2)
 
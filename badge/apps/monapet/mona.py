@@ -5,8 +5,8 @@ sys.path.insert(0, "/system/apps/monapet")
 os.chdir("/system/apps/monapet")
 
 from badgeware import screen, brushes, SpriteSheet, shapes, clamp, io
+from badgeware import palette, fastmath
 import random
-import math
 
 # this class defines our little friend, modify it to change their behaviour!
 #
@@ -17,9 +17,14 @@ import math
 #
 # the ui will automatically update to reflect mona's state
 
+# colours mona's sprites are tinted towards to show how they feel
+GHOST_TINT = (170, 200, 255)
+WARNING_TINT = (255, 60, 60)
+
 class Mona:
   _moods = []
   _animations = {}
+  _palettes = {}
 
   def __init__(self, y):
     self._happy = 100
@@ -57,8 +62,10 @@ class Mona:
     if self._action:
       action_time = (io.ticks / 1000) - self._action_changed_at
       image = Mona._animations[self._action].frame(round(action_time * 10))
+      self.tint(self._action)
     else:
       image = Mona._animations[self._mood].frame(round(io.ticks / 100))
+      self.tint(self._mood)
 
     width, height = image.width * 2, image.height * 2
 
@@ -71,7 +78,7 @@ class Mona:
     width *= self._direction
 
     # is mona floating?
-    floating = math.sin(io.ticks / 250) * 5 + 5 if self._mood == "dead" else 0
+    floating = fastmath.sin(io.ticks / 250) * 5 + 5 if self._mood == "dead" else 0
 
     # offset sprite
     x -= abs(width / 2)
@@ -87,6 +94,19 @@ class Mona:
     screen.scale_blit(image, x, self._position[1] + (floating / 2) + 1, width, -20)
     image.alpha = 255
 
+  # recolour the animation to match mona's mood: this rewrites the sprites'
+  # palette (a handful of entries) rather than keeping tinted copies of them
+  def tint(self, name):
+    colours = Mona._palettes[name]
+    if self._mood == "dead":
+      colours.fade(GHOST_TINT, 0.5)
+    elif self._mood == "notify":
+      # pulse towards red, in quarter steps so the palette only changes 4 times a beat
+      pulse = round((fastmath.sin(io.ticks / 150) + 1) * 2) / 4
+      colours.fade(WARNING_TINT, pulse * 0.4)
+    else:
+      colours.reset()
+
   # set a new target position for mona to move to
   def move_to(self, target):
     self._target = target
@@ -181,6 +201,8 @@ animations = {
 for name, frame_count in animations.items():
   sprites = SpriteSheet(f"/system/assets/mona-sprites/mona-{name}.png", frame_count, 1)
   Mona._animations[name] = sprites.animation()  # noqa: SLF001
+  frames = [Mona._animations[name].frame(i) for i in range(frame_count)]  # noqa: SLF001
+  Mona._palettes[name] = palette.Palette(frames[0], frames[1:])  # noqa: SLF001
 print("done")
 
 Mona._moods = list(Mona._animations.keys())  # noqa: SLF001
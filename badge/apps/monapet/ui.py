@@ -1,5 +1,4 @@
-import math
-from badgeware import screen, brushes, SpriteSheet, shapes, PixelFont, io
+from badgeware import screen, brushes, SpriteSheet, shapes, PixelFont, io, fastmath
 
 # load user interface sprites
 icons = SpriteSheet("assets/icons.png", 4, 1)
@@ -38,11 +37,11 @@ def background(mona):
     # animate the wallpaper
     screen.brush = brushes.color(30, 40, 20)
     mx = (mona_x - 80) / 2
+    xo = fastmath.sin(io.ticks / 1000) * 2
+    yo = fastmath.cos(io.ticks / 1000) * 2
     for y in range(8):
         for x in range(19):
             if (x + y) % 2 == 0:
-                xo = math.sin(io.ticks / 1000) * 2
-                yo = math.cos(io.ticks / 1000) * 2
                 screen.draw(shapes.rectangle(
                     x * 10 - mx, y * 10 - 3, xo + 4, yo + 4))
 
@@ -100,7 +99,7 @@ def draw_button(x, y, label, active):
     width = 50
 
     # create an animated bounce effect
-    bounce = math.sin(((io.ticks / 20) - x) / 10) * 2
+    bounce = fastmath.sin(((io.ticks / 20) - x) / 10) * 2
 
     # draw the button label
     screen.brush = brushes.color(255, 255, 255, 255 if active else 150)
@@ -1,6 +1,7 @@
 import random
 
-from badgeware import screen, PixelFont, shapes, brushes, io, run
+from badgeware import screen, PixelFont, SpriteSheet, shapes, brushes, io, run
+from badgeware import palette
 
 
 class GameState:
@@ -69,11 +70,19 @@ FRIGHT_DURATION = 6000      # frightened timer in ms
 PELLET_SCORE = 10
 POWER_PELLET_SCORE = 50
 GHOST_SCORE_ORDER = [200, 400, 800, 1600]
+FIELD_CACHE_SIZE = 8        # distance fields kept for targets around Pacman
 
 # Fonts
 large_font = PixelFont.load("/system/assets/fonts/absolute.ppf")
 small_font = PixelFont.load("/system/assets/fonts/nope.ppf")
 
+# Ghost sprites: one paletted sheet, recoloured per ghost and state by
+# rewriting its body entry. Frames: eyes right-down, left-down, right-up,
+# left-up, then no eyes for frightened ghosts.
+ghost_sheet = SpriteSheet("/system/apps/pacman/assets/ghost.png", 5, 1)
+GHOST_BODY = 1              # palette entry of the body in ghost.png
+GHOST_FRIGHTENED_FRAME = 4
+
 
 def tile_center(tx, ty):
     return tx * TILE_SIZE + TILE_SIZE // 2, ty * TILE_SIZE + TILE_SIZE // 2
@@ -105,6 +114,94 @@ DIRECTIONS = [
 ]
 
 
+class MazeGraph:
+    """The maze compiled for navigation when the app loads.
+
+    Every open tile gets its exits, so a ghost only has a choice to make at
+    a junction (three or four exits) and otherwise follows the corridor
+    round its corners. A distance field is the length of the shortest
+    path from every tile to one target tile, found by a breadth-first
+    search. Fields to the ghosts' home tiles are built once and kept; those
+    to tiles around Pacman are built the first time a ghost needs them and
+    the most recent few are kept, so a decision is a lookup per exit.
+    """
+
+    def __init__(self, maze, cache_size=FIELD_CACHE_SIZE):
+        self.width = len(maze[0])
+        self.height = len(maze)
+        self.open = [char != "#" for row in maze for char in row]
+        self.exits = []
+        for i in range(self.width * self.height):
+            tx, ty = i % self.width, i // self.width
+            self.exits.append([] if not self.open[i] else [
+                d for d in DIRECTIONS if not tile_is_wall(tx + d[0], ty + d[1])])
+        self.nearest = self.nearest_open()
+        self.cache_size = cache_size
+        self.fields = {}   # target index -> distance of every tile
+        self.kept = set()  # targets never dropped from the cache
+        self.recent = []   # other cached targets, oldest first
+        self.builds = 0    # fields computed so far
+
+    def index(self, tx, ty):
+        return ty * self.width + tx
+
+    def neighbour(self, i, direction):
+        return i + direction[0] + direction[1] * self.width
+
+    def nearest_open(self):
+        """For every tile, an open tile closest to it (itself if it is open)."""
+        nearest = [i if self.open[i] else -1 for i in range(len(self.open))]
+        queue = [i for i in range(len(self.open)) if self.open[i]]
+        head = 0
+        while head < len(queue):
+            i = queue[head]
+            head += 1
+            tx, ty = i % self.width, i // self.width
+            for dx, dy in DIRECTIONS:
+                nx, ny = tx + dx, ty + dy
+                if 0 <= nx < self.width and 0 <= ny < self.height:
+                    j = self.index(nx, ny)
+                    if nearest[j] < 0:
+                        nearest[j] = nearest[i]
+                        queue.append(j)
+        return nearest
+
+    def build_field(self, target):
+        distance = [9999] * len(self.open)
+        distance[target] = 0
+        queue = [target]
+        head = 0
+        while head < len(queue):
+            i = queue[head]
+            head += 1
+            step = distance[i] + 1
+            for direction in self.exits[i]:
+                j = self.neighbour(i, direction)
+                if distance[j] > step:
+                    distance[j] = step
+                    queue.append(j)
+        self.builds += 1
+        return distance
+
+    def field(self, tile, keep=False):
+        """Distances to `tile` (or the open tile nearest it) from every tile."""
+        tx = clamp(tile[0], 0, self.width - 1)
+        ty = clamp(tile[1], 0, self.height - 1)
+        target = self.nearest[self.index(tx, ty)]
+        field = self.fields.get(target)
+        if field is None:
+            field = self.fields[target] = self.build_field(target)
+        elif target in self.recent:
+            self.recent.remove(target)
+        if keep:
+            self.kept.add(target)
+        elif target not in self.kept:
+            self.recent.append(target)
+            if len(self.recent) > self.cache_size:
+                del self.fields[self.recent.pop(0)]
+        return field
+
+
 def direction_angle(direction):
     if direction == (1, 0):
         return 270
@@ -217,6 +314,9 @@ class Ghost:
         self.x = 0
         self.y = 0
         self.flash = False
+        self.sprites = [ghost_sheet.sprite(i, 0) for i in range(5)]
+        self.colours = palette.Palette(self.sprites[0], self.sprites[1:])
+        self.home = maze_graph.field(spawn_tile, keep=True)
         self.reset()
 
     def reset(self):
@@ -254,35 +354,38 @@ class Ghost:
             self.flash = False
 
     def eaten(self):
+        # keep heading for the next tile centre; the eyes may turn back there
         self.state = GhostState.EYES
-        self.direction = (0, 0)
         self.flash = False
 
     def choose_direction(self, pacman_tile, pacman_direction):
-        tx, ty = self.tile()
-        options = []
-        for dx, dy in DIRECTIONS:
-            if self.state != GhostState.EYES and (dx, dy) == (-self.direction[0], -self.direction[1]):
-                continue
-            nx, ny = tx + dx, ty + dy
-            if tile_is_wall(nx, ny):
-                continue
-            options.append((dx, dy))
+        i = maze_graph.index(*self.tile())
+        reverse = (-self.direction[0], -self.direction[1])
+        if self.state == GhostState.EYES:
+            options = maze_graph.exits[i]
+        else:
+            options = [d for d in maze_graph.exits[i] if d != reverse]
 
         if not options:
-            options.append((-self.direction[0], -self.direction[1]))
+            options = [reverse]
+
+        if len(options) == 1:
+            # a corridor, or a dead end: nothing to decide
+            self.direction = options[0]
+            return
 
         if self.state == GhostState.FRIGHTENED:
             self.direction = random.choice(options)
             return
 
-        target = self.get_target_tile(pacman_tile, pacman_direction)
+        if self.state == GhostState.EYES:
+            field = self.home
+        else:
+            field = maze_graph.field(self.get_target_tile(pacman_tile, pacman_direction))
         best_dir = options[0]
         best_dist = 9999
         for option in options:
-            nx = tx + option[0]
-            ny = ty + option[1]
-            dist = abs(target[0] - nx) + abs(target[1] - ny)
+            dist = field[maze_graph.neighbour(i, option)]
             if dist < best_dist:
                 best_dist = dist
                 best_dir = option
@@ -302,21 +405,30 @@ class Ghost:
         return target
 
     def step(self, pacman_tile, pacman_direction):
-        if self.at_center():
-            self.choose_direction(pacman_tile, pacman_direction)
-        dx, dy = self.direction
-        self.x += dx * self.current_speed()
-        self.y += dy * self.current_speed()
+        # Move in pieces that stop at every tile centre on the way, so a
+        # ghost faster than the tile spacing allows never skips a decision
+        remaining = self.current_speed()
+        while remaining > 0:
+            if self.at_center():
+                if self.state == GhostState.EYES and self.tile() == self.spawn_tile:
+                    self.state = GhostState.CHASE
+                    self.direction = (0, -1)
+                    remaining = min(remaining, self.current_speed())
+                self.choose_direction(pacman_tile, pacman_direction)
+            dx, dy = self.direction
+            if dx == 0 and dy == 0:
+                break
+            position = self.x if dx else self.y
+            to_center = ((TILE_SIZE // 2 - int(position)) * (dx + dy)) % TILE_SIZE or TILE_SIZE
+            move = min(remaining, to_center)
+            self.x += dx * move
+            self.y += dy * move
+            remaining -= move
 
         # Clamp inside maze bounds
         self.x = clamp(self.x, TILE_SIZE // 2, SCREEN_WIDTH - TILE_SIZE // 2)
         self.y = clamp(self.y, TILE_SIZE // 2, SCREEN_HEIGHT - TILE_SIZE // 2)
 
-        if self.state == GhostState.EYES and self.at_center():
-            if self.tile() == self.spawn_tile:
-                self.state = GhostState.CHASE
-                self.direction = (0, -1)
-
     def draw(self):
         px = int(self.x)
         py = int(self.y)
@@ -329,6 +441,17 @@ class Ghost:
             color = EYES_COLOR
         else:
             color = self.color
+
+        if self.colours.supported:
+            # only writes the palette when the colour changes (fright, flash, eyes)
+            self.colours.swap({GHOST_BODY: color})
+            if self.state == GhostState.FRIGHTENED:
+                frame = GHOST_FRIGHTENED_FRAME
+            else:
+                frame = (0 if self.direction[0] >= 0 else 1) + (0 if self.direction[1] >= 0 else 2)
+            screen.blit(self.sprites[frame], px - TILE_SIZE // 2, py - TILE_SIZE // 2)
+            return
+
         screen.brush = brushes.color(*color)
         screen.draw(shapes.circle(px, py, radius))
 
@@ -348,6 +471,7 @@ def frightened_time_remaining():
     return remaining if remaining > 0 else 0
 
 
+maze_graph = MazeGraph(MAZE)
 pellets = set()
 power_pellets = set()
 ghosts = []
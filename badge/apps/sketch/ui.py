@@ -1,5 +1,4 @@
-import math
-from badgeware import screen, PixelFont, SpriteSheet, shapes, brushes, io, Image
+from badgeware import screen, PixelFont, SpriteSheet, shapes, brushes, io, Image, fastmath
 
 screen.antialias = Image.X2
 canvas_area = (10, 15, 140, 85)
@@ -86,13 +85,14 @@ def draw_dial(angle, pos):
     ticks = 20
     for i in range(ticks):
         deg = angle + (i * 360 / ticks)
-        r = deg * (math.pi / 180.0)
+        s = fastmath.sin_deg(deg)
+        c = fastmath.cos_deg(deg)
 
         # tick inner and outer points
-        outer = (pos[0] + math.sin(r) * radius, pos[1] + math.cos(r) * radius)
+        outer = (pos[0] + s * radius, pos[1] + c * radius)
         inner = (
-            pos[0] + math.sin(r) * (radius - 3),
-            pos[1] + math.cos(r) * (radius - 3),
+            pos[0] + s * (radius - 3),
+            pos[1] + c * (radius - 3),
         )
 
         screen.draw(shapes.line(*inner, *outer, 1.5))
@@ -102,7 +102,7 @@ def draw_cursor(cursor):
     cx = int(cursor[0] + canvas_area[0])
     cy = int(cursor[1] + canvas_area[1])
     # draw the current cursor
-    i = (math.sin(io.ticks / 250) * 127) + 127
+    i = (fastmath.sin(io.ticks / 250) * 127) + 127
     screen.brush = brushes.xor(i, i, i)
     screen.draw(shapes.rectangle(cx + 2, cy, 2, 1))
     screen.draw(shapes.rectangle(cx - 3, cy, 2, 1))
@@ -37,6 +37,8 @@ class Snake:
         start_x = GRID_WIDTH // 2
         start_y = GRID_HEIGHT // 2
         self.segments = [(start_x, start_y), (start_x - 1, start_y), (start_x - 2, start_y)]
+        # the cells the snake covers, for lookups without scanning it
+        self.body = set(self.segments)
         self.direction = (1, 0)  # Moving right
         self.next_direction = (1, 0)
         self.grow_pending = 0
@@ -56,20 +58,24 @@ class Snake:
         new_head = ((head_x + dx) % GRID_WIDTH, (head_y + dy) % GRID_HEIGHT)
         
         # Check self collision
-        if new_head in self.segments:
+        if self.occupies(*new_head):
             return False
         
         # Add new head
         self.segments.insert(0, new_head)
+        self.body.add(new_head)
         
         # Remove tail unless growing
         if self.grow_pending > 0:
             self.grow_pending -= 1
         else:
-            self.segments.pop()
+            self.body.discard(self.segments.pop())
         
         return True
     
+    def occupies(self, x, y):
+        return (x, y) in self.body
+    
     def grow(self):
         self.grow_pending += 1
     
@@ -176,7 +182,7 @@ def play():
             snake.grow()
             commit.respawn()
             # Make sure commit doesn't spawn on snake
-            while (commit.x, commit.y) in snake.segments:
+            while snake.occupies(commit.x, commit.y):
                 commit.respawn()
     
     # Draw everything
@@ -4,10 +4,7 @@ import os
 sys.path.insert(0, "/system/apps/stocks")
 os.chdir("/system/apps/stocks")
 
-from badgeware import io, brushes, shapes, screen, PixelFont, run
-import network
-from urllib.urequest import urlopen
-import json
+from badgeware import io, brushes, shapes, screen, PixelFont, run, net, tasks, jsonstream, httpcache
 import gc
 
 # Load fonts
@@ -30,120 +27,79 @@ STOCKS = [
     ("AAPL", "Apple")
 ]
 
-# State
-WIFI_TIMEOUT = 60
-WIFI_PASSWORD = None
-WIFI_SSID = None
+# Fields read from the Yahoo Finance chart response
+PRICE = "chart.result.0.meta.regularMarketPrice"
+PREV_CLOSE = "chart.result.0.meta.chartPreviousClose"
+PREVIOUS_CLOSE = "chart.result.0.meta.previousClose"
+CLOSES = "chart.result.0.indicators.quote.0.close"
+QUOTE_FIELDS = [PRICE, PREV_CLOSE, PREVIOUS_CLOSE, CLOSES]
+
+# Quotes younger than this are reused from flash (e.g. when reopening the
+# app); just under the auto-refresh interval so every refresh asks Yahoo
+CACHE_TTL = 55
+
+# Symbols fetched at once; each request in flight holds a TLS session in RAM
+MAX_IN_FLIGHT = 2
 
-wlan = None
+# Layout
+ROW_TOP = 18
+ROW_HEIGHT = 20
+
+# State
 connected = False
-ticks_start = None
 stock_data = {}
 loading = False
 error_message = None
 last_update = None
 selected_stock = 0
 auto_refresh = True
+pending = 0             # symbols still being fetched by the current refresh
+dirty = set()           # rows that changed since they were last drawn
+full_redraw = True      # repaint everything next frame (after another screen)
+drawn_header = None     # header/status text currently on screen
+drawn_status = None
 
 
-def get_wifi_credentials():
-    global WIFI_PASSWORD, WIFI_SSID
-    
-    if WIFI_SSID is not None:
-        return True
-    
-    try:
-        sys.path.insert(0, "/")
-        from secrets import WIFI_PASSWORD, WIFI_SSID
-        sys.path.pop(0)
-    except ImportError:
-        WIFI_PASSWORD = None
-        WIFI_SSID = None
-    
-    return WIFI_SSID is not None
+def quote_url(symbol):
+    # Yahoo Finance query API
+    return f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}?interval=1d&range=1d"
 
 
-def wlan_start():
-    global wlan, ticks_start, connected, WIFI_PASSWORD, WIFI_SSID
+def parse_quote(fields):
+    """Turn the fields pulled out of a chart response into a row's data"""
+    if not fields:
+        raise ValueError("No chart data in response")
     
-    if ticks_start is None:
-        ticks_start = io.ticks
+    # Try to get the most recent price from meta or the actual data points
+    price = fields.get(PRICE)
+    if price is None:
+        # Get last non-None close price
+        closes = [p for p in fields.get(CLOSES) or [] if p is not None]
+        price = closes[-1] if closes else 0
     
-    if connected:
-        return True
+    prev_close = fields.get(PREV_CLOSE, fields.get(PREVIOUS_CLOSE, 0))
     
-    if wlan is None:
-        wlan = network.WLAN(network.STA_IF)
-        wlan.active(True)
-        
-        if wlan.isconnected():
-            return True
-        
-        wlan.connect(WIFI_SSID, WIFI_PASSWORD)
-        print("Connecting to WiFi...")
+    change = price - prev_close if (prev_close and price) else 0
+    change_pct = (change / prev_close * 100) if prev_close else 0
     
-    connected = wlan.isconnected()
-    
-    if io.ticks - ticks_start < WIFI_TIMEOUT * 1000:
-        if connected:
-            return True
-    elif not connected:
-        return False
-    
-    return True
+    return {
+        'price': price,
+        'prev_close': prev_close,
+        'change': change,
+        'change_pct': change_pct,
+        'success': True
+    }
 
 
-def fetch_stock_price(symbol):
+async def fetch_stock_price(symbol, ttl=CACHE_TTL):
     """Fetch stock price using Yahoo Finance API (free, no key needed)"""
     try:
-        # Yahoo Finance query API
-        url = f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}?interval=1d&range=1d"
-        
-        response = urlopen(url, headers={"User-Agent": "Mozilla/5.0"})
-        data = b""
-        chunk = bytearray(512)
-        
-        while True:
-            length = response.readinto(chunk)
-            if length == 0:
-                break
-            data += chunk[:length]
-        
-        result = json.loads(data.decode('utf-8'))
-        
-        # Extract price info
-        quote = result['chart']['result'][0]
-        meta = quote['meta']
-        
-        # Try to get the most recent price from indicators or meta
-        price = meta.get('regularMarketPrice')
-        if price is None:
-            # Try getting from the actual data points
-            indicators = quote.get('indicators', {})
-            quotes = indicators.get('quote', [{}])[0]
-            closes = quotes.get('close', [])
-            if closes:
-                # Get last non-None close price
-                price = [p for p in closes if p is not None][-1] if closes else 0
-            else:
-                price = 0
-        
-        prev_close = meta.get('chartPreviousClose', meta.get('previousClose', 0))
-        
-        print(f"{symbol}: price={price}, prev_close={prev_close}")
-        
-        change = price - prev_close if (prev_close and price) else 0
-        change_pct = (change / prev_close * 100) if prev_close else 0
-        
-        del response, data, chunk, result
-        gc.collect()
-        
-        return {
-            'price': price,
-            'change': change,
-            'change_pct': change_pct,
-            'success': True
-        }
+        # Only pull the handful of fields we display out of the response
+        fields = await net.fetch_fields_async(quote_url(symbol), QUOTE_FIELDS,
+                                              headers={"User-Agent": "Mozilla/5.0"}, ttl=ttl)
+        data = parse_quote(fields)
+        print(f"{symbol}: price={data['price']}, prev_close={data['prev_close']}")
+        return data
         
     except Exception as e:
         print(f"Error fetching {symbol}: {e}")
@@ -156,20 +112,55 @@ def fetch_stock_price(symbol):
         }
 
 
-def fetch_all_stocks():
-    global stock_data, loading, error_message, last_update
-    
-    loading = True
-    error_message = None
-    
+def load_cached_quotes():
+    """Show the quotes saved on flash by the last refresh straight away"""
     for symbol, name in STOCKS:
-        data = fetch_stock_price(symbol)
+        body = httpcache.peek(quote_url(symbol))
+        if body is None:
+            continue
+        try:
+            data = parse_quote(jsonstream.extract(body, QUOTE_FIELDS))
+        except Exception:
+            continue
+        data['name'] = name
+        data['stale'] = True  # until the refresh confirms it
         stock_data[symbol] = data
-        stock_data[symbol]['name'] = name
+        dirty.add(symbol)
+
+
+async def refresh_stock(job):
+    """Fetch one symbol and update its row as soon as it arrives"""
+    global pending, loading, last_update
+    symbol, name, ttl = job
+    data = await fetch_stock_price(symbol, ttl)
+    old = stock_data.get(symbol)
+    if not data['success'] and old and old.get('success'):
+        # keep showing the last known price rather than an error
+        data = old.copy()
+        data['stale'] = True
+    data['name'] = name
+    if data != old:
+        stock_data[symbol] = data
+        dirty.add(symbol)
     
-    loading = False
-    last_update = io.ticks
-    gc.collect()
+    pending -= 1
+    if pending == 0:
+        loading = False
+        last_update = io.ticks
+        gc.collect()
+
+
+def refresh_stocks(ttl=CACHE_TTL):
+    """Refetch every symbol in the background, MAX_IN_FLIGHT at a time"""
+    global loading, pending, error_message
+    loading = True
+    error_message = None
+    pending = len(STOCKS)
+    tasks.spawn_pool(refresh_stock, [(symbol, name, ttl) for symbol, name in STOCKS], MAX_IN_FLIGHT)
+
+
+# Show whatever was fetched last time while the first refresh runs
+load_cached_quotes()
 
 
 def format_price(price, symbol):
@@ -190,6 +181,10 @@ def draw_stock_item(symbol, name, y):
     
     data = stock_data[symbol]
     
+    # Clear just this row
+    screen.brush = background
+    screen.draw(shapes.rectangle(0, y, 160, ROW_HEIGHT))
+    
     if not data.get('success'):
         screen.font = small_font
         screen.brush = gray
@@ -211,12 +206,13 @@ def draw_stock_item(symbol, name, y):
         color = gray
         sign = ""
     
-    # Draw name
+    # Draw name (dimmed while the price is an old one)
     screen.font = small_font
-    screen.brush = white
+    screen.brush = gray if data.get('stale') else white
     screen.text(name, 5, y)
     
     # Draw price
+    screen.brush = white
     price_text = format_price(price, symbol)
     screen.text(price_text, 5, y + 9)
     
@@ -232,70 +228,90 @@ def center_text(text, y):
     screen.text(text, 80 - (w / 2), y)
 
 
-def draw_stocks():
-    # Clear screen
+def draw_loading():
+    """Full-screen loading message, used until the first quotes arrive"""
     screen.brush = background
     screen.draw(shapes.rectangle(0, 0, 160, 120))
-    
-    # Draw header
     screen.font = small_font
     screen.brush = phosphor
     screen.text("STOCKS", 2, 2)
-    
-    # Draw refresh indicator
+    screen.font = large_font
+    screen.brush = white
+    center_text("Loading", 35)
+    center_text("Stock Prices", 50)
+    screen.font = small_font
+    screen.brush = gray
+    # Animated dots
+    dots = "." * ((int(io.ticks / 500) % 3) + 1)
+    center_text(f"Please wait{dots}", 70)
+
+
+def header_text():
+    """Refresh countdown, or dots while a refresh is in flight"""
+    if loading:
+        return "..."
     if auto_refresh and last_update:
         elapsed = (io.ticks - last_update) / 1000
         if elapsed < 60:
-            screen.brush = gray
-            w, _ = screen.measure_text("60s")
-            screen.text(f"{int(60-elapsed)}s", 155 - w, 2)
+            return f"{int(60-elapsed)}s"
+    return ""
+
+
+def draw_stocks():
+    # Only repaint what changed: the list stays on screen between frames
+    global full_redraw, drawn_header, drawn_status
     
-    if loading:
-        screen.font = large_font
-        screen.brush = white
-        center_text("Loading", 35)
-        center_text("Stock Prices", 50)
-        screen.font = small_font
-        screen.brush = gray
-        # Animated dots
-        dots = "." * ((int(io.ticks / 500) % 3) + 1)
-        center_text(f"Please wait{dots}", 70)
-        
-    elif stock_data:
-        # Draw stock list
-        y = 18
-        for symbol, name in STOCKS:
-            draw_stock_item(symbol, name, y)
-            y += 20
+    if not stock_data:
+        draw_loading()
+        full_redraw = True
+        return
     
-    else:
-        # No data yet - show loading message
-        screen.font = large_font
-        screen.brush = white
-        center_text("Loading", 35)
-        center_text("Stock Prices", 50)
+    if full_redraw:
+        screen.brush = background
+        screen.draw(shapes.rectangle(0, 0, 160, 120))
         screen.font = small_font
-        screen.brush = gray
-        # Animated dots
-        dots = "." * ((int(io.ticks / 500) % 3) + 1)
-        center_text(f"Please wait{dots}", 70)
+        screen.brush = phosphor
+        screen.text("STOCKS", 2, 2)
+        dirty.update(symbol for symbol, _ in STOCKS)
+        drawn_header = drawn_status = None
+        full_redraw = False
     
-    # Draw status bar
+    # Draw refresh indicator
     screen.font = small_font
-    if connected:
-        screen.brush = phosphor
-        screen.text("B:Refresh", 2, 108)
-    else:
+    text = header_text()
+    if text != drawn_header:
+        screen.brush = background
+        screen.draw(shapes.rectangle(120, 0, 40, 12))
         screen.brush = gray
-        screen.text("Connecting...", 2, 108)
+        w, _ = screen.measure_text(text)
+        screen.text(text, 155 - w, 2)
+        drawn_header = text
+    
+    # Draw rows that changed
+    y = ROW_TOP
+    for symbol, name in STOCKS:
+        if symbol in dirty:
+            draw_stock_item(symbol, name, y)
+        y += ROW_HEIGHT
+    dirty.clear()
+    
+    # Draw status bar
+    status = "B:Refresh" if connected else "Connecting..."
+    if status != drawn_status:
+        screen.font = small_font
+        screen.brush = background
+        screen.draw(shapes.rectangle(0, 106, 160, 14))
+        screen.brush = phosphor if connected else gray
+        screen.text(status, 2, 108)
+        drawn_status = status
 
 
 def update():
     """Main update loop for stock price display"""
-    global connected, loading, last_update, auto_refresh
+    global connected, loading, last_update, auto_refresh, full_redraw
     
     # Handle WiFi connection
-    if not get_wifi_credentials():
+    if not net.has_credentials():
         screen.brush = background
         screen.draw(shapes.rectangle(0, 0, 160, 120))
         screen.font = large_font
@@ -304,13 +320,13 @@ def update():
         screen.font = small_font
         screen.brush = phosphor
         center_text("Edit secrets.py", 60)
+        full_redraw = True
         return
     
     # Try to connect if not connected
     if not connected:
-        connection_result = wlan_start()
-        if not connection_result and ticks_start and (io.ticks - ticks_start) >= WIFI_TIMEOUT * 1000:
-            # Only show error after timeout
+        connected = net.connect()
+        if net.failed():
             screen.brush = background
             screen.draw(shapes.rectangle(0, 0, 160, 120))
             screen.font = large_font
@@ -319,19 +335,20 @@ def update():
             screen.font = small_font
             screen.brush = phosphor
             center_text("Check WiFi settings", 60)
+            full_redraw = True
             return
     
     # Fetch stock data once connected
-    if connected and not stock_data and not loading:
-        fetch_all_stocks()
+    if connected and last_update is None and not loading:
+        refresh_stocks()
     
     # Manual refresh on B button
     if io.BUTTON_B in io.pressed and not loading:
-        fetch_all_stocks()
+        refresh_stocks(ttl=0)
     
     # Auto-refresh every 60 seconds
     if auto_refresh and last_update and (io.ticks - last_update) > 60000 and not loading:
-        fetch_all_stocks()
+        refresh_stocks()
     
     draw_stocks()
 
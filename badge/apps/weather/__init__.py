@@ -4,10 +4,7 @@ import os
 sys.path.insert(0, "/system/apps/weather")
 os.chdir("/system/apps/weather")
 
-from badgeware import io, brushes, shapes, screen, PixelFont, run
-import network
-from urllib.urequest import urlopen
-import json
+from badgeware import io, brushes, shapes, screen, PixelFont, run, net, tasks, text
 import gc
 
 # Load fonts
@@ -29,15 +26,15 @@ LONGITUDE = None
 LOCATION_NAME = "Detecting..."
 COUNTRY_CODE = None
 
+# How long (seconds) responses are reused from flash before asking again
+GEOCODE_TTL = 30 * 24 * 3600    # a city doesn't move
+IP_LOCATION_TTL = 6 * 3600      # but the badge does, between venues
+WEATHER_TTL = 290               # just under the 5 minute auto-refresh
+
 # State
-WIFI_TIMEOUT = 60
-WIFI_PASSWORD = None
-WIFI_SSID = None
-WEATHER_LOCATION = None  # Can be set in secrets.py to override detection
+WEATHER_LOCATION = net.secret("WEATHER_LOCATION")  # Can be set in secrets.py to override detection
 
-wlan = None
 connected = False
-ticks_start = None
 weather_data = None
 loading = False
 error_message = None
@@ -48,62 +45,7 @@ use_fahrenheit = False  # Will be set based on location
 use_mph = True  # Wind speed in mph (true) or kmh (false)
 
 
-def get_wifi_credentials():
-    """Load WiFi credentials and optional weather location from secrets.py"""
-    global WIFI_PASSWORD, WIFI_SSID, WEATHER_LOCATION
-    
-    if WIFI_SSID is not None:
-        return True
-    
-    try:
-        sys.path.insert(0, "/")
-        from secrets import WIFI_PASSWORD, WIFI_SSID
-        # Try to import optional weather location override
-        try:
-            from secrets import WEATHER_LOCATION as WL
-            WEATHER_LOCATION = WL
-        except ImportError:
-            pass
-        sys.path.pop(0)
-    except ImportError:
-        WIFI_PASSWORD = None
-        WIFI_SSID = None
-    
-    return WIFI_SSID is not None
-
-
-def wlan_start():
-    """Start WiFi connection"""
-    global wlan, ticks_start, connected, WIFI_PASSWORD, WIFI_SSID
-    
-    if ticks_start is None:
-        ticks_start = io.ticks
-    
-    if connected:
-        return True
-    
-    if wlan is None:
-        wlan = network.WLAN(network.STA_IF)
-        wlan.active(True)
-        
-        if wlan.isconnected():
-            return True
-        
-        wlan.connect(WIFI_SSID, WIFI_PASSWORD)
-        print("Connecting to WiFi...")
-    
-    connected = wlan.isconnected()
-    
-    if io.ticks - ticks_start < WIFI_TIMEOUT * 1000:
-        if connected:
-            return True
-    elif not connected:
-        return False
-    
-    return True
-
-
-def geocode_city(city, country=None):
+async def geocode_city(city, country=None):
     """Geocode a city name to coordinates using Nominatim (OpenStreetMap)"""
     try:
         # Build query
@@ -116,25 +58,15 @@ def geocode_city(city, country=None):
         url = f"https://nominatim.openstreetmap.org/search?q={query_encoded}&format=json&limit=1"
         
         print(f"Geocoding: {query}")
-        response = urlopen(url, headers={"User-Agent": "GitHubBadge"})
-        data = b""
-        chunk = bytearray(512)
-        
-        while True:
-            length = response.readinto(chunk)
-            if length == 0:
-                break
-            data += chunk[:length]
+        result = await net.fetch_fields_async(url, ["0.lat", "0.lon", "0.display_name"],
+                                              headers={"User-Agent": "GitHubBadge"}, ttl=GEOCODE_TTL)
         
-        results = json.loads(data.decode('utf-8'))
-        
-        if results and len(results) > 0:
-            result = results[0]
-            lat = float(result['lat'])
-            lon = float(result['lon'])
-            name = result['display_name'].split(',')[0]  # First part is usually the city
+        if "0.lat" in result and "0.lon" in result:
+            lat = float(result['0.lat'])
+            lon = float(result['0.lon'])
+            name = result.get('0.display_name', query).split(',')[0]  # First part is usually the city
             
-            del response, data, chunk, results, result
+            del result
             gc.collect()
             
             return lat, lon, name
@@ -147,7 +79,7 @@ def geocode_city(city, country=None):
         return None
 
 
-def detect_location():
+async def detect_location():
     """Auto-detect location from IP using ipapi.co (free, no key needed)
     
     Can be overridden by setting WEATHER_LOCATION in secrets.py to:
@@ -173,7 +105,7 @@ def detect_location():
                     # Geocode the city
                     city = WEATHER_LOCATION['city']
                     country = WEATHER_LOCATION.get('country')
-                    geocode_result = geocode_city(city, country)
+                    geocode_result = await geocode_city(city, country)
                     if geocode_result:
                         LATITUDE, LONGITUDE, LOCATION_NAME = geocode_result
                         COUNTRY_CODE = WEATHER_LOCATION.get('country', 'US')
@@ -186,7 +118,7 @@ def detect_location():
                     
             elif isinstance(WEATHER_LOCATION, str):
                 # Simple city name as string
-                geocode_result = geocode_city(WEATHER_LOCATION)
+                geocode_result = await geocode_city(WEATHER_LOCATION)
                 if geocode_result:
                     LATITUDE, LONGITUDE, LOCATION_NAME = geocode_result
                     COUNTRY_CODE = 'US'  # Default to US if not specified
@@ -203,7 +135,7 @@ def detect_location():
                     # City tuple: ("City", "Country") or just ("City",)
                     city = WEATHER_LOCATION[0]
                     country = WEATHER_LOCATION[1] if len(WEATHER_LOCATION) > 1 else None
-                    geocode_result = geocode_city(city, country)
+                    geocode_result = await geocode_city(city, country)
                     if geocode_result:
                         LATITUDE, LONGITUDE, LOCATION_NAME = geocode_result
                         COUNTRY_CODE = country if country else 'US'
@@ -234,17 +166,8 @@ def detect_location():
         # ipapi.co provides free IP geolocation
         url = "https://ipapi.co/json/"
         
-        response = urlopen(url, headers={"User-Agent": "GitHubBadge"})
-        data = b""
-        chunk = bytearray(512)
-        
-        while True:
-            length = response.readinto(chunk)
-            if length == 0:
-                break
-            data += chunk[:length]
-        
-        result = json.loads(data.decode('utf-8'))
+        result = await net.fetch_fields_async(url, ["latitude", "longitude", "city", "country_code"],
+                                              headers={"User-Agent": "GitHubBadge"}, ttl=IP_LOCATION_TTL)
         
         LATITUDE = result['latitude']
         LONGITUDE = result['longitude']
@@ -259,7 +182,7 @@ def detect_location():
         print(f"Location detected: {LOCATION_NAME} ({LATITUDE}, {LONGITUDE}), Country: {COUNTRY_CODE}")
         print(f"Units: {'Fahrenheit' if use_fahrenheit else 'Celsius'} + {'mph' if use_mph else 'kmh'}")
         
-        del response, data, chunk, result
+        del result
         gc.collect()
         
         return True
@@ -277,14 +200,15 @@ def detect_location():
         return False
 
 
-def fetch_weather():
+async def fetch_weather(ttl=WEATHER_TTL):
     """Fetch weather data using Open-Meteo API (free, no key needed)"""
     global weather_data, loading, error_message, last_update
     
     # Make sure we have a location first
     if LATITUDE is None or LONGITUDE is None:
-        if not detect_location():
+        if not await detect_location():
             error_message = "Location detection failed"
+            loading = False
             return
     
     loading = True
@@ -296,17 +220,7 @@ def fetch_weather():
         wind_unit = "mph" if use_mph else "kmh"
         url = f"https://api.open-meteo.com/v1/forecast?latitude={LATITUDE}&longitude={LONGITUDE}&current=temperature_2m,relative_humidity_2m,weather_code,wind_speed_10m&temperature_unit={temp_unit}&wind_speed_unit={wind_unit}&forecast_days=1"
         
-        response = urlopen(url, headers={"User-Agent": "GitHubBadge"})
-        data = b""
-        chunk = bytearray(512)
-        
-        while True:
-            length = response.readinto(chunk)
-            if length == 0:
-                break
-            data += chunk[:length]
-        
-        result = json.loads(data.decode('utf-8'))
+        result = await net.fetch_fields_async(url, ["current"], headers={"User-Agent": "GitHubBadge"}, ttl=ttl)
         
         # Extract current weather
         current = result['current']
@@ -322,7 +236,7 @@ def fetch_weather():
         unit = "F" if use_fahrenheit else "C"
         print(f"Weather: {weather_data['temp']}°{unit}, {weather_data['condition']}")
         
-        del response, data, chunk, result
+        del result
         gc.collect()
         
     except Exception as e:
@@ -334,6 +248,13 @@ def fetch_weather():
     last_update = io.ticks
 
 
+def refresh_weather(ttl=WEATHER_TTL):
+    """Fetch the weather in the background while update() keeps drawing"""
+    global loading
+    loading = True
+    tasks.spawn(fetch_weather(ttl))
+
+
 def get_weather_condition(code):
     """Convert WMO weather code to description"""
     # WMO Weather interpretation codes
@@ -384,10 +305,14 @@ def get_weather_icon(code):
         return "?"
 
 
-def center_text(text, y):
+def center_text(label, y, font):
     """Draw centered text"""
-    w, _ = screen.measure_text(text)
-    screen.text(text, 80 - (w / 2), y)
+    text.draw(text.layout(label, font, 160, align="center"), 0, y)
+
+
+def right_text(label, x, y, font):
+    """Draw text ending at x"""
+    text.draw(text.layout(label, font, align="right"), x, y)
 
 
 def draw_weather():
@@ -403,15 +328,13 @@ def draw_weather():
     
     # Draw location
     screen.brush = gray
-    w, _ = screen.measure_text(LOCATION_NAME)
     # Animate dots if detecting location
     if not location_detected:
         dots = "." * (int(io.ticks / 500) % 4)
         location_display = f"Detecting{dots}"
     else:
         location_display = LOCATION_NAME
-    w, _ = screen.measure_text(location_display)
-    screen.text(location_display, 155 - w, 2)
+    right_text(location_display, 155, 2, small_font)
     
     # Draw line separator
     screen.draw(shapes.rectangle(5, 13, 150, 1))
@@ -424,8 +347,7 @@ def draw_weather():
             mins = int((300 - elapsed) / 60)
             secs = int((300 - elapsed) % 60)
             timer_text = f"{mins}:{secs:02d}"
-            w, _ = screen.measure_text(timer_text)
-            screen.text(timer_text, 155 - w, 14)
+            right_text(timer_text, 155, 14, small_font)
     
     if loading:
         screen.font = large_font
@@ -433,48 +355,33 @@ def draw_weather():
         
         if not location_detected:
             # Show message while detecting location
-            center_text("Detecting", 35)
-            center_text("Location", 50)
-            screen.font = small_font
+            center_text("Detecting", 35, large_font)
+            center_text("Location", 50, large_font)
             screen.brush = gray
-            center_text("Please wait...", 70)
+            center_text("Please wait...", 70, small_font)
         else:
             # Show regular loading message
-            center_text("Loading...", 50)
+            center_text("Loading...", 50, large_font)
             # Animated dots
             dots = "." * ((int(io.ticks / 500) % 3) + 1)
-            center_text(dots, 65)
+            center_text(dots, 65, large_font)
     
     elif not location_detected:
         # Still detecting location (before first weather fetch)
         screen.font = large_font
         screen.brush = white
-        center_text("Detecting", 35)
-        center_text("Location", 50)
-        screen.font = small_font
+        center_text("Detecting", 35, large_font)
+        center_text("Location", 50, large_font)
         screen.brush = gray
-        center_text("Please wait...", 70)
+        center_text("Please wait...", 70, small_font)
             
     elif error_message:
         screen.font = small_font
         screen.brush = white
-        center_text("Weather Error", 40)
+        center_text("Weather Error", 40, small_font)
         screen.brush = gray
-        y = 55
         # Wrap error message
-        words = error_message.split()
-        line = ""
-        for word in words:
-            test = line + " " + word if line else word
-            w, _ = screen.measure_text(test)
-            if w < 140:
-                line = test
-            else:
-                center_text(line, y)
-                y += 10
-                line = word
-        if line:
-            center_text(line, y)
+        text.draw(text.layout(error_message, small_font, 140, align="center", wrap=True, line_height=10), 10, 55)
             
     elif weather_data:
         # Draw temperature (large)
@@ -482,12 +389,12 @@ def draw_weather():
         screen.brush = white
         unit = "F" if use_fahrenheit else "C"
         temp_text = f"{int(weather_data['temp'])}{unit}"
-        center_text(temp_text, 25)
+        center_text(temp_text, 25, large_font)
         
         # Draw condition
         screen.font = small_font
         screen.brush = phosphor
-        center_text(weather_data['condition'], 45)
+        center_text(weather_data['condition'], 45, small_font)
         
         # Draw details
         screen.brush = blue
@@ -497,8 +404,7 @@ def draw_weather():
         screen.text("Humidity:", 10, y)
         screen.brush = white
         humidity_text = f"{int(weather_data['humidity'])}%"
-        w, _ = screen.measure_text(humidity_text)
-        screen.text(humidity_text, 150 - w, y)
+        right_text(humidity_text, 150, y, small_font)
         
         # Wind speed
         y += 15
@@ -507,8 +413,7 @@ def draw_weather():
         screen.brush = white
         wind_unit_text = "mph" if use_mph else "km/h"
         wind_text = f"{int(weather_data['wind_speed'])} {wind_unit_text}"
-        w, _ = screen.measure_text(wind_text)
-        screen.text(wind_text, 150 - w, y)
+        right_text(wind_text, 150, y, small_font)
     
     # Draw status bar
     screen.font = small_font
@@ -523,8 +428,7 @@ def draw_weather():
             unit_text = f"C:{temp_unit}/{wind_unit}"
         else:
             unit_text = "C:Units"
-        w, _ = screen.measure_text(unit_text)
-        screen.text(unit_text, 155 - w, 108)
+        right_text(unit_text, 155, 108, small_font)
     else:
         screen.brush = gray
         screen.text("Connecting...", 2, 108)
@@ -535,35 +439,30 @@ def update():
     global connected, loading, last_update, auto_refresh, use_fahrenheit, use_mph
     
     # Handle WiFi connection
-    if not get_wifi_credentials():
+    if not net.has_credentials():
         screen.brush = background
         screen.draw(shapes.rectangle(0, 0, 160, 120))
-        screen.font = large_font
         screen.brush = white
-        center_text("No WiFi Config", 40)
-        screen.font = small_font
+        center_text("No WiFi Config", 40, large_font)
         screen.brush = phosphor
-        center_text("Edit secrets.py", 60)
+        center_text("Edit secrets.py", 60, small_font)
         return
     
     if not connected:
-        if not wlan_start():
+        connected = net.connect()
+        if net.failed():
             screen.brush = background
             screen.draw(shapes.rectangle(0, 0, 160, 120))
-            screen.font = large_font
             screen.brush = white
-            center_text("Connection Failed", 40)
-            screen.font = small_font
+            center_text("Connection Failed", 40, large_font)
             screen.brush = phosphor
-            center_text("Check WiFi settings", 60)
+            center_text("Check WiFi settings", 60, small_font)
             return
     
     # Fetch weather data once connected
     if connected and weather_data is None and not loading:
-        # Detect location first, then fetch weather
-        if not location_detected:
-            detect_location()
-        fetch_weather()
+        # Detects the location first if needed, then fetches the weather
+        refresh_weather()
     
     # Cycle through unit modes on C button: F+mph → C+mph → C+kmh → F+mph
     if io.BUTTON_C in io.pressed and weather_data and not loading:
@@ -579,15 +478,15 @@ def update():
             use_fahrenheit = True
             use_mph = True
         # Refetch weather data with new units
-        fetch_weather()
+        refresh_weather()
     
     # Manual refresh on B button
     if io.BUTTON_B in io.pressed and not loading:
-        fetch_weather()
+        refresh_weather(ttl=0)
     
     # Auto-refresh every 5 minutes (300 seconds)
     if auto_refresh and last_update and (io.ticks - last_update) > 300000 and not loading:
-        fetch_weather()
+        refresh_weather()
     
     draw_weather()
 
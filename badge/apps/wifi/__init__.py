@@ -4,7 +4,7 @@ import os
 sys.path.insert(0, "/system/apps/wifi")
 os.chdir("/system/apps/wifi")
 
-from badgeware import io, brushes, shapes, screen, PixelFont, run, Matrix
+from badgeware import io, brushes, shapes, screen, PixelFont, run, Matrix, text
 import network
 
 # Load fonts
@@ -138,38 +138,16 @@ def check_connection_status():
     return False
 
 
-def center_text(text, y):
+def center_text(label, y):
     """Draw centered text at specified y position"""
-    w, _ = screen.measure_text(text)
-    screen.text(text, 80 - (w / 2), y)
+    text.draw(text.layout(label, small_font, 160, align="center"), 0, y)
 
 
-def wrap_text(text, x, y, max_width):
+def wrap_text(label, x, y, max_width):
     """Wrap text to fit within max_width"""
-    words = text.split()
-    lines = []
-    current_line = ""
-    
-    for word in words:
-        test_line = current_line + (" " if current_line else "") + word
-        w, _ = screen.measure_text(test_line)
-        
-        if w <= max_width:
-            current_line = test_line
-        else:
-            if current_line:
-                lines.append(current_line)
-            current_line = word
-    
-    if current_line:
-        lines.append(current_line)
-    
-    # Draw lines
-    for line in lines:
-        screen.text(line, x, y)
-        y += 10
-    
-    return y
+    runs = text.layout(label, small_font, max_width, wrap=True, line_height=10)
+    text.draw(runs, x, y)
+    return y + len(runs) * 10
 
 
 def mask_password(password):
@@ -402,53 +402,32 @@ def fetch_wled_json(timeout=2, max_bytes=8192):
                     break
             # If header_end remains -1 we treat entire raw buffer as body below; additional reads occur in body loop.
             body = raw[header_end+4:] if header_end != -1 else raw
-            # Continue reading body
-            while len(body) < max_bytes:
-                try:
-                    chunk = s.recv(512)
-                except Exception:
-                    break
-                if not chunk:
-                    break
-                body += chunk
-            wled_connected = True
-            # Find '"state":' token and attempt to isolate braces
-            state_idx = body.find(b'"state"')
-            if state_idx == -1:
-                # Try full JSON parse as fallback (may be big)
-                import json
-                try:
-                    return json.loads(body.decode('utf-8', 'ignore'))
-                except Exception as e:
-                    last_error = str(e)
-                    status_message = "JSON full fail"
-                    return None
-            brace_start = body.find(b'{', state_idx)
-            if brace_start == -1:
-                status_message = "No state brace"
-                return None
-            depth = 0
-            end_pos = -1
-            for i in range(brace_start, len(body)):
-                b = body[i:i+1]
-                if b == b'{':
-                    depth += 1
-                elif b == b'}':
-                    depth -= 1
-                    if depth == 0:
-                        end_pos = i
-                        break
-            if end_pos == -1:
-                status_message = "State brace unterminated"
-                return None
-            state_slice = body[brace_start:end_pos+1]
-            import json
+            del raw
+            # Feed the body through the streaming extractor, keeping only 'state'
+            # and hanging up as soon as it has been parsed
+            from badgeware import jsonstream
+            extractor = jsonstream.Extractor(["state"])
+            received = len(body)
             try:
-                state_obj = json.loads(state_slice.decode('utf-8','ignore'))
+                extractor.feed(body)
+                while "state" not in extractor.result() and received < max_bytes:
+                    try:
+                        chunk = s.recv(512)
+                    except Exception:
+                        break
+                    if not chunk:
+                        break
+                    received += len(chunk)
+                    extractor.feed(chunk)
             except Exception as e:
                 last_error = truncate_message(str(e), max_len=10)
                 status_message = "State parse err"
                 return None
+            wled_connected = True
+            state_obj = extractor.close().get("state")
+            if state_obj is None:
+                status_message = "No state in JSON"
+                return None
             return {"state": state_obj}
         finally:
             try:
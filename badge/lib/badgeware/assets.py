@@ -0,0 +1,86 @@
+# Baked image assets written by tools/bake_assets.py.
+#
+# A PNG has to be inflated and unfiltered every time it is loaded, and
+# while that happens the compressed file and the decoded image are both in
+# RAM. `tools/bake_assets.py` writes a `.bimg` next to each PNG holding the
+# decoded pixels (RGB565, RGBA4444 or a 4/8-bit palette) behind a 16 byte
+# header, so loading one is a header read and a single `readinto()`:
+#
+#   from badgeware import assets
+#
+#   background = assets.load("assets/background.png")
+#
+# Baking only pays off in the simulator for now: the firmware's
+# `Image.load()` decodes PNGs and nothing else, and its `Image` can't be
+# built from raw pixels, so on the badge `load()` is `Image.load()` of the
+# PNG and baked files aren't shipped (they're git-ignored). The simulator's
+# `Image.load()` prefers a baked file on its own, skipping any whose source
+# CRC no longer matches its PNG. `info()` and `read()` are the format's
+# reader, for the simulator and tools and for firmware that learns it.
+
+import struct
+from badgeware import Image
+
+# Keep in sync with tools/bake_assets.py
+MAGIC = b"BIMG"
+VERSION = 1
+HEADER = "<4sBBHHHI"
+RGB565 = 0
+RGBA4444 = 1
+P8 = 2
+P4 = 3
+EXTENSION = ".bimg"
+
+HEADER_SIZE = struct.calcsize(HEADER)
+
+
+def baked_path(path):
+    """The baked file that goes with the PNG at `path`."""
+    dot = path.rfind(".")
+    if dot > path.rfind("/"):
+        path = path[:dot]
+    return path + EXTENSION
+
+
+def row_bytes(fmt, width):
+    if fmt == P4:
+        return (width + 1) // 2
+    if fmt == P8:
+        return width
+    return width * 2
+
+
+def info(path):
+    """(format, width, height, palette entries, source CRC) of a baked file."""
+    with open(path, "rb") as f:
+        header = f.read(HEADER_SIZE)
+    if len(header) != HEADER_SIZE:
+        raise ValueError(f"{path} is not a baked image")
+    magic, version, fmt, width, height, entries, crc = struct.unpack(HEADER, header)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a version {VERSION} baked image")
+    return fmt, width, height, entries, crc
+
+
+def read(path, buffer=None):
+    """(format, width, height, palette, pixels) of a baked file.
+
+    The palette and pixels are read with one `readinto()` into `buffer` (a
+    new bytearray if it is None or too small) and returned as memoryviews
+    of it, so a caller decoding many images can reuse one buffer.
+    """
+    fmt, width, height, entries, _ = info(path)
+    size = entries * 4 + row_bytes(fmt, width) * height
+    if buffer is None or len(buffer) < size:
+        buffer = bytearray(size)
+    view = memoryview(buffer)[:size]
+    with open(path, "rb") as f:
+        f.seek(HEADER_SIZE)
+        if f.readinto(view) != size:
+            raise ValueError(f"{path} is truncated")
+    return fmt, width, height, view[:entries * 4], view[entries * 4:]
+
+
+def load(path):
+    """The image at PNG `path`; the simulator uses an up to date baked copy."""
+    return Image.load(path)
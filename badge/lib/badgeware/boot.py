@@ -0,0 +1,120 @@
+# Boot phase timing and fast boot.
+#
+# main.py calls `mark()` as each phase of the boot finishes (cinematic,
+# menu import, first menu frame, ...) and `save()` once the first
+# interactive frame is up. Each boot becomes one line of `LOG_FILE`, which
+# keeps the last `LOG_BOOTS` boots so a regression shows up next to the
+# boots before it:
+#
+#   reset=0 main=412 cinematic=4630 menu_import=5210 menu_frame=5290
+#
+# Times are milliseconds since reset on the badge (`time.ticks_ms()`), and
+# since `start()` in the simulator's `--boot` mode.
+#
+# Fast boot is opt-in: with `"fast_boot": true` in /state/boot.json the
+# badge skips the cinematic and reopens the app that was running when it
+# was switched off. Holding any button while it boots goes to the menu.
+
+import sys
+import time
+import badgeware
+
+LOG_FILE = "/boot_times.log"
+LOG_BOOTS = 16
+
+settings = {
+    "fast_boot": False,
+    "last_app": None,
+}
+
+_phases = [("reset", 0)]
+_saved = False
+
+if sys.implementation.name == "micropython":
+    _epoch = 0
+
+    def _now_ms():
+        return time.ticks_ms()
+else:
+    _epoch = time.monotonic() * 1000
+
+    def _now_ms():
+        return int(time.monotonic() * 1000 - _epoch)
+
+
+def start():
+    """Begin timing a boot (the simulator; the badge counts from reset)."""
+    global _epoch, _saved
+    if sys.implementation.name != "micropython":
+        _epoch = time.monotonic() * 1000
+    _phases[:] = [("reset", 0)]
+    _saved = False
+
+
+def mark(phase):
+    """Record that `phase` has just finished."""
+    if not _saved:
+        _phases.append((phase, _now_ms()))
+
+
+def phases():
+    return list(_phases)
+
+
+def done():
+    """True once this boot's timings have been saved."""
+    return _saved
+
+
+def save():
+    """Append this boot's timings to LOG_FILE, dropping the oldest boots."""
+    global _saved
+    if _saved or not _phases:
+        return
+    _saved = True
+    line = " ".join("{}={}".format(phase, ms) for phase, ms in _phases)
+    print("boot: " + line)
+    try:
+        with open(LOG_FILE, "r") as f:
+            lines = [l for l in f.read().split("\n") if l]
+    except OSError:
+        lines = []
+    lines = lines[-(LOG_BOOTS - 1):] + [line]
+    try:
+        with open(LOG_FILE, "w") as f:
+            f.write("\n".join(lines) + "\n")
+    except OSError as e:
+        print("boot: failed to write {}: {}".format(LOG_FILE, e))
+
+
+def first_frame(update, phase):
+    """Wrap an update() so its first frame marks `phase` and saves the log."""
+    def wrapped():
+        result = update()
+        if not _saved:
+            mark(phase)
+            save()
+        return result
+    return wrapped
+
+
+def load_settings():
+    badgeware.State.load("boot", settings)
+    return settings
+
+
+def last_app():
+    """The app to reopen on a fast boot, or None."""
+    if not settings.get("fast_boot"):
+        return None
+    app = settings.get("last_app")
+    if app and badgeware.file_exists(app + "/__init__.py"):
+        return app
+    return None
+
+
+def remember_app(path):
+    """Note the app being launched (None for the menu), for the next fast boot."""
+    if settings.get("fast_boot") and settings.get("last_app") != path:
+        settings["last_app"] = path
+        badgeware.State.save("boot", settings)
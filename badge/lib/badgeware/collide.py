@@ -0,0 +1,200 @@
+# Collision queries on a uniform grid (a spatial hash).
+#
+# Testing every bullet against every block costs bullets x blocks box
+# tests a frame. A `SpatialHash` files each item under the grid cells its
+# box covers, so a query only looks at the items filed under the cells
+# the query box covers, a handful however many items there are:
+#
+#   from badgeware import collide
+#
+#   blocks = collide.SpatialHash(8)
+#   for block in wall:
+#       blocks.insert(block, block.bounds())
+#
+#   probe = [0, 0, 2, 4]    # reused every frame, like the result list
+#   hits = []
+#   for bullet in bullets:
+#       probe[0], probe[1] = bullet.x, bullet.y
+#       for block in blocks.query(probe, hits):
+#           blocks.remove(block)
+#
+# Boxes are (x, y, w, h), as tuples or lists. Queries return the items
+# whose boxes touch the query box, edges included, like the hand-written
+# tests in the games; `overlaps()` is the stricter test for boxes that
+# share some area. Given an `out` list, a query clears and fills it
+# instead of making a new one, so a frame loop that reuses its box and
+# result lists allocates nothing. `move()` only refiles an item when it
+# crosses into other cells. A `World` pairs a static layer, for things
+# that stay put until they are removed (shields, bricks), with a dynamic
+# one for things that move.
+
+
+def touching(a, b):
+    """True if boxes `a` and `b` overlap or meet at an edge."""
+    return not (a[0] + a[2] < b[0] or b[0] + b[2] < a[0]
+                or a[1] + a[3] < b[1] or b[1] + b[3] < a[1])
+
+
+def overlaps(a, b):
+    """True if boxes `a` and `b` share some area."""
+    return (a[0] < b[0] + b[2] and b[0] < a[0] + a[2]
+            and a[1] < b[1] + b[3] and b[1] < a[1] + a[3])
+
+
+def contains(box, x, y):
+    """True if (x, y) is inside `box` or on its edge."""
+    return box[0] <= x <= box[0] + box[2] and box[1] <= y <= box[1] + box[3]
+
+
+class SpatialHash:
+    """Items with boxes, found through the `cell`-pixel grid squares they cover."""
+
+    def __init__(self, cell=16):
+        self.cell = cell
+        self._cells = {}   # cell key -> items filed there (emptied lists are kept)
+        self._items = {}   # item -> [x, y, w, h, first col, first row, last col, last row]
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, item):
+        return item in self._items
+
+    def _file(self, item, entry):
+        cells = self._cells
+        for row in range(entry[5], entry[7] + 1):
+            for col in range(entry[4], entry[6] + 1):
+                bucket = cells.get(row * 65536 + col)
+                if bucket is None:
+                    cells[row * 65536 + col] = [item]
+                else:
+                    bucket.append(item)
+
+    def _unfile(self, item, entry):
+        cells = self._cells
+        for row in range(entry[5], entry[7] + 1):
+            for col in range(entry[4], entry[6] + 1):
+                cells[row * 65536 + col].remove(item)
+
+    def insert(self, item, box):
+        """File `item` under `box`, replacing any box it had."""
+        if item in self._items:
+            self.remove(item)
+        cell = self.cell
+        entry = [box[0], box[1], box[2], box[3],
+                 int(box[0] // cell), int(box[1] // cell),
+                 int((box[0] + box[2]) // cell), int((box[1] + box[3]) // cell)]
+        self._file(item, entry)
+        self._items[item] = entry
+
+    def remove(self, item):
+        """Forget `item`; False if it wasn't there."""
+        entry = self._items.pop(item, None)
+        if entry is None:
+            return False
+        self._unfile(item, entry)
+        return True
+
+    def move(self, item, box):
+        """Give `item` a new box; only refiled if it covers other cells."""
+        entry = self._items.get(item)
+        if entry is None:
+            self.insert(item, box)
+            return
+        cell = self.cell
+        x0 = int(box[0] // cell)
+        y0 = int(box[1] // cell)
+        x1 = int((box[0] + box[2]) // cell)
+        y1 = int((box[1] + box[3]) // cell)
+        if x0 != entry[4] or y0 != entry[5] or x1 != entry[6] or y1 != entry[7]:
+            self._unfile(item, entry)
+            entry[4] = x0
+            entry[5] = y0
+            entry[6] = x1
+            entry[7] = y1
+            self._file(item, entry)
+        entry[0] = box[0]
+        entry[1] = box[1]
+        entry[2] = box[2]
+        entry[3] = box[3]
+
+    def box(self, item):
+        entry = self._items[item]
+        return (entry[0], entry[1], entry[2], entry[3])
+
+    def clear(self):
+        self._cells.clear()
+        self._items.clear()
+
+    def query(self, box, out=None):
+        """The items whose boxes touch `box`, in the order they were filed.
+
+        With `out`, that list is cleared, filled and returned instead.
+        """
+        if out is None:
+            out = []
+        else:
+            del out[:]
+        self._collect(box, out)
+        return out
+
+    def _collect(self, box, out):
+        cell = self.cell
+        cells = self._cells
+        items = self._items
+        x0 = int(box[0] // cell)
+        x1 = int((box[0] + box[2]) // cell)
+        for row in range(int(box[1] // cell), int((box[1] + box[3]) // cell) + 1):
+            for col in range(x0, x1 + 1):
+                bucket = cells.get(row * 65536 + col)
+                if bucket:
+                    for item in bucket:
+                        if item not in out and touching(items[item], box):
+                            out.append(item)
+
+    def query_point(self, x, y, out=None):
+        """The items whose boxes contain (x, y); fills `out` like `query()`."""
+        if out is None:
+            out = []
+        else:
+            del out[:]
+        self._collect_point(x, y, out)
+        return out
+
+    def _collect_point(self, x, y, out):
+        items = self._items
+        bucket = self._cells.get(int(y // self.cell) * 65536 + int(x // self.cell))
+        if bucket:
+            for item in bucket:
+                if contains(items[item], x, y):
+                    out.append(item)
+
+
+class World:
+    """A static layer, kept until items are removed, and a dynamic one for things that move."""
+
+    def __init__(self, cell=16):
+        self.static = SpatialHash(cell)
+        self.dynamic = SpatialHash(cell)
+
+    def query(self, box, out=None):
+        if out is None:
+            out = []
+        else:
+            del out[:]
+        self.static._collect(box, out)
+        self.dynamic._collect(box, out)
+        return out
+
+    def query_point(self, x, y, out=None):
+        if out is None:
+            out = []
+        else:
+            del out[:]
+        self.static._collect_point(x, y, out)
+        self.dynamic._collect_point(x, y, out)
+        return out
+
+    def clear(self):
+        self.static.clear()
+        self.dynamic.clear()
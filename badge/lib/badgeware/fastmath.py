@@ -0,0 +1,106 @@
+# Table-driven trig, integer square roots and fixed-point helpers.
+#
+# The RP2350 runs MicroPython's floats in software, and `math.sin()` is a
+# few dozen float operations before the boxed result is allocated. Frame
+# loops that only need an angle to the nearest third of a degree (wobbles,
+# bobbing sprites, dial ticks) can look it up instead:
+#
+#   from badgeware import fastmath
+#
+#   y = 40 + fastmath.sin(io.ticks / 250) * 5        # radians, like math.sin
+#   x = cx + fastmath.cos_deg(angle) * radius        # degrees
+#   dx = fastmath.cos_turns(0.25)                    # turns: 1.0 is a full circle
+#
+# The table holds STEPS samples of a full turn as Q14 fixed point (ONE is
+# 1.0) in a 16-bit array, so `isin()`/`icos()` of an integer step stay in
+# small ints and never touch floats at all. Angles are rounded to the
+# nearest step: results are within 0.004 of math.sin/cos, plenty for
+# pixels, not for maths that accumulates.
+#
+# Fixed point: `to_fixed(1.5)` is 24576; `mul(a, b)` and `div(a, b)` keep
+# the scale, and `from_fixed()` gets a float back. `isqrt(n)` is the
+# integer square root, for distances compared or drawn in whole pixels.
+
+import math
+from array import array
+
+FRAC_BITS = 14
+ONE = 1 << FRAC_BITS           # 1.0 in fixed point
+STEPS = 1024                   # table entries per turn (a power of two)
+MASK = STEPS - 1
+QUARTER = STEPS // 4
+
+SIN = array("h", [int(math.floor(math.sin(2 * math.pi * i / STEPS) * ONE + 0.5)) for i in range(STEPS)])
+
+_PER_RADIAN = STEPS / (2 * math.pi)
+_PER_DEGREE = STEPS / 360.0
+_SCALE = 1.0 / ONE
+
+
+def isin(step):
+    """sin of `step`/STEPS of a turn, as fixed point."""
+    return SIN[step & MASK]
+
+
+def icos(step):
+    """cos of `step`/STEPS of a turn, as fixed point."""
+    return SIN[(step + QUARTER) & MASK]
+
+
+def sin(radians):
+    return SIN[int(math.floor(radians * _PER_RADIAN + 0.5)) & MASK] * _SCALE
+
+
+def cos(radians):
+    return SIN[(int(math.floor(radians * _PER_RADIAN + 0.5)) + QUARTER) & MASK] * _SCALE
+
+
+def sin_deg(degrees):
+    return SIN[int(math.floor(degrees * _PER_DEGREE + 0.5)) & MASK] * _SCALE
+
+
+def cos_deg(degrees):
+    return SIN[(int(math.floor(degrees * _PER_DEGREE + 0.5)) + QUARTER) & MASK] * _SCALE
+
+
+def sin_turns(turns):
+    return SIN[int(math.floor(turns * STEPS + 0.5)) & MASK] * _SCALE
+
+
+def cos_turns(turns):
+    return SIN[(int(math.floor(turns * STEPS + 0.5)) + QUARTER) & MASK] * _SCALE
+
+
+def isqrt(n):
+    """The largest int whose square is at most `n` (n >= 0)."""
+    if n < 0:
+        raise ValueError("isqrt of a negative number")
+    if n < 2:
+        return n
+    # Newton's method from a power of two above the root
+    x = 1
+    while x * x <= n:
+        x <<= 1
+    while True:
+        y = (x + n // x) >> 1
+        if y >= x:
+            return x
+        x = y
+
+
+def to_fixed(value):
+    return int(math.floor(value * ONE + 0.5))
+
+
+def from_fixed(value):
+    return value * _SCALE
+
+
+def mul(a, b):
+    """Product of two fixed-point numbers."""
+    return (a * b) >> FRAC_BITS
+
+
+def div(a, b):
+    """Quotient of two fixed-point numbers (floored, like //)."""
+    return (a << FRAC_BITS) // b
@@ -0,0 +1,172 @@
+# Frame sequence player for animations packed by tools/pack_frames.py.
+#
+# Blitting `Image.load(f"frames/frame_{i:04d}.png")` every frame opens and
+# inflates a whole PNG each time, even when the frame is the one already
+# on screen or differs from it in a small corner. A packed sequence has an
+# index that says, per frame, whether it is a key frame (its own PNG), a
+# delta (a PNG of just the rectangle that changed, drawn over the previous
+# frame) or a repeat (nothing to load). `FrameSequence` keeps the current
+# frame in an off-screen image and only loads what it must to get from the
+# frame it has to the one asked for:
+#
+#   from badgeware import frames
+#
+#   animation = frames.FrameSequence("frames")
+#
+#   def update():
+#       animation.draw(screen, 0, 0, frame)
+#
+# Seeking forward applies the deltas in between; seeking back (or far
+# ahead) restarts from the nearest key frame before the target, so the
+# packer's key interval bounds the cost of any jump. With `prefetch=n` the
+# next n frames' PNGs are decoded in the background (see
+# badgeware.prefetch) while the current one is on screen; `loop=True`
+# predicts the wrap back to the first frame.
+#
+# A key frame drawn over the whole screen skips the held image: it is
+# decoded straight into the framebuffer with `screen.load_into()`, and the
+# held image is only allocated once a delta needs it. The gain is in the
+# deltas, so an animation that changes all over every frame (the startup
+# intro) packs as key frames only and may as well keep calling
+# `screen.load_into()` itself.
+
+import struct
+from badgeware import Image, screen
+
+# Keep in sync with tools/pack_frames.py
+MAGIC = b"FSEQ"
+VERSION = 1
+HEADER = "<4sBBHHH"
+ENTRY = "<BxhhH"
+KEY = 0
+DELTA = 1
+REPEAT = 2
+NO_NAME = 0xFFFF
+
+INDEX_NAME = "index.seq"
+
+_HEADER_SIZE = struct.calcsize(HEADER)
+_ENTRY_SIZE = struct.calcsize(ENTRY)
+
+try:
+    import mmap
+except ImportError:
+    mmap = None
+
+
+def _read_index(path):
+    # the simulator maps the index instead of copying it into the heap
+    with open(path, "rb") as f:
+        if mmap is not None:
+            try:
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError, AttributeError):
+                f.seek(0)
+        return f.read()
+
+
+class FrameSequence:
+    """Plays a frame directory packed by tools/pack_frames.py."""
+
+    def __init__(self, directory, prefetch=0, loop=False):
+        self.directory = directory
+        self.loop = loop
+        data = _read_index(f"{directory}/{INDEX_NAME}")
+        magic, version, _, self.width, self.height, self.count = struct.unpack_from(HEADER, data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{directory}/{INDEX_NAME} is not a version {VERSION} frame sequence")
+        self._index = data
+        self._names = []
+        pos = _HEADER_SIZE + self.count * _ENTRY_SIZE
+        while pos < len(data):
+            length = data[pos]
+            self._names.append(bytes(data[pos + 1:pos + 1 + length]).decode())
+            pos += 1 + length
+
+        self.image = None     # allocated for the first frame that isn't loaded directly
+        self.current = None   # frame held in self.image
+        self.loads = 0        # PNGs decoded so far, for comparing with per-frame loading
+        self.prefetcher = None
+        if prefetch:
+            from badgeware.prefetch import ImagePrefetcher
+            self.prefetcher = ImagePrefetcher(depth=prefetch)
+
+    def entry(self, i):
+        """(kind, x, y, filename or None) for frame `i`."""
+        kind, x, y, name = struct.unpack_from(ENTRY, self._index, _HEADER_SIZE + i * _ENTRY_SIZE)
+        return kind, x, y, None if name == NO_NAME else self._names[name]
+
+    def _apply(self, i):
+        kind, x, y, name = self.entry(i)
+        if self.image is None:
+            self.image = Image(0, 0, self.width, self.height)
+        if kind != REPEAT:
+            path = f"{self.directory}/{name}"
+            if self.prefetcher is not None:
+                self.image.blit(self.prefetcher.get(path), x, y)
+            else:
+                self.image.blit(Image.load(path), x, y)
+            self.loads += 1
+        self.current = i
+
+    def _upcoming(self, i):
+        # the files the next few frames will need
+        paths = []
+        for step in range(1, self.count):
+            frame = i + step
+            if frame >= self.count:
+                if not self.loop:
+                    break
+                frame %= self.count
+            name = self.entry(frame)[3]
+            if name is not None:
+                paths.append(f"{self.directory}/{name}")
+                if len(paths) == self.prefetcher.depth:
+                    break
+        return paths
+
+    def seek(self, i):
+        """Bring the held image to frame `i` (clamped to the sequence)."""
+        i = max(0, min(int(i), self.count - 1))
+        if i == self.current:
+            return self.image
+        # the last key frame at or before i
+        start = i
+        while start > 0 and self.entry(start)[0] != KEY:
+            start -= 1
+        if self.current is None or self.current > i or self.current < start:
+            self._apply(start)
+        # then walk the deltas up to i
+        for frame in range(self.current + 1, i + 1):
+            self._apply(frame)
+        if self.prefetcher is not None:
+            self.prefetcher.prefetch(self._upcoming(i))
+        return self.image
+
+    def _key_for(self, i):
+        # the key frame that frame i shows unchanged, or None if deltas apply
+        while i > 0 and self.entry(i)[0] == REPEAT:
+            i -= 1
+        kind, _, _, name = self.entry(i)
+        return name if kind == KEY else None
+
+    def draw(self, target, x, y, i):
+        """Blit frame `i` onto `target` at (x, y)."""
+        i = max(0, min(int(i), self.count - 1))
+        if (target is screen and x == 0 and y == 0
+                and self.width == screen.width and self.height == screen.height):
+            name = self._key_for(i)
+            if name is not None:
+                screen.load_into(f"{self.directory}/{name}")
+                self.loads += 1
+                return
+        target.blit(self.seek(i), x, y)
+
+    def close(self):
+        if self.prefetcher is not None:
+            self.prefetcher.close()
+            self.prefetcher = None
+        if hasattr(self._index, "close"):
+            self._index.close()
+        self._index = None
+        self.image = None
@@ -0,0 +1,411 @@
+# On-flash HTTP response cache.
+#
+# Apps used to refetch everything on every launch (or, like the badge app,
+# keep a file forever once it existed). `urlopen()` here stores each body on
+# flash with a small metadata record: entries younger than `ttl` seconds are
+# served straight from flash, older ones are revalidated with If-None-Match /
+# If-Modified-Since so an unchanged resource costs a 304 instead of a full
+# download (and GitHub doesn't count 304s against the rate limit). If the
+# network is down, a stale copy is served rather than nothing.
+#
+#   from badgeware import httpcache, jsonstream
+#
+#   response = httpcache.urlopen(url, ttl=3600)
+#   fields = jsonstream.extract(response, ["name", "login"])
+#
+# The returned object reads like a `net.Response`; a fresh download is
+# written to flash as it is read and only replaces the cached copy once the
+# whole body has arrived. With `resume=True` an interrupted download keeps
+# its partial file plus a `.part` sidecar (the validators it was fetched
+# under), and the next attempt asks for the rest with a Range request.
+
+import os
+import json
+import time
+import hashlib
+import binascii
+from badgeware import net
+
+CACHE_DIR = "/cache"
+DEFAULT_TTL = 300    # seconds an entry is served without asking the server
+
+
+def _key(url):
+    return binascii.hexlify(hashlib.sha256(url.encode()).digest()[:8]).decode()
+
+
+def _meta_path(url):
+    return "{}/{}.meta".format(CACHE_DIR, _key(url))
+
+
+def _read_meta(url):
+    try:
+        with open(_meta_path(url), "r") as f:
+            return json.loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(url, meta):
+    try:
+        os.mkdir(CACHE_DIR)
+    except OSError:
+        pass
+    try:
+        with open(_meta_path(url), "w") as f:
+            f.write(json.dumps(meta))
+    except OSError as e:
+        print("httpcache: failed to write metadata for {}: {}".format(url, e))
+
+
+def _exists(path):
+    try:
+        open(path, "rb").close()
+        return True
+    except OSError:
+        return False
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class CachedBody:
+    """A cached body read back from flash."""
+
+    status = 200
+    status_code = 200
+
+    def __init__(self, path, meta, stale=False):
+        self.headers = {}
+        self.cached = True
+        self.stale = stale      # True if the server couldn't be reached
+        self.path = path
+        self.meta = meta
+        self._file = open(path, "rb")
+
+    def readinto(self, buf):
+        if self._file is None:
+            return 0
+        n = self._file.readinto(buf)
+        if not n:
+            self.close()
+            return 0
+        return n
+
+    def read(self, size=-1):
+        if self._file is None:
+            return b""
+        return self._file.read() if size < 0 else self._file.read(size)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class Entry:
+    """The cached state of one URL.
+
+    `urlopen()` is built on this; code with its own transport (such as
+    `net.fetch_fields_async()`) uses it directly: check `fresh()`, send
+    `conditional()` headers, then `open()` the body after a 304 or stream a
+    new one through `writer()`.
+    """
+
+    def __init__(self, url, path=None):
+        self.url = url
+        self.part = None
+        self.path = path or "{}/{}.body".format(CACHE_DIR, _key(url))
+        self.moved = False  # stored under another path, dropped once a new body is written
+        meta = _read_meta(url)
+        if meta is not None and meta.get("path") != self.path:
+            self.moved = True
+            meta = None
+        if meta is not None and not _exists(self.path):
+            meta = None
+        self.meta = meta
+
+    def fresh(self, ttl):
+        if self.meta is None:
+            return False
+        return 0 <= time.time() - self.meta.get("time", 0) < ttl
+
+    def conditional(self, headers=None):
+        """`headers` plus the validators for revalidating this entry."""
+        headers = dict(headers or {})
+        if self.meta is not None:
+            if self.meta.get("etag"):
+                headers["If-None-Match"] = self.meta["etag"]
+            if self.meta.get("last_modified"):
+                headers["If-Modified-Since"] = self.meta["last_modified"]
+        return headers
+
+    def open(self, stale=False):
+        return CachedBody(self.path, self.meta, stale)
+
+    def partial(self):
+        """Bytes already downloaded by an interrupted attempt (0 if none)."""
+        try:
+            with open(self.path + ".part", "r") as f:
+                part = json.loads(f.read())
+            with open(self.path + ".tmp", "rb") as f:
+                size = f.seek(0, 2)
+        except (OSError, ValueError):
+            return 0
+        if part.get("url") != self.url:
+            return 0
+        self.part = part
+        return size
+
+    def resume_headers(self, headers, offset):
+        """`headers` asking for the rest of a partial download."""
+        headers = dict(headers or {})
+        headers["Range"] = "bytes={}-".format(offset)
+        # only resume if the server still has the version we started on
+        headers["If-Range"] = self.part.get("etag") or self.part.get("last_modified")
+        return headers
+
+    def discard_partial(self):
+        _remove(self.path + ".tmp")
+        _remove(self.path + ".part")
+
+    def touch(self):
+        """Record a 304: the stored body is good for another ttl."""
+        self.meta["time"] = time.time()
+        _write_meta(self.url, self.meta)
+
+    def writer(self, headers, status=200, offset=0):
+        return Writer(self, headers, status, offset)
+
+
+class Writer:
+    """Streams a new body to a temp file and swaps it in once complete.
+
+    A 206 response whose Content-Range starts at `offset` is appended to
+    the partial file; a 200 starts the file over.
+    """
+
+    def __init__(self, entry, headers, status=200, offset=0):
+        self.entry = entry
+        self.headers = headers
+        if entry.path.startswith(CACHE_DIR + "/"):
+            try:
+                os.mkdir(CACHE_DIR)
+            except OSError:
+                pass
+        self._tmp = entry.path + ".tmp"
+        self._part = entry.path + ".part"
+        self._total = headers.get("content-length")
+        self._length = 0
+        if status == 206 and offset:
+            # Content-Range: bytes <start>-<end>/<total>
+            spec = headers.get("content-range", "").partition(" ")[2]
+            span, _, total = spec.partition("/")
+            if span.partition("-")[0] == str(offset):
+                self._length = offset
+                self._total = total if total != "*" else None
+        elif status == 206:
+            entry.discard_partial()
+        if status == 206 and not self._length:
+            raise OSError("unexpected range in response for " + entry.url)
+        if self._length:
+            self._file = open(self._tmp, "ab")
+        else:
+            self._file = open(self._tmp, "wb")
+            self._start_part()
+
+    def _start_part(self):
+        # Without a validator a later Range request could splice two
+        # different versions together, so such downloads just restart.
+        etag = self.headers.get("etag")
+        last_modified = self.headers.get("last-modified")
+        if not (etag or last_modified):
+            _remove(self._part)
+            return
+        try:
+            with open(self._part, "w") as f:
+                f.write(json.dumps({"url": self.entry.url, "etag": etag, "last_modified": last_modified}))
+        except OSError:
+            pass
+
+    def write(self, data):
+        self._file.write(data)
+        self._length += len(data)
+
+    def commit(self):
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        if self._total is not None and int(self._total) != self._length:
+            # cut off mid-body: keep the old copy, and what arrived if resumable,
+            # and fail so the caller doesn't take the old copy for the new one
+            self.abort(resume=self._length < int(self._total))
+            raise OSError("incomplete body for {}: {} of {} bytes".format(
+                self.entry.url, self._length, self._total))
+        entry = self.entry
+        if entry.moved:
+            invalidate(entry.url)  # the body moved; drop the old copy
+            entry.moved = False
+        _remove(self._part)
+        _remove(entry.path)
+        os.rename(self._tmp, entry.path)
+        entry.meta = {
+            "url": entry.url,
+            "path": entry.path,
+            "time": time.time(),
+            "etag": self.headers.get("etag"),
+            "last_modified": self.headers.get("last-modified"),
+            "length": self._length,
+        }
+        _write_meta(entry.url, entry.meta)
+
+    def abort(self, resume=False):
+        """Stop writing; with `resume` keep what arrived for a Range request."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if not (resume and self._length and _exists(self._part)):
+            _remove(self._tmp)
+            _remove(self._part)
+
+
+class CachingResponse:
+    """A network response that copies its body to flash as it is read."""
+
+    cached = False
+    stale = False
+
+    def __init__(self, response, entry, offset=0, resume=False):
+        self.status = getattr(response, "status", 200)
+        self.status_code = self.status
+        self.headers = getattr(response, "headers", {})
+        self.path = entry.path
+        self._response = response
+        try:
+            self._writer = entry.writer(self.headers, self.status, offset)
+        except Exception:
+            response.close()
+            raise
+        self._resume = resume
+        self.offset = self._writer._length   # bytes already on flash before this response
+
+    def readinto(self, buf):
+        if self._response is None:
+            return 0
+        n = self._response.readinto(buf)
+        if not n:
+            self._response.close()
+            self._response = None
+            self._writer.commit()
+            return 0
+        self._writer.write(memoryview(buf)[:n])
+        return n
+
+    def read(self, size=-1):
+        out = bytearray()
+        chunk = bytearray(512)
+        while size < 0 or len(out) < size:
+            n = self.readinto(chunk)
+            if not n:
+                break
+            out.extend(memoryview(chunk)[:n])
+        return bytes(out)
+
+    def close(self):
+        # closing before the end discards the partial download, unless resumable
+        if self._response is not None:
+            self._response.close()
+            self._response = None
+            self._writer.abort(self._resume)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def urlopen(url, headers=None, ttl=DEFAULT_TTL, path=None, refresh=False, resume=False):
+    """Open `url` through the cache.
+
+    `path` stores the body at a fixed location (e.g. "/avatar.png") rather
+    than in CACHE_DIR. `refresh=True` (or `ttl=0`) always checks with the
+    server, though an unchanged resource is still not downloaded again.
+    `resume=True` keeps an interrupted download for the next call to pick
+    up. The result has `.cached` (served from flash) and `.stale` (served
+    from flash because the request failed) flags; a download also has
+    `.offset`, the number of bytes resumed rather than fetched.
+    """
+    entry = Entry(url, path)
+    if not refresh and entry.fresh(ttl):
+        return entry.open()
+
+    offset = entry.partial() if resume else 0
+    if offset:
+        request_headers = entry.resume_headers(headers, offset)
+    else:
+        request_headers = entry.conditional(headers)
+
+    try:
+        response = net.urlopen(url, headers=request_headers)
+    except Exception as e:
+        if offset and getattr(e, "status", None) == 416:
+            # the partial file is no good for this server; start over
+            entry.discard_partial()
+            return urlopen(url, headers, ttl, path, refresh, resume)
+        if entry.meta is None:
+            raise
+        print("httpcache: serving stale {} ({})".format(url, e))
+        return entry.open(stale=True)
+
+    if getattr(response, "status", 200) == 304 and entry.meta is not None:
+        response.close()
+        entry.touch()
+        return entry.open()
+
+    return CachingResponse(response, entry, offset, resume)
+
+
+def is_fresh(url, ttl=DEFAULT_TTL, path=None):
+    """True if `url` would currently be served from flash without a request."""
+    meta = _read_meta(url)
+    if meta is None or not _exists(meta.get("path", "")):
+        return False
+    if path is not None and meta.get("path") != path:
+        return False
+    return 0 <= time.time() - meta.get("time", 0) < ttl
+
+
+def peek(url, path=None):
+    """The stored body for `url` whatever its age, or None; never asks the server."""
+    entry = Entry(url, path)
+    return entry.open() if entry.meta is not None else None
+
+
+def invalidate(url):
+    """Forget `url`; the next urlopen() will download it again."""
+    meta = _read_meta(url)
+    if meta is not None and meta.get("path", "").startswith(CACHE_DIR + "/"):
+        _remove(meta["path"])
+    _remove(_meta_path(url))
+
+
+def clear():
+    """Drop every entry stored in CACHE_DIR."""
+    try:
+        names = os.listdir(CACHE_DIR)
+    except OSError:
+        return
+    for name in names:
+        _remove("{}/{}".format(CACHE_DIR, name))
@@ -0,0 +1,325 @@
+# Streaming, path-selective JSON extraction.
+#
+# `json.loads` needs the whole response in RAM and then builds a dict tree
+# for all of it, even when an app only wants two numbers out of a 30 KB
+# document. `extract()` instead feeds the response through a small state
+# machine as chunks arrive, skips every value that isn't on the way to a
+# requested path, and only materialises the values that were asked for.
+#
+#   from badgeware import jsonstream, net
+#
+#   found = jsonstream.extract(net.urlopen(url), [
+#       "chart.result.0.meta.regularMarketPrice",
+#       "chart.result.0.meta.chartPreviousClose",
+#   ])
+#   price = found.get("chart.result.0.meta.regularMarketPrice")
+#
+# Paths are dot separated object keys and array indexes. A `*` segment
+# matches every key or index at that level, and its result is a list of the
+# matching values in document order. Paths that don't occur in the document
+# are missing from the result.
+#
+# For long arrays, pass `callback=fn` to have `fn(name, path, value)` called
+# for each `*` match instead of collecting them; `path` is a tuple of the
+# actual keys and indexes (as strings), so the matches can be told apart.
+
+import json
+
+CHUNK_SIZE = 512
+
+# parser modes
+_NORMAL = 0
+_KEY = 1
+_SCAN = 2
+
+# frame states
+_EXPECT_KEY = 0
+_EXPECT_COLON = 1
+_EXPECT_VALUE = 2
+_EXPECT_COMMA = 3
+
+_WHITESPACE = b" \t\r\n"
+_QUOTE = 0x22
+_BACKSLASH = 0x5C
+
+
+class Extractor:
+    """Incremental extractor; `feed()` it chunks, then read `result()`."""
+
+    def __init__(self, paths, callback=None):
+        self._callback = callback
+        self._wanted = {}
+        self._results = {}
+        for path in paths:
+            parts = tuple(path.split(".")) if path else ()
+            self._wanted[parts] = path
+            if "*" in parts and callback is None:
+                self._results[path] = []
+        self._prefixes = set()
+        for parts in self._wanted:
+            for i in range(len(parts)):
+                self._prefixes.add(parts[:i])
+
+        # stack of [is_object, key, state]; the key of an array is its index
+        self._stack = []
+        self._root_done = False
+        self._mode = _NORMAL
+        self._key = bytearray()
+        self._key_escaped = False
+        # value scanner state
+        self._capture = None   # bytearray while capturing, else None
+        self._target = None    # path tuple of the value being captured
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._scalar = False
+
+    # -- path matching -----------------------------------------------------
+
+    def _path(self):
+        return tuple(str(frame[1]) for frame in self._stack)
+
+    def _match(self, path):
+        """2 = capture this value, 1 = descend into it, 0 = skip it."""
+        if path in self._wanted:
+            return 2
+        if path in self._prefixes:
+            return 1
+        if not self._wanted:
+            return 0
+        # slower path for wildcard segments
+        found = 0
+        for parts in self._wanted:
+            if len(parts) < len(path):
+                continue
+            for want, got in zip(parts, path):
+                if want != "*" and want != got:
+                    break
+            else:
+                if len(parts) == len(path):
+                    return 2
+                found = 1
+        return found
+
+    def _store(self, path, raw):
+        value = json.loads(bytes(raw))
+        for parts, name in self._wanted.items():
+            if len(parts) < len(path):
+                continue
+            for want, got in zip(parts, path):
+                if want != "*" and want != got:
+                    break
+            else:
+                # paths below a captured value are looked up in it directly
+                for subpath, found in _walk(value, parts[len(path):], path):
+                    if "*" not in parts:
+                        self._results[name] = found
+                    elif self._callback is not None:
+                        self._callback(name, subpath, found)
+                    else:
+                        self._results[name].append(found)
+
+    # -- value boundaries ----------------------------------------------------
+
+    def _value_done(self):
+        if self._stack:
+            self._stack[-1][2] = _EXPECT_COMMA
+        else:
+            self._root_done = True
+
+    def _start_value(self, c):
+        """Called in NORMAL mode with the first byte of a value."""
+        path = self._path()
+        match = self._match(path)
+        if match == 1 and c in (0x7B, 0x5B):  # { or [
+            self._stack.append([c == 0x7B, 0, _EXPECT_KEY if c == 0x7B else _EXPECT_VALUE])
+            return
+        self._mode = _SCAN
+        self._capture = bytearray() if match == 2 else None
+        self._target = path
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._scalar = c not in (0x7B, 0x5B, _QUOTE)
+        if self._scalar:
+            self._capture_byte(c)
+        else:
+            self._scan_byte(c)
+
+    def _capture_byte(self, c):
+        if self._capture is not None:
+            self._capture.append(c)
+
+    def _end_scan(self):
+        if self._capture is not None:
+            self._store(self._target, self._capture)
+        self._capture = None
+        self._mode = _NORMAL
+        self._value_done()
+
+    def _scan_byte(self, c):
+        """Advance the value scanner by one byte outside of string runs."""
+        self._capture_byte(c)
+        if c == _QUOTE:
+            self._in_string = True
+            if self._depth == 0 and not self._scalar:
+                # a top-level string value: finished when the string closes
+                self._depth = -1
+        elif c in (0x7B, 0x5B):
+            self._depth += 1
+        elif c in (0x7D, 0x5D):
+            self._depth -= 1
+            if self._depth == 0:
+                self._end_scan()
+
+    # -- feeding -------------------------------------------------------------
+
+    def feed(self, chunk):
+        i = 0
+        n = len(chunk)
+        while i < n:
+            mode = self._mode
+
+            if mode == _SCAN and self._in_string:
+                # jump to the next quote or backslash in one go
+                if self._escape:
+                    self._capture_byte(chunk[i])
+                    self._escape = False
+                    i += 1
+                    continue
+                q = chunk.find(b'"', i)
+                b = chunk.find(b"\\", i)
+                j = q if b < 0 or (0 <= q < b) else b
+                if j < 0:
+                    if self._capture is not None:
+                        self._capture.extend(chunk[i:])
+                    return
+                if self._capture is not None:
+                    self._capture.extend(chunk[i:j + 1])
+                if j == b:
+                    self._escape = True
+                else:
+                    self._in_string = False
+                    if self._depth == -1:
+                        self._end_scan()
+                i = j + 1
+                continue
+
+            c = chunk[i]
+
+            if mode == _SCAN:
+                if self._scalar:
+                    if c in b",}]" or c in _WHITESPACE:
+                        self._end_scan()
+                        continue  # reprocess the delimiter in NORMAL mode
+                    self._capture_byte(c)
+                else:
+                    self._scan_byte(c)
+                i += 1
+                continue
+
+            if mode == _KEY:
+                if self._key_escaped:
+                    self._key.append(c)
+                    self._key_escaped = False
+                elif c == _BACKSLASH:
+                    self._key.append(c)
+                    self._key_escaped = True
+                elif c == _QUOTE:
+                    frame = self._stack[-1]
+                    if _BACKSLASH in self._key:
+                        frame[1] = json.loads(b'"' + bytes(self._key) + b'"')
+                    else:
+                        frame[1] = bytes(self._key).decode()
+                    frame[2] = _EXPECT_COLON
+                    self._mode = _NORMAL
+                else:
+                    self._key.append(c)
+                i += 1
+                continue
+
+            # NORMAL mode
+            i += 1
+            if c in _WHITESPACE:
+                continue
+            if self._root_done:
+                continue
+            if not self._stack:
+                self._start_value(c)
+                continue
+            frame = self._stack[-1]
+            state = frame[2]
+            if c in (0x7D, 0x5D):  # } or ]
+                self._stack.pop()
+                self._value_done()
+            elif state == _EXPECT_KEY and c == _QUOTE:
+                self._key = bytearray()
+                self._key_escaped = False
+                self._mode = _KEY
+            elif state == _EXPECT_COLON and c == 0x3A:  # :
+                frame[2] = _EXPECT_VALUE
+            elif state == _EXPECT_COMMA and c == 0x2C:  # ,
+                if frame[0]:
+                    frame[2] = _EXPECT_KEY
+                else:
+                    frame[1] += 1
+                    frame[2] = _EXPECT_VALUE
+            elif state == _EXPECT_VALUE:
+                self._start_value(c)
+            else:
+                raise ValueError("unexpected {!r} in JSON".format(chr(c)))
+
+    def close(self):
+        # a bare scalar document (or trailing scalar) ends at EOF
+        if self._mode == _SCAN and self._scalar:
+            self._end_scan()
+        return self._results
+
+    def result(self):
+        return self._results
+
+
+def _walk(value, parts, path):
+    """Yield (path, value) for `parts` inside an already decoded value."""
+    if not parts:
+        yield path, value
+        return
+    head, rest = parts[0], parts[1:]
+    if isinstance(value, dict):
+        if head == "*":
+            for key, item in value.items():
+                yield from _walk(item, rest, path + (key,))
+        elif head in value:
+            yield from _walk(value[head], rest, path + (head,))
+    elif isinstance(value, list):
+        if head == "*":
+            for index, item in enumerate(value):
+                yield from _walk(item, rest, path + (str(index),))
+        elif head.isdigit() and int(head) < len(value):
+            yield from _walk(value[int(head)], rest, path + (head,))
+
+
+def extract(source, paths, chunk_size=CHUNK_SIZE, callback=None):
+    """Pull `paths` out of a JSON document without loading all of it.
+
+    `source` may be bytes, or anything with `readinto()` (such as a
+    response from `net.urlopen()` or a file opened in "rb" mode), which is
+    read `chunk_size` bytes at a time and closed afterwards. Returns a dict
+    of path -> value.
+    """
+    extractor = Extractor(paths, callback)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        extractor.feed(bytes(source))
+        return extractor.close()
+    chunk = bytearray(chunk_size)
+    view = memoryview(chunk)
+    try:
+        while True:
+            n = source.readinto(chunk)
+            if not n:
+                break
+            extractor.feed(bytes(view[:n]))
+    finally:
+        if hasattr(source, "close"):
+            source.close()
+    return extractor.close()
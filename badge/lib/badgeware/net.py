@@ -0,0 +1,670 @@
+# Shared networking service for badge apps.
+#
+# Every networked app used to carry its own copy of the secrets loading and
+# WLAN start-up code, and built responses with `data += chunk[:length]`,
+# which copies the whole body again for every 512 bytes received. This module
+# keeps one WiFi connection for everybody, receives into a preallocated
+# buffer that grows by doubling, and keeps HTTP/1.1 connections open so
+# repeated requests to the same host skip the TCP and TLS handshakes.
+#
+#   from badgeware import net
+#
+#   def update():
+#       if not net.connect():
+#           ...draw "connecting" (or an error once net.failed())
+#       buf, length = net.fetch_into(url)
+#       data = json.loads(bytes(memoryview(buf)[:length]))
+
+import sys
+import socket
+import network
+from badgeware import io
+
+try:
+    import ssl
+except ImportError:
+    ssl = None
+
+WIFI_TIMEOUT = 60        # seconds before a connection attempt is declared failed
+TIMEOUT = 15             # socket timeout for HTTP requests, in seconds
+BUFFER_SIZE = 1024       # initial size of the shared receive buffer
+MAX_REDIRECTS = 3
+KEEP_ALIVE = True        # False routes requests through urllib.urequest instead
+
+_secrets = None
+_wlan = None
+_connect_started = None
+_buffer = None
+_connections = {}        # (host, port, tls) -> idle keep-alive stream
+_async_connections = {}  # (host, port, tls) -> list of idle (reader, writer)
+_tls = None
+
+
+# ---------------------------------------------------------------------------
+# Secrets and WiFi
+# ---------------------------------------------------------------------------
+
+def secrets():
+    """Return the /secrets.py module, or None if the badge has none."""
+    global _secrets
+    if _secrets is None:
+        sys.path.insert(0, "/")
+        try:
+            import secrets as module
+            _secrets = module
+        except ImportError:
+            _secrets = False
+        finally:
+            if sys.path and sys.path[0] == "/":
+                sys.path.pop(0)
+    return _secrets or None
+
+
+def secret(name, default=None):
+    """Look up a single setting from /secrets.py."""
+    return getattr(secrets(), name, default)
+
+
+def has_credentials():
+    return bool(secret("WIFI_SSID"))
+
+
+def wlan():
+    """The shared station interface, activated on first use."""
+    global _wlan
+    if _wlan is None:
+        _wlan = network.WLAN(network.STA_IF)
+        _wlan.active(True)
+    return _wlan
+
+
+def connect():
+    """Start, or keep polling, the shared WiFi connection.
+
+    Safe to call every frame; returns True once the badge is connected.
+    """
+    global _connect_started
+    interface = wlan()
+    if interface.isconnected():
+        return True
+    if _connect_started is None:
+        _connect_started = io.ticks
+        interface.connect(secret("WIFI_SSID"), secret("WIFI_PASSWORD"))
+        print("Connecting to WiFi...")
+    return interface.isconnected()
+
+
+def is_connected():
+    return _wlan is not None and _wlan.isconnected()
+
+
+def failed():
+    """True once WIFI_TIMEOUT has passed without getting connected."""
+    if _connect_started is None or is_connected():
+        return False
+    return io.ticks - _connect_started >= WIFI_TIMEOUT * 1000
+
+
+def reset():
+    """Forget a failed attempt so the next connect() starts a fresh one."""
+    global _connect_started
+    _connect_started = None
+
+
+# ---------------------------------------------------------------------------
+# HTTP
+# ---------------------------------------------------------------------------
+
+def _split_url(url):
+    scheme, _, rest = url.partition("://")
+    host, slash, path = rest.partition("/")
+    tls = scheme == "https"
+    port = 443 if tls else 80
+    if ":" in host:
+        host, port = host.split(":", 1)
+        port = int(port)
+    return host, port, tls, slash + path if slash else "/"
+
+
+def _tls_context():
+    global _tls
+    if _tls is None:
+        if hasattr(ssl, "create_default_context"):
+            _tls = ssl.create_default_context()
+        else:
+            # MicroPython: match urllib.urequest, which doesn't verify certificates
+            _tls = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+            _tls.verify_mode = ssl.CERT_NONE
+    return _tls
+
+
+def _open(host, port, tls):
+    addr = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)[0][-1]
+    sock = socket.socket()
+    sock.settimeout(TIMEOUT)
+    try:
+        sock.connect(addr)
+        if tls:
+            sock = _tls_context().wrap_socket(sock, server_hostname=host)
+    except Exception:
+        sock.close()
+        raise
+    if sys.implementation.name == "micropython":
+        return sock  # already a stream with readline/readinto/write
+    # CPython (simulator): the file keeps the socket open until it is closed
+    stream = sock.makefile("rwb")
+    sock.close()
+    return stream
+
+
+def _close(stream):
+    try:
+        stream.close()
+    except Exception:
+        pass
+
+
+def close_all():
+    """Drop every idle keep-alive connection."""
+    for stream in _connections.values():
+        _close(stream)
+    _connections.clear()
+    for idle in _async_connections.values():
+        for _, writer in idle:
+            _close_async(writer)
+    _async_connections.clear()
+
+
+class HTTPError(OSError):
+    """A 4xx/5xx response; the code is in `status`."""
+
+    def __init__(self, status, url):
+        super().__init__("HTTP {} for {}".format(status, url))
+        self.status = status
+
+
+class Response:
+    """A streamed HTTP response body.
+
+    Read it with `readinto()` until it returns 0; the connection goes back to
+    the keep-alive pool once the body has been fully read. A body cut short
+    of its Content-Length raises OSError instead of ending early.
+    """
+
+    def __init__(self, stream, key, status, headers):
+        self.status = status
+        self.status_code = status
+        self.headers = headers
+        self._stream = stream
+        self._key = key
+        self._chunked = "chunked" in headers.get("transfer-encoding", "")
+        length = headers.get("content-length")
+        empty = status in (204, 304) or status < 200
+        if self._chunked or empty:
+            self._remaining = 0  # chunk sizes are read as we go
+        else:
+            self._remaining = int(length) if length is not None else -1  # -1: until close
+        self._reusable = headers.get("connection", "") != "close" and self._remaining >= 0
+        self._done = False
+
+    def _next_chunk(self):
+        line = self._stream.readline()
+        size = int(line.split(b";", 1)[0].strip() or b"0", 16)
+        if size == 0:
+            # skip trailers up to the blank line that ends the body
+            while self._stream.readline() not in (b"\r\n", b"\n", b""):
+                pass
+        return size
+
+    def readinto(self, buf):
+        if self._done:
+            return 0
+        if self._chunked and self._remaining == 0:
+            self._remaining = self._next_chunk()
+            if self._remaining == 0:
+                self._finish()
+                return 0
+        if self._remaining == 0:
+            self._finish()
+            return 0
+        view = memoryview(buf)
+        if 0 < self._remaining < len(view):
+            view = view[:self._remaining]
+        n = self._stream.readinto(view)
+        if not n:
+            self._reusable = False
+            self._finish()
+            if self._remaining > 0:
+                raise OSError("connection closed mid-body")
+            return 0  # a body without a length ends when the connection does
+        if self._remaining > 0:
+            self._remaining -= n
+            if self._chunked and self._remaining == 0:
+                self._stream.readline()  # CRLF after the chunk data
+            elif not self._chunked and self._remaining == 0:
+                self._finish()
+        return n
+
+    def read(self, size=-1):
+        out = bytearray()
+        chunk = bytearray(512)
+        while size < 0 or len(out) < size:
+            n = self.readinto(chunk)
+            if not n:
+                break
+            out.extend(memoryview(chunk)[:n])
+        return bytes(out)
+
+    def _finish(self):
+        if self._done:
+            return
+        self._done = True
+        if KEEP_ALIVE and self._reusable and self._key not in _connections:
+            _connections[self._key] = self._stream
+        else:
+            _close(self._stream)
+        self._stream = None
+
+    def close(self):
+        if not self._done:
+            # an unread body leaves the connection in an unknown state
+            self._reusable = False
+            self._finish()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def _request(method, url, data, headers):
+    host, port, tls, path = _split_url(url)
+    key = (host, port, tls)
+    lines = ["{} {} HTTP/1.1".format(method, path), "Host: " + host, "Connection: keep-alive"]
+    for name, value in (headers or {}).items():
+        lines.append("{}: {}".format(name, value))
+    if data is not None:
+        if isinstance(data, str):
+            data = data.encode()
+        lines.append("Content-Length: {}".format(len(data)))
+    head = ("\r\n".join(lines) + "\r\n\r\n").encode()
+
+    # A pooled connection may have been closed by the server while idle; if
+    # it fails before we get a status line, retry once on a fresh one.
+    stream = _connections.pop(key, None)
+    reused = stream is not None
+    while True:
+        if stream is None:
+            stream = _open(host, port, tls)
+        try:
+            stream.write(head)
+            if data is not None:
+                stream.write(data)
+            if hasattr(stream, "flush"):
+                stream.flush()
+            status_line = stream.readline()
+            if not status_line:
+                raise OSError("connection closed")
+            break
+        except OSError:
+            _close(stream)
+            stream = None
+            if not reused:
+                raise
+            reused = False
+
+    status = int(status_line.split(None, 2)[1])
+    response_headers = {}
+    while True:
+        line = stream.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode().partition(":")
+        response_headers[name.strip().lower()] = value.strip()
+    return Response(stream, key, status, response_headers)
+
+
+def urlopen(url, data=None, headers=None, method=None):
+    """Drop-in for urllib.urequest.urlopen that reuses connections.
+
+    Follows redirects and raises HTTPError, an OSError, for 4xx/5xx
+    responses (the status code is in its `status` and its message, e.g.
+    "HTTP 403").
+    """
+    if not KEEP_ALIVE:
+        from urllib.urequest import urlopen as _urlopen
+        return _urlopen(url, data=data, headers=headers)
+    method = method or ("POST" if data is not None else "GET")
+    for _ in range(MAX_REDIRECTS + 1):
+        response = _request(method, url, data, headers)
+        location = response.headers.get("location")
+        if 300 <= response.status < 400 and location:
+            response.read()
+            if location.startswith("/"):
+                host, port, tls, _ = _split_url(url)
+                location = "{}://{}:{}{}".format("https" if tls else "http", host, port, location)
+            url = location
+            continue
+        if response.status >= 400:
+            response.close()
+            raise HTTPError(response.status, url)
+        return response
+    raise OSError("Too many redirects for " + url)
+
+
+def buffer():
+    """The shared receive buffer (allocated once, kept at its largest size)."""
+    global _buffer
+    if _buffer is None:
+        _buffer = bytearray(BUFFER_SIZE)
+    return _buffer
+
+
+def release():
+    """Free the shared buffer and idle connections, e.g. from on_exit()."""
+    global _buffer
+    _buffer = None
+    close_all()
+
+
+def _open_cached(url, headers, ttl):
+    if ttl is None:
+        return urlopen(url, headers=headers)
+    from badgeware import httpcache
+    return httpcache.urlopen(url, headers=headers, ttl=ttl)
+
+
+def fetch_into(url, buf=None, headers=None, ttl=None):
+    """Read the whole body of `url` into `buf`, doubling it as needed.
+
+    Uses (and grows) the shared buffer when `buf` is None. Returns
+    `(buf, length)`; `buf` may be a new, larger bytearray than the one passed
+    in and only its first `length` bytes are valid. With `ttl` (seconds) the
+    response goes through `badgeware.httpcache`.
+    """
+    global _buffer
+    shared = buf is None
+    if shared:
+        buf = buffer()
+    length = 0
+    response = _open_cached(url, headers, ttl)
+    try:
+        while True:
+            if length == len(buf):
+                grown = bytearray(len(buf) * 2)
+                grown[:length] = buf
+                buf = grown
+            n = response.readinto(memoryview(buf)[length:])
+            if not n:
+                break
+            length += n
+    finally:
+        response.close()
+    if shared:
+        _buffer = buf
+    return buf, length
+
+
+def fetch_json(url, headers=None, ttl=None):
+    """Fetch and decode a JSON document using the shared buffer."""
+    import json
+    buf, length = fetch_into(url, headers=headers, ttl=ttl)
+    return json.loads(bytes(memoryview(buf)[:length]))
+
+
+def fetch_fields(url, paths, headers=None, ttl=None):
+    """Stream `url` and return only the JSON values at `paths`.
+
+    See `badgeware.jsonstream` for the path syntax; the body is parsed as it
+    arrives, so peak memory depends on the fields asked for rather than the
+    size of the response. `ttl` works as for `fetch_into()`.
+    """
+    from badgeware import jsonstream
+    return jsonstream.extract(_open_cached(url, headers, ttl), paths)
+
+
+# ---------------------------------------------------------------------------
+# Non-blocking HTTP for badgeware.tasks
+# ---------------------------------------------------------------------------
+#
+# The same keep-alive HTTP/1.1 client on asyncio streams, so several
+# requests can be in flight at once (each connection still costs a TLS
+# session's worth of RAM on the badge, so callers keep the count small).
+
+async def _open_async(host, port, tls):
+    from badgeware.tasks import asyncio
+    if tls:
+        return await asyncio.open_connection(host, port, ssl=_tls_context(), server_hostname=host)
+    return await asyncio.open_connection(host, port)
+
+
+def _close_async(writer):
+    try:
+        writer.close()
+    except Exception:
+        pass
+
+
+class AsyncResponse:
+    """A streamed HTTP response body; `await read()` until it returns b"".
+
+    Like `Response`, a body cut short of its Content-Length raises OSError.
+    """
+
+    def __init__(self, reader, writer, key, status, headers):
+        self.status = status
+        self.status_code = status
+        self.headers = headers
+        self._reader = reader
+        self._writer = writer
+        self._key = key
+        self._chunked = "chunked" in headers.get("transfer-encoding", "")
+        length = headers.get("content-length")
+        empty = status in (204, 304) or status < 200
+        if self._chunked or empty:
+            self._remaining = 0
+        else:
+            self._remaining = int(length) if length is not None else -1
+        self._reusable = headers.get("connection", "") != "close" and self._remaining >= 0
+        self._done = False
+
+    async def _readline(self):
+        from badgeware.tasks import asyncio
+        return await asyncio.wait_for(self._reader.readline(), TIMEOUT)
+
+    async def read(self, size=512):
+        from badgeware.tasks import asyncio
+        if self._done:
+            return b""
+        if self._chunked and self._remaining == 0:
+            line = await self._readline()
+            self._remaining = int(line.split(b";", 1)[0].strip() or b"0", 16)
+            if self._remaining == 0:
+                while (await self._readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                self._finish()
+                return b""
+        if self._remaining == 0:
+            self._finish()
+            return b""
+        if self._remaining > 0:
+            size = min(size, self._remaining)
+        data = await asyncio.wait_for(self._reader.read(size), TIMEOUT)
+        if not data:
+            self._reusable = False
+            self._finish()
+            if self._remaining > 0:
+                raise OSError("connection closed mid-body")
+            return b""
+        if self._remaining > 0:
+            self._remaining -= len(data)
+            if self._chunked and self._remaining == 0:
+                await self._readline()  # CRLF after the chunk data
+            elif not self._chunked and self._remaining == 0:
+                self._finish()
+        return data
+
+    def _finish(self):
+        if self._done:
+            return
+        self._done = True
+        if KEEP_ALIVE and self._reusable:
+            _async_connections.setdefault(self._key, []).append((self._reader, self._writer))
+        else:
+            _close_async(self._writer)
+        self._reader = self._writer = None
+
+    def close(self):
+        if not self._done:
+            self._reusable = False
+            self._finish()
+
+
+async def _request_async(method, url, data, headers):
+    from badgeware.tasks import asyncio
+    host, port, tls, path = _split_url(url)
+    key = (host, port, tls)
+    lines = ["{} {} HTTP/1.1".format(method, path), "Host: " + host, "Connection: keep-alive"]
+    for name, value in (headers or {}).items():
+        lines.append("{}: {}".format(name, value))
+    if data is not None:
+        if isinstance(data, str):
+            data = data.encode()
+        lines.append("Content-Length: {}".format(len(data)))
+    head = ("\r\n".join(lines) + "\r\n\r\n").encode()
+
+    idle = _async_connections.get(key)
+    connection = idle.pop() if idle else None
+    reused = connection is not None
+    while True:
+        if connection is None:
+            connection = await asyncio.wait_for(_open_async(host, port, tls), TIMEOUT)
+        reader, writer = connection
+        try:
+            writer.write(head)
+            if data is not None:
+                writer.write(data)
+            await writer.drain()
+            status_line = await asyncio.wait_for(reader.readline(), TIMEOUT)
+            if not status_line:
+                raise OSError("connection closed")
+            break
+        except OSError:
+            _close_async(writer)
+            connection = None
+            if not reused:
+                raise
+            reused = False
+
+    status = int(status_line.split(None, 2)[1])
+    response_headers = {}
+    while True:
+        line = await asyncio.wait_for(reader.readline(), TIMEOUT)
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode().partition(":")
+        response_headers[name.strip().lower()] = value.strip()
+    return AsyncResponse(reader, writer, key, status, response_headers)
+
+
+async def urlopen_async(url, data=None, headers=None, method=None):
+    """`urlopen()` for tasks: awaits the connection and response headers."""
+    method = method or ("POST" if data is not None else "GET")
+    for _ in range(MAX_REDIRECTS + 1):
+        response = await _request_async(method, url, data, headers)
+        location = response.headers.get("location")
+        if 300 <= response.status < 400 and location:
+            while await response.read():
+                pass
+            if location.startswith("/"):
+                host, port, tls, _ = _split_url(url)
+                location = "{}://{}:{}{}".format("https" if tls else "http", host, port, location)
+            url = location
+            continue
+        if response.status >= 400:
+            response.close()
+            raise HTTPError(response.status, url)
+        return response
+    raise OSError("Too many redirects for " + url)
+
+
+def _feed_file(extractor, body):
+    from badgeware import jsonstream
+    chunk = bytearray(jsonstream.CHUNK_SIZE)
+    view = memoryview(chunk)
+    try:
+        while True:
+            n = body.readinto(chunk)
+            if not n:
+                break
+            extractor.feed(bytes(view[:n]))
+    finally:
+        body.close()
+    return extractor.close()
+
+
+async def fetch_fields_async(url, paths, headers=None, ttl=None):
+    """`fetch_fields()` for `badgeware.tasks`.
+
+    The request runs on non-blocking streams, so other tasks (and frames)
+    carry on while it is in flight, and the body is parsed as it arrives.
+    `ttl` goes through `badgeware.httpcache` as for `fetch_into()`.
+    """
+    from badgeware import jsonstream, tasks
+    extractor = jsonstream.Extractor(paths)
+
+    if not KEEP_ALIVE:
+        # urllib.urequest has no non-blocking mode; pause between chunks instead
+        response = _open_cached(url, headers, ttl)
+        chunk = bytearray(jsonstream.CHUNK_SIZE)
+        view = memoryview(chunk)
+        try:
+            while True:
+                n = response.readinto(chunk)
+                if not n:
+                    break
+                extractor.feed(bytes(view[:n]))
+                await tasks.pause()
+        finally:
+            response.close()
+        return extractor.close()
+
+    entry = None
+    if ttl is not None:
+        from badgeware import httpcache
+        entry = httpcache.Entry(url)
+        if entry.fresh(ttl):
+            return _feed_file(extractor, entry.open())
+        headers = entry.conditional(headers)
+
+    try:
+        response = await urlopen_async(url, headers=headers)
+    except Exception as e:
+        if entry is None or entry.meta is None:
+            raise
+        print("net: serving stale {} ({})".format(url, e))
+        return _feed_file(extractor, entry.open(stale=True))
+
+    if response.status == 304 and entry is not None and entry.meta is not None:
+        response.close()
+        entry.touch()
+        return _feed_file(extractor, entry.open())
+
+    writer = entry.writer(response.headers) if entry is not None else None
+    try:
+        while True:
+            data = await response.read(jsonstream.CHUNK_SIZE)
+            if not data:
+                break
+            extractor.feed(data)
+            if writer is not None:
+                writer.write(data)
+        if writer is not None:
+            writer.commit()
+            writer = None
+    finally:
+        response.close()
+        if writer is not None:
+            writer.abort()
+    return extractor.close()
@@ -0,0 +1,91 @@
+# Palette swaps for paletted images.
+#
+# A paletted `Image` (a PNG with up to 256 colours, or a p8/p4 image baked
+# by tools/bake_assets.py) stores one index per pixel and a small table of
+# colours, so it takes a quarter of the RAM of the same sprite in RGBA and
+# can be recoloured by rewriting the table instead of keeping a second
+# copy of the sprite or drawing it again from shapes:
+#
+#   from badgeware import Image, palette
+#
+#   ghost = Image.load("assets/ghost.png")
+#   colours = palette.Palette(ghost)
+#
+#   def draw(blinky):
+#       colours.swap({BODY: RED})                   # one entry, not a re-render
+#       if frightened:
+#           colours.swap({BODY: BLUE})
+#       screen.blit(ghost, x, y)
+#
+# `fade()` and `flash()` derive every entry from the image's own colours,
+# and nothing is written when the requested colours are already the ones
+# in use. Palette writes need firmware with `Image.set_palette()` (the
+# simulator has it); elsewhere `Palette.supported` is False and the calls
+# do nothing, so apps keep a drawing path for that case.
+
+
+def supported(image):
+    """True if `image`'s colours can be swapped."""
+    return bool(getattr(image, "has_palette", False)) and hasattr(image, "set_palette")
+
+
+def rgba(colour):
+    """An (r, g, b, a) tuple from (r, g, b) or (r, g, b, a)."""
+    return tuple(colour) if len(colour) == 4 else (colour[0], colour[1], colour[2], 255)
+
+
+def mix(a, b, t):
+    """The colour `t` of the way from `a` to `b`, keeping `a`'s alpha."""
+    return (
+        int(a[0] + (b[0] - a[0]) * t),
+        int(a[1] + (b[1] - a[1]) * t),
+        int(a[2] + (b[2] - a[2]) * t),
+        a[3],
+    )
+
+
+class Palette:
+    """The colours of one paletted image, with the original set kept for reuse."""
+
+    def __init__(self, image, images=None):
+        # `images` lets one Palette drive several images with the same
+        # colours, such as every frame of an animation
+        self.images = [image] + list(images or [])
+        self.images = [i for i in self.images if supported(i)]
+        self.supported = bool(self.images)
+        self.base = [rgba(c) for c in image.palette] if self.supported else []
+        self.current = list(self.base)
+        self.writes = 0   # palette updates actually made
+
+    def __len__(self):
+        return len(self.base)
+
+    def set(self, colours):
+        """Use `colours` (a full palette); does nothing if they are in use already."""
+        if not self.supported or colours == self.current:
+            return False
+        for image in self.images:
+            image.set_palette(colours)
+        self.current = list(colours)
+        self.writes += 1
+        return True
+
+    def reset(self):
+        return self.set(self.base)
+
+    def swap(self, entries):
+        """The original colours with some entries replaced: {index: colour}."""
+        colours = list(self.base)
+        for index, colour in entries.items():
+            colours[index] = rgba(colour)
+        return self.set(colours)
+
+    def fade(self, colour, t):
+        """Every colour `t` (0-1) of the way towards `colour`; alpha is kept."""
+        if t <= 0:
+            return self.reset()
+        return self.set([mix(c, colour, min(t, 1)) for c in self.base])
+
+    def flash(self, colour):
+        """Every visible pixel in `colour`: a silhouette, for hits and blinks."""
+        return self.set([c if c[3] == 0 else rgba(colour)[:3] + (c[3],) for c in self.base])
@@ -0,0 +1,85 @@
+# Fixed-size pools of reusable game objects.
+#
+# A game that makes a new object per bullet, obstacle or particle and
+# drops it a second later keeps MicroPython's heap churning, and the
+# garbage collector stops the game to clean up at a time of its own
+# choosing. A `Pool` makes every object once, up front; spawning takes one
+# from the free list and setting it up again, and objects that are done
+# go back to the free list when the pool is swept, with no copies of the
+# active list along the way:
+#
+#   from badgeware import pool
+#
+#   class Bullet:
+#       __slots__ = ("x", "y", "active")
+#
+#       def reset(self, x, y):
+#           self.x, self.y = x, y
+#
+#   bullets = pool.Pool(Bullet, 16)
+#
+#   bullet = bullets.acquire()          # None if all 16 are in flight
+#   if bullet:
+#       bullet.reset(player.x, player.y)
+#
+#   for bullet in bullets.active:
+#       bullet.y -= 2
+#       if bullet.y < 0:
+#           bullet.active = False       # done; swept below
+#   bullets.sweep()
+#
+# Objects need an `active` attribute (in `__slots__` if they declare it):
+# `acquire()` sets it, and whatever clears it hands the object back at
+# the next `sweep()`. The factory is called with no arguments.
+
+
+class Pool:
+    """`capacity` objects from `factory()`, handed out and taken back without allocating."""
+
+    def __init__(self, factory, capacity):
+        self.capacity = capacity
+        self.free = []
+        for _ in range(capacity):
+            obj = factory()
+            obj.active = False
+            self.free.append(obj)
+        self.active = []   # in the order they were acquired
+
+    def __len__(self):
+        return len(self.active)
+
+    def __iter__(self):
+        return iter(self.active)
+
+    def acquire(self):
+        """A free object, now active, or None if the pool is used up."""
+        if not self.free:
+            return None
+        obj = self.free.pop()
+        obj.active = True
+        self.active.append(obj)
+        return obj
+
+    def release(self, obj):
+        """Hand `obj` back; it leaves `active` at the next `sweep()`."""
+        obj.active = False
+
+    def sweep(self):
+        """Move the released objects to the free list, keeping the others in order."""
+        active = self.active
+        keep = 0
+        for i in range(len(active)):
+            obj = active[i]
+            if obj.active:
+                active[keep] = obj
+                keep += 1
+            else:
+                self.free.append(obj)
+        del active[keep:]
+
+    def clear(self):
+        """Release every object at once."""
+        for obj in self.active:
+            obj.active = False
+            self.free.append(obj)
+        del self.active[:]
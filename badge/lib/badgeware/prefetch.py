@@ -0,0 +1,276 @@
+# Background image decoding.
+#
+# Apps load their next image inside update() when they need it (gallery on
+# a button press, the animation players on each new frame), so the decode
+# lands on the frame that needs the result. An `ImagePrefetcher` is told
+# which images are likely to be wanted next and decodes them on a worker
+# in the meantime: a thread pool in the simulator, the second core on the
+# badge. `get()` then returns the decoded image straight away (a hit),
+# waits for a decode already under way, or loads it there and then (a
+# miss):
+#
+#   from badgeware.prefetch import ImagePrefetcher
+#
+#   images = ImagePrefetcher(depth=2)
+#
+#   def show(i):
+#       image = images.get(paths[i])
+#       images.prefetch([paths[i + 1], paths[i - 1]])
+#
+# At most `depth` predicted images are kept decoded; predictions that drop
+# out of the list are discarded, so the RAM used is bounded. On the badge
+# misses are decoded on core1 too (ahead of any predictions), so the two
+# cores never decode or read files at the same time.
+
+import sys
+import time
+from badgeware import Image
+
+try:
+    import _thread
+except ImportError:
+    _thread = None
+
+MICROPYTHON = sys.implementation.name == "micropython"
+
+
+class _Job:
+    def __init__(self, path, load):
+        self.path = path
+        self.load = load
+        self.image = None
+        self.error = None
+        self.done = False
+        self.cancelled = False
+
+    def run(self):
+        if self.cancelled:
+            self.done = True
+            return
+        try:
+            self.image = self.load(self.path)
+        except Exception as e:
+            self.error = e
+        self.done = True
+
+
+class _ThreadPool:
+    """Simulator worker: a small pool of threads."""
+
+    def __init__(self, workers):
+        from concurrent.futures import ThreadPoolExecutor
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch")
+        self._futures = {}
+
+    def submit(self, job):
+        self._futures[job] = self._pool.submit(job.run)
+
+    def cancel(self, job):
+        job.cancelled = True
+        future = self._futures.pop(job, None)
+        if future is not None:
+            future.cancel()
+
+    def wait(self, job):
+        future = self._futures.pop(job, None)
+        if future is not None and not future.cancelled():
+            future.result()
+
+    def run(self, job):
+        job.run()
+
+    def close(self):
+        self._pool.shutdown(wait=False)
+
+
+class _Core1:
+    """Badge worker: one thread on the second core, shared by every prefetcher.
+
+    Only one thread can run on core1, so it outlives the app that started
+    it (main.py keeps badgeware modules loaded across app switches) and
+    sleeps on a lock while there is nothing to decode. Closing waits for the
+    decode under way, so core0 can load images again as soon as it returns.
+    """
+
+    def __init__(self):
+        self._queue = []
+        self._current = None   # the job being decoded on core1
+        self._lock = _thread.allocate_lock()
+        self._wake = _thread.allocate_lock()
+        self._wake.acquire()
+        _thread.start_new_thread(self._run, ())
+
+    def _run(self):
+        while True:
+            self._wake.acquire()
+            while True:
+                with self._lock:
+                    if not self._queue:
+                        break
+                    job = self._queue.pop(0)
+                    self._current = job
+                job.run()
+                with self._lock:
+                    self._current = None
+
+    def submit(self, job):
+        with self._lock:
+            self._queue.append(job)
+        try:
+            self._wake.release()
+        except RuntimeError:
+            pass  # already awake
+
+    def cancel(self, job):
+        job.cancelled = True
+        with self._lock:
+            if job in self._queue:
+                self._queue.remove(job)
+
+    def clear(self):
+        """Drop every queued job and wait for the one under way."""
+        with self._lock:
+            for job in self._queue:
+                job.cancelled = True
+            del self._queue[:]
+        self._idle()
+
+    def _idle(self):
+        while self._current is not None:
+            time.sleep_ms(1)
+
+    def wait(self, job):
+        while not job.done:
+            time.sleep_ms(1)
+
+    def run(self, job):
+        # the decoder isn't safe to use from both cores at once: queue it first
+        with self._lock:
+            self._queue.insert(0, job)
+        try:
+            self._wake.release()
+        except RuntimeError:
+            pass
+        self.wait(job)
+
+    def close(self):
+        # the prefetcher's own jobs are cancelled; don't leave one decoding
+        self._idle()
+
+
+class _Inline:
+    """No threads available: predicted images are loaded when asked for."""
+
+    def submit(self, job):
+        pass
+
+    def cancel(self, job):
+        job.cancelled = True
+
+    def wait(self, job):
+        job.run()
+
+    def run(self, job):
+        job.run()
+
+    def close(self):
+        pass
+
+
+_core1 = None
+_open = []   # prefetchers not closed yet, for close_all()
+
+
+def _worker(workers):
+    global _core1
+    if _thread is None:
+        return _Inline()
+    if MICROPYTHON:
+        if _core1 is None:
+            _core1 = _Core1()
+        return _core1
+    return _ThreadPool(workers)
+
+
+class ImagePrefetcher:
+    """Decode predicted images ahead of time; `get()` the one you need now."""
+
+    def __init__(self, depth=2, load=None, workers=2):
+        self.depth = depth
+        self._load = load or Image.load
+        self._worker = _worker(workers)
+        self._jobs = {}   # path -> _Job, predicted or in flight
+        self.hits = 0     # decoded by the time it was asked for
+        self.waits = 0    # still decoding when asked for
+        self.misses = 0   # not predicted: loaded in get()
+        self.wasted = 0   # decoded but never used
+        _open.append(self)
+
+    def prefetch(self, paths):
+        """Predict the next images, most likely first; only `depth` are kept."""
+        wanted = []
+        for path in paths:
+            if path is not None and path not in wanted:
+                wanted.append(path)
+        wanted = wanted[:self.depth]
+        for path in list(self._jobs):
+            if path not in wanted:
+                self._drop(path)
+        for path in wanted:
+            if path not in self._jobs:
+                job = _Job(path, self._load)
+                self._jobs[path] = job
+                self._worker.submit(job)
+
+    def _drop(self, path):
+        job = self._jobs.pop(path)
+        if job.done:
+            self.wasted += 1
+        self._worker.cancel(job)
+
+    def get(self, path):
+        """The image at `path`, decoded in the background if it was predicted."""
+        job = self._jobs.pop(path, None)
+        if job is None:
+            self.misses += 1
+            return self._load_now(path)
+        if job.done:
+            self.hits += 1
+        else:
+            self.waits += 1
+        self._worker.wait(job)
+        if job.error is not None or job.image is None:
+            # failed (or was cancelled) in the background: try again
+            return self._load_now(path)
+        return job.image
+
+    def _load_now(self, path):
+        job = _Job(path, self._load)
+        self._worker.run(job)
+        if job.error is not None:
+            raise job.error
+        return job.image
+
+    def stats(self):
+        return {"hits": self.hits, "waits": self.waits, "misses": self.misses, "wasted": self.wasted}
+
+    def clear(self):
+        for path in list(self._jobs):
+            self._drop(path)
+
+    def close(self):
+        self.clear()
+        self._worker.close()
+        if self in _open:
+            _open.remove(self)
+
+
+def close_all():
+    """Close every prefetcher, drop queued decodes and wait for core1 to go idle.
+
+    main.py calls this between apps, before the next one loads anything.
+    """
+    for prefetcher in list(_open):
+        prefetcher.close()
+    if _core1 is not None:
+        _core1.clear()
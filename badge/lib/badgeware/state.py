@@ -0,0 +1,109 @@
+# Write-behind replacement for the firmware `State` store.
+#
+# `State.save()` used to serialise and write the JSON file on every call,
+# which stalls the frame it happens in and wears the flash when apps save
+# on every event (quest saves on each beacon hit). This version keeps the
+# latest snapshot of every state in memory and writes it out `State.delay_ms`
+# after the first save that isn't on flash yet, from `State.poll()` which
+# main.py calls after each frame: at most one write per state per
+# `delay_ms`, however often the app saves (and even while it keeps saving).
+# Writes go to a temp file that is renamed over the real one, so a reset
+# mid-write never leaves a truncated file.
+
+import os
+import json
+import time
+
+STATE_DIR = "/state"
+
+
+class State:
+    delay_ms = 2000  # coalesce saves made within this window into one write
+
+    _snapshots = {}  # name -> latest JSON text (written or pending)
+    _pending = {}    # name -> ticks_ms of the first unflushed save
+
+    @staticmethod
+    def _path(name):
+        return "{}/{}.json".format(STATE_DIR, name)
+
+    @staticmethod
+    def load(name, target):
+        text = State._snapshots.get(name)
+        if text is None:
+            try:
+                with open(State._path(name), "r") as f:
+                    text = f.read()
+            except OSError:
+                return False
+            State._snapshots[name] = text
+        try:
+            data = json.loads(text)
+        except ValueError:
+            return False
+        if isinstance(target, dict) and isinstance(data, dict):
+            target.update(data)
+        return True
+
+    @staticmethod
+    def save(name, data):
+        # snapshot now: callers keep mutating `data` after saving it
+        try:
+            text = json.dumps(data)
+        except (TypeError, ValueError):
+            return False
+        if State._snapshots.get(name) == text:
+            return True
+        State._snapshots[name] = text
+        if name not in State._pending:
+            State._pending[name] = time.ticks_ms()
+        return True
+
+    @staticmethod
+    def delete(name):
+        State._snapshots.pop(name, None)
+        State._pending.pop(name, None)
+        try:
+            os.remove(State._path(name))
+        except OSError:
+            pass
+
+    @staticmethod
+    def _write(name):
+        State._pending.pop(name, None)
+        text = State._snapshots.get(name)
+        if text is None:
+            return
+        try:
+            os.mkdir(STATE_DIR)
+        except OSError:
+            pass
+        path = State._path(name)
+        tmp = path + ".tmp"
+        try:
+            with open(tmp, "w") as f:
+                f.write(text)
+            os.rename(tmp, path)
+        except OSError as e:
+            print("State: failed to write {}: {}".format(name, e))
+
+    @staticmethod
+    def poll():
+        # idle-time flush: write at most one settled state per frame
+        now = time.ticks_ms()
+        for name, since in State._pending.items():
+            if time.ticks_diff(now, since) >= State.delay_ms:
+                State._write(name)
+                return
+
+    @staticmethod
+    def flush():
+        for name in list(State._pending):
+            State._write(name)
+
+    @staticmethod
+    def forget():
+        # drop the snapshots that are already on flash (main.py, between apps)
+        for name in list(State._snapshots):
+            if name not in State._pending:
+                del State._snapshots[name]
@@ -0,0 +1,136 @@
+# Cooperative background tasks for apps.
+#
+# Network apps used to either block `update()` for the whole of a request
+# (weather, stocks, crypto) or hand-roll generators that update() advanced
+# with `next()` once a frame (badge). Here apps spawn ordinary coroutines
+# on the platform's asyncio loop (MicroPython's asyncio/uasyncio on the
+# badge, CPython's asyncio in the simulator) and the runner gives them a
+# time slice after every update():
+#
+#   from badgeware import tasks
+#
+#   async def refresh():
+#       for symbol in SYMBOLS:
+#           prices[symbol] = fetch(symbol)
+#           await tasks.pause()       # let the next frame draw
+#
+#   def update():
+#       if io.BUTTON_B in io.pressed and not tasks.pending():
+#           tasks.spawn(refresh())
+#       draw()
+#
+# The slice only returns control when a task awaits, so long blocking calls
+# inside a task still hold up the frame; await between chunks of work.
+
+import sys
+import time
+
+try:
+    import asyncio
+except ImportError:
+    import uasyncio as asyncio
+
+MICROPYTHON = sys.implementation.name == "micropython"
+
+SLICE_MS = 4        # time given to tasks after each update(), in milliseconds
+
+_loop = None
+_tasks = []
+
+if MICROPYTHON:
+    def _now_ms():
+        return time.ticks_ms()
+
+    def _elapsed_ms(since):
+        return time.ticks_diff(time.ticks_ms(), since)
+else:
+    import traceback
+
+    def _now_ms():
+        return time.monotonic() * 1000
+
+    def _elapsed_ms(since):
+        return time.monotonic() * 1000 - since
+
+
+def loop():
+    """The event loop tasks run on (created on first use)."""
+    global _loop
+    if _loop is None:
+        _loop = asyncio.get_event_loop() if MICROPYTHON else asyncio.new_event_loop()
+    return _loop
+
+
+async def _guard(coro):
+    # report failures straight away instead of when the task is collected
+    try:
+        return await coro
+    except Exception as e:
+        if MICROPYTHON:
+            sys.print_exception(e)
+        else:
+            traceback.print_exc()
+
+
+async def _tick():
+    # run_until_complete() needs a coroutine; on MicroPython sleep(0) is not one
+    await asyncio.sleep(0)
+
+
+def spawn(coro):
+    """Schedule a coroutine to run in the slices between frames."""
+    task = loop().create_task(_guard(coro))
+    _tasks.append(task)
+    return task
+
+
+def spawn_pool(func, items, limit=2):
+    """Run `await func(item)` for each item, with at most `limit` in flight.
+
+    Returns the worker tasks. `func` should handle its own errors; one that
+    escapes is reported and stops that worker.
+    """
+    queue = list(items)
+
+    async def worker():
+        while queue:
+            await func(queue.pop(0))
+
+    return [spawn(worker()) for _ in range(min(limit, len(queue)))]
+
+
+def pending():
+    """Number of spawned tasks that haven't finished yet."""
+    _tasks[:] = [task for task in _tasks if not task.done()]
+    return len(_tasks)
+
+
+def pause():
+    """Await this to hand the rest of the slice back to the app."""
+    return asyncio.sleep(0)
+
+
+def sleep_ms(ms):
+    return asyncio.sleep_ms(ms) if MICROPYTHON else asyncio.sleep(ms / 1000)
+
+
+def step(budget_ms=SLICE_MS):
+    """Run ready tasks for up to `budget_ms`; called by the runner each frame."""
+    if not pending():
+        return
+    start = _now_ms()
+    run = loop().run_until_complete
+    while True:
+        run(_tick())
+        if not pending() or _elapsed_ms(start) >= budget_ms:
+            break
+
+
+def cancel_all():
+    """Cancel every task, e.g. when the app exits."""
+    for task in _tasks:
+        task.cancel()
+    if _tasks:
+        # let the cancellations unwind through the tasks' finally blocks
+        loop().run_until_complete(_tick())
+    _tasks.clear()
@@ -0,0 +1,120 @@
+# Text layout: alignment, word wrap and truncation, worked out once per string.
+#
+# Centring a string takes a measure_text(), wrapping one takes a measure
+# per word and trimming one to fit a measure per character tried, and
+# apps drawing the same string every frame were paying for that every
+# frame. `layout()` measures once and keeps the result, keyed on
+# everything it was given, so the next frames get it back from a dict:
+#
+#   from badgeware import screen, text
+#
+#   def center_text(label, y, font):
+#       text.draw(text.layout(label, font, 160, align="center"), 0, y)
+#
+#   runs = text.layout(message, small_font, 140, wrap=True, line_height=10)
+#   text.draw(runs, 10, 45)
+#   y = 45 + len(runs) * 10
+#
+# A layout is a list of (x, y, line) runs from the top left corner of a
+# box `width` pixels wide; with no width the box is a point, so "center"
+# and "right" hang the text around or to the left of it. Newlines always
+# break; `wrap=True` also breaks between words to fit the width, and
+# `ellipsis=True` (or the marker to use) trims lines that still don't
+# fit, at the end or, with `cut="start"`, at the start (for paths).
+# `layout()` leaves `font` set as `screen.font`, ready for `draw()`.
+
+from badgeware import screen
+
+ELLIPSIS = "..."
+CACHE_SIZE = 48         # layouts kept; the oldest goes first
+
+_cache = {}             # key -> (font, runs)
+_order = []             # keys, oldest first
+
+
+def layout(text, font, width=None, align="left", wrap=False, ellipsis=False,
+           line_height=None, spacing=1, cut="end"):
+    """The (x, y, line) runs of `text` in `font`; cached, so don't modify them."""
+    screen.font = font
+    text = str(text)
+    key = (text, id(font), width, align, wrap, ellipsis, line_height, spacing, cut)
+    entry = _cache.get(key)
+    if entry is not None and entry[0] is font:
+        return entry[1]
+
+    runs = _layout(text, width, align, wrap, ellipsis, line_height, spacing, cut)
+    if entry is None:
+        if len(_order) >= CACHE_SIZE:
+            del _cache[_order.pop(0)]
+        _order.append(key)
+    _cache[key] = (font, runs)
+    return runs
+
+
+def draw(runs, x, y):
+    """Draw a layout with its box's top left corner at (x, y)."""
+    for rx, ry, line in runs:
+        screen.text(line, x + rx, y + ry)
+
+
+def clear():
+    """Forget every cached layout (after loading different fonts, say)."""
+    _cache.clear()
+    del _order[:]
+
+
+def _layout(text, width, align, wrap, ellipsis, line_height, spacing, cut):
+    lines = []
+    for paragraph in text.split("\n"):
+        if wrap and width is not None:
+            lines.extend(_wrap(paragraph, width))
+        else:
+            lines.append(paragraph)
+
+    marker = ELLIPSIS if ellipsis is True else ellipsis
+    runs = []
+    y = 0
+    for line in lines:
+        w, h = screen.measure_text(line)
+        if marker and width is not None and w > width:
+            line = _trim(line, width, marker, cut)
+            w, h = screen.measure_text(line)
+        if align == "center":
+            x = ((width or 0) - w) / 2
+        elif align == "right":
+            x = (width or 0) - w
+        else:
+            x = 0
+        runs.append((x, y, line))
+        y += (line_height or h) * spacing
+    return runs
+
+
+def _wrap(paragraph, width):
+    # greedy, a word at a time; a word wider than the box gets a line of its own
+    lines = []
+    line = ""
+    for word in paragraph.split():
+        candidate = line + " " + word if line else word
+        if not line or screen.measure_text(candidate)[0] <= width:
+            line = candidate
+        else:
+            lines.append(line)
+            line = word
+    lines.append(line)
+    return lines
+
+
+def _trim(line, width, marker, cut):
+    # binary search for the most characters that fit with the marker
+    def fitted(n):
+        return line[:n] + marker if cut == "end" else marker + line[len(line) - n:]
+
+    low, high = 0, len(line)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if screen.measure_text(fitted(mid))[0] <= width:
+            low = mid
+        else:
+            high = mid - 1
+    return fitted(low)
@@ -2,69 +2,167 @@
 
 import sys
 import os
+import badgeware
 from badgeware import run, io
 import machine
 import gc
 import powman
 
+# pure-Python badgeware extensions (badgeware.state, ...) live on /system
+badgeware.__path__ = "/system/lib/badgeware"
+
+from badgeware.state import State
+badgeware.State = State
+
+from badgeware import boot
+boot.mark("main")
+boot.load_settings()
+
 SKIP_CINEMATIC = powman.get_wake_reason() == powman.WAKE_WATCHDOG
 
+HOME = machine.Pin.board.BUTTON_HOME
+
+# Everything imported so far survives app switches. So do the badgeware
+# extensions an app pulls in: badgeware.net keeps the WiFi association and
+# idle keep-alive connections, so the next networked app starts connected.
+RESIDENT = set(sys.modules)
+
 running_app = None
+quit_requested = False
 
 
 def quit_to_launcher(pin):
-    global running_app
-    getattr(running_app, "on_exit", lambda: None)()
-    # If we reset while boot is low, bad times
-    while not pin.value():
-        pass
-    machine.reset()
+    global quit_requested
+    if running_app is None:
+        return
+    if quit_requested:
+        # pressed again before the app got back to us (stuck in a long
+        # blocking call?), so fall back to a hard reset
+        State.flush()
+        # If we reset while boot is low, bad times
+        while not pin.value():
+            pass
+        machine.reset()
+    quit_requested = True
+
+
+def unload_app(module):
+    """Drop everything an app loaded, keeping the resident modules."""
+    getattr(module, "on_exit", lambda: None)()
+    tasks = sys.modules.get("badgeware.tasks")
+    if tasks is not None:
+        tasks.cancel_all()
+    # resident extensions mustn't keep the app's images, fonts or state alive
+    prefetch = sys.modules.get("badgeware.prefetch")
+    if prefetch is not None:
+        prefetch.close_all()
+    text = sys.modules.get("badgeware.text")
+    if text is not None:
+        text.clear()
+    State.flush()
+    State.forget()
+
+    for name in list(sys.modules):
+        if name not in RESIDENT and not name.startswith("badgeware."):
+            del sys.modules[name]
+    while sys.path and sys.path[0].startswith("/system/apps"):
+        sys.path.pop(0)
+    os.chdir("/")
+    gc.collect()
 
 
-if not SKIP_CINEMATIC:
-    startup = __import__("/system/apps/startup")
+def launch(path):
+    """Run the app at `path` until HOME is pressed; returns the next app, if any."""
+    global running_app, quit_requested
 
-    run(startup.update)
+    # Don't pass the b press into the app
+    while io.held:
+        io.poll()
 
-    if sys.path[0].startswith("/system/apps"):
-        sys.path.pop(0)
+    sys.path.insert(0, path)
+    os.chdir(path)
 
-    del startup
+    running_app = __import__(path)
+    quit_requested = False
+    boot.remember_app(path)
 
-    gc.collect()
+    getattr(running_app, "init", lambda: None)()
+    boot.mark("app_import")
+
+    def update_and_flush():
+        if quit_requested:
+            return False
+        result = running_app.update()
+        # give background tasks (badgeware.tasks) their slice, if the app uses them
+        tasks = sys.modules.get("badgeware.tasks")
+        if tasks is not None:
+            tasks.step()
+        State.poll()
+        return result
+
+    if boot.done():
+        result = run(update_and_flush)
+    else:
+        result = run(boot.first_frame(update_and_flush, "app_frame"))
 
-menu = __import__("/system/apps/menu")
+    app, running_app = running_app, None
+    unload_app(app)
+    del app
 
-app = run(menu.update)
+    # wait for HOME to be let go so the menu doesn't see it
+    while not HOME.value():
+        pass
 
-if sys.path[0].startswith("/system/apps"):
-    sys.path.pop(0)
+    # an app may hand over to another one by returning its path
+    return result if isinstance(result, str) else None
 
-del menu
 
-# make sure these can be re-imported by the app
-del sys.modules["ui"]
-del sys.modules["icon"]
+# Fast boot (opt-in, see badgeware/boot.py) goes straight back to the last
+# app; hold any button while booting to get the menu instead
+io.poll()
+restore = None if io.held else boot.last_app()
 
-gc.collect()
+if restore is None and not SKIP_CINEMATIC:
+    startup = __import__("/system/apps/startup")
 
-# Don't pass the b press into the app
-while io.held:
-    io.poll()
+    run(startup.update)
 
-machine.Pin.board.BUTTON_HOME.irq(
+    unload_app(startup)
+
+    del startup
+
+    boot.mark("cinematic")
+
+HOME.irq(
     trigger=machine.Pin.IRQ_FALLING, handler=quit_to_launcher
 )
 
-sys.path.insert(0, app)
-os.chdir(app)
+if restore is not None:
+    try:
+        app = launch(restore)
+    except Exception as e:
+        # don't let a broken app lock the badge out of its menu
+        sys.print_exception(e)
+        unload_app(running_app)
+        running_app = None
+        app = None
+    while app:
+        app = launch(app)
+
+while True:
+    boot.remember_app(None)
 
-running_app = __import__(app)
+    menu = __import__("/system/apps/menu")
+    boot.mark("menu_import")
 
-getattr(running_app, "init", lambda: None)()
+    if boot.done():
+        app = run(menu.update)
+    else:
+        app = run(boot.first_frame(menu.update, "menu_frame"))
 
-run(running_app.update)
+    unload_app(menu)
 
-# Unreachable, in theory!
-machine.reset()
+    del menu
 
+    while app:
+        app = launch(app)
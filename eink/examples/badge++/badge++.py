@@ -44,13 +44,17 @@ she/her
 
 # Reduce the size of a string until it fits within a given width
 def truncate_string(text, text_size, width):
-    while True:
-        length = display.measure_text(text, text_size)
-        if length > 0 and length > width:
-            text = text[:-1]
+    if display.measure_text(text, text_size) <= width:
+        return text
+    # binary search for the longest prefix that fits: a few measures, not one per character
+    low, high = 0, len(text) - 1
+    while low < high:
+        mid = (low + high + 1) // 2
+        if display.measure_text(text[:mid], text_size) <= width:
+            low = mid
         else:
-            text += ""
-            return text
+            high = mid - 1
+    return text[:low]
 
 
 # Extract the width of the image based on the file name.
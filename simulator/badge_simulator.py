@@ -7,12 +7,17 @@ Run GitHub Badger 2350 games locally via Pygame by simulating the
 """
 
 import argparse
+import atexit
 import importlib.util
 import json
 import math
 import os
 import sys
+import threading
 import traceback
+from io import BytesIO
+import struct
+import zlib
 from types import ModuleType
 
 try:
@@ -22,6 +27,11 @@ except ImportError:
         "Pygame is required to run the local simulator. Install with: pip install pygame"
     )
 
+try:
+    import numpy  # type: ignore
+except ImportError:
+    numpy = None  # baked .bimg assets need numpy; their PNGs are used instead
+
 # -----------------------------------------------------------------------------
 # Virtual “/system” mapping (NO filesystem changes)
 # -----------------------------------------------------------------------------
@@ -132,6 +142,31 @@ def _safe_remove(path):
 
 os.remove = _safe_remove  # type: ignore
 
+# Intercept os.rename so write-then-rename works on root files too
+_real_rename = os.rename
+
+
+def _safe_rename(src, dst):
+    if isinstance(src, str) and isinstance(dst, str):
+        return _real_rename(map_system_path(src), map_system_path(dst))
+    return _real_rename(src, dst)
+
+
+os.rename = _safe_rename  # type: ignore
+
+# Allow `os.stat("/system/...")` (e.g. the menu checking app mtimes). Only
+# /system is mapped: os.path helpers stat host paths like /tmp themselves.
+_real_stat = os.stat
+
+
+def _safe_stat(path, *args, **kwargs):
+    if isinstance(path, str) and path.startswith("/system"):
+        return _real_stat(map_system_path(path), *args, **kwargs)
+    return _real_stat(path, *args, **kwargs)
+
+
+os.stat = _safe_stat  # type: ignore
+
 # Intercept sys.path operations to map "/" to SIM_ROOT
 class _SafePathList(list):
     """Wrapper for sys.path that maps "/" to SIM_ROOT when inserted."""
@@ -165,6 +200,25 @@ sys.path = _SafePathList(sys.path)
 # Badgeware API stubs
 # -----------------------------------------------------------------------------
 
+_UNIT_CIRCLES = {}
+
+
+def _unit_circle(segments):
+    """(cos, sin) of `segments` evenly spaced angles from 0, computed once per count.
+
+    Circles, squircles, polygons and rounded corners only scale and move
+    these, so drawing one doesn't take trig calls per vertex every frame.
+    """
+    table = _UNIT_CIRCLES.get(segments)
+    if table is None:
+        table = [
+            (math.cos(2.0 * math.pi * i / segments), math.sin(2.0 * math.pi * i / segments))
+            for i in range(segments)
+        ]
+        _UNIT_CIRCLES[segments] = table
+    return table
+
+
 class _Shape:
     """Base shape that supports optional affine transforms."""
 
@@ -235,15 +289,16 @@ class _RoundedRectangle(_Rectangle):
             (x, y + h),
         ]
 
+        # quarter turns each corner's arc starts at (180, 270, 0 and 90 degrees)
         corners = [
-            (x + radii[0], y + radii[0], 180, 270, radii[0]),                 # top-left
-            (x + w - radii[1], y + radii[1], 270, 360, radii[1]),             # top-right
-            (x + w - radii[2], y + h - radii[2], 0, 90, radii[2]),            # bottom-right
-            (x + radii[3], y + h - radii[3], 90, 180, radii[3]),              # bottom-left
+            (x + radii[0], y + radii[0], 2, radii[0]),                 # top-left
+            (x + w - radii[1], y + radii[1], 3, radii[1]),             # top-right
+            (x + w - radii[2], y + h - radii[2], 0, radii[2]),         # bottom-right
+            (x + radii[3], y + h - radii[3], 1, radii[3]),             # bottom-left
         ]
 
         points = []
-        for idx, (cx, cy, start_deg, end_deg, radius) in enumerate(corners):
+        for idx, (cx, cy, quarter, radius) in enumerate(corners):
             if radius <= 0:
                 pt = corner_points[idx]
                 if points and points[-1] == pt:
@@ -252,14 +307,14 @@ class _RoundedRectangle(_Rectangle):
                 continue
 
             segments = max(4, int(radius * 2))
+            # a quarter of a circle of 4 * segments steps
+            unit = _unit_circle(4 * segments)
+            first = quarter * segments
             for step in range(segments + 1):
                 if idx > 0 and step == 0:
                     continue
-                t = step / segments
-                angle = math.radians(start_deg + (end_deg - start_deg) * t)
-                px = cx + radius * math.cos(angle)
-                py = cy + radius * math.sin(angle)
-                points.append((px, py))
+                cos_t, sin_t = unit[(first + step) % (4 * segments)]
+                points.append((cx + radius * cos_t, cy + radius * sin_t))
         return points
 
 
@@ -272,16 +327,8 @@ class _Circle(_Shape):
         self.segments = max(12, int(segments))
 
     def points(self):
-        pts = []
-        for i in range(self.segments):
-            theta = (2.0 * math.pi * i) / self.segments
-            pts.append(
-                (
-                    self.x + self.radius * math.cos(theta),
-                    self.y + self.radius * math.sin(theta),
-                )
-            )
-        return pts
+        x, y, radius = self.x, self.y, self.radius
+        return [(x + radius * cos_t, y + radius * sin_t) for cos_t, sin_t in _unit_circle(self.segments)]
 
 
 class _Squircle(_Shape):
@@ -296,10 +343,7 @@ class _Squircle(_Shape):
     def points(self):
         pts = []
         exponent = 2.0 / max(1e-3, float(self.n))
-        for i in range(self.segments):
-            theta = (2.0 * math.pi * i) / self.segments
-            cos_t = math.cos(theta)
-            sin_t = math.sin(theta)
+        for cos_t, sin_t in _unit_circle(self.segments):
             px = self.radius * math.copysign(abs(cos_t) ** exponent, cos_t)
             py = self.radius * math.copysign(abs(sin_t) ** exponent, sin_t)
             pts.append((self.x + px, self.y + py))
@@ -324,14 +368,9 @@ class _RegularPolygon(_Shape):
         self.sides = max(3, int(sides))
 
     def points(self):
-        pts = []
-        for i in range(self.sides):
-            angle_deg = (360.0 / self.sides) * i
-            angle = math.radians(angle_deg)
-            px = self.x + self.radius * math.sin(angle)
-            py = self.y + self.radius * math.cos(angle)
-            pts.append((px, py))
-        return pts
+        # sin for x and cos for y: the first vertex points down
+        x, y, radius = self.x, self.y, self.radius
+        return [(x + radius * sin_t, y + radius * cos_t) for cos_t, sin_t in _unit_circle(self.sides)]
 
 
 class _Arc(_Shape):
@@ -488,7 +527,7 @@ class _SurfaceTarget:
         return c
 
     def _unwrap(self, image):
-        return image._surface if isinstance(image, Image) else image
+        return image._blit_surface() if isinstance(image, Image) else image
 
     def clear(self, color=None) -> None:
         fill_color = self._norm_color(color if color is not None else self.brush)
@@ -503,6 +542,20 @@ class _SurfaceTarget:
             x, y = transform.transformed_point(x, y)
         self._surface.blit(self._unwrap(image), (int(round(x)), int(round(y))))
 
+    def blit_indexed(self, x: int, y: int, width: int, height: int, indexes, colours) -> None:
+        """Write a block of pixels in one call (simulator only).
+
+        `indexes` holds one byte per pixel, row by row (bytes, a bytearray
+        or a uint8 numpy array), each choosing an entry of `colours`, a list
+        of (r, g, b) tuples used as a lookup table. The badge firmware has
+        no bulk pixel write; apps check for this method with hasattr().
+        """
+        if len(colours) > 256:
+            raise ValueError("blit_indexed() takes at most 256 colours")
+        src = pygame.image.frombytes(bytes(indexes), (width, height), "P")
+        src.set_palette([tuple(colour)[:3] for colour in colours])
+        self._surface.blit(src, (int(x), int(y)))
+
     def scale_blit(self, image, x: float, y: float, w: int, h: int, transform: "Matrix" = None) -> None:
         if isinstance(transform, Matrix):
             x, y = transform.transformed_point(x, y)
@@ -640,7 +693,7 @@ class Image(_SurfaceTarget):
     X4 = 2
     _cache = {}
 
-    def __init__(self, *args, _surface: pygame.Surface = None):
+    def __init__(self, *args, _surface: pygame.Surface = None, _palette: list = None):
         if _surface is None:
             if len(args) == 2:
                 width, height = args
@@ -660,7 +713,11 @@ class Image(_SurfaceTarget):
         self.width = width
         self.height = height
         self.antialias = Image.OFF
-        self.has_palette = False
+        # Paletted images are 8-bit surfaces: pygame palettes are opaque, so
+        # the RGBA entries live in _palette and blits use _blit_surface()
+        self.has_palette = _palette is not None
+        self._palette = list(_palette) if _palette is not None else None
+        self._expanded = None
         self.x = 0
         self.y = 0
         if len(args) == 4:
@@ -672,7 +729,37 @@ class Image(_SurfaceTarget):
 
     @alpha.setter
     def alpha(self, value):
-        self._surface.set_alpha(None if value is None else int(value))
+        value = None if value is None else int(value)
+        self._surface.set_alpha(value)
+        if self._expanded is not None and self._expanded is not self._surface:
+            self._expanded.set_alpha(value)
+
+    @property
+    def palette(self):
+        """The RGBA palette of a paletted image (a copy), or None."""
+        return list(self._palette) if self._palette is not None else None
+
+    def set_palette(self, colours, start: int = 0) -> None:
+        """Replace palette entries from `start` on; pixels keep their indexes."""
+        if self._palette is None:
+            raise ValueError("set_palette() needs a paletted image")
+        if start < 0 or start + len(colours) > len(self._palette):
+            raise ValueError(f"palette has {len(self._palette)} entries")
+        for i, colour in enumerate(colours, start):
+            colour = tuple(int(c) for c in colour)
+            self._palette[i] = colour if len(colour) == 4 else colour + (255,)
+        self._surface.set_palette([colour[:3] for colour in self._palette])
+        self._expanded = None
+
+    def _blit_surface(self) -> pygame.Surface:
+        if self._palette is None:
+            return self._surface
+        if self._expanded is None:
+            self._expanded = _expand_palette(self._surface, self._palette)
+            alpha = self._surface.get_alpha()
+            if self._expanded is not self._surface and alpha is not None:
+                self._expanded.set_alpha(alpha)
+        return self._expanded
 
     def get_width(self):
         return self.width
@@ -687,17 +774,129 @@ class Image(_SurfaceTarget):
     def load(path: str):
         normalised = os.path.normpath(map_system_path(path))
         if normalised in Image._cache:
-            source = Image._cache[normalised]
+            source, palette = Image._cache[normalised]
         else:
-            source = pygame.image.load(normalised).convert_alpha()
-            Image._cache[normalised] = source
+            source, palette = _load_baked(normalised) or _load_png(normalised)
+            Image._cache[normalised] = (source, palette)
             
             # Track asset loading for performance monitoring
             if _perf_monitor and _perf_monitor.enabled:
                 width, height = source.get_size()
                 _perf_monitor.asset_tracker.register_image(normalised, width, height)
         
-        return Image(_surface=source.copy())
+        return Image(_surface=source.copy(), _palette=palette)
+
+
+def _load_png(path: str):
+    """(surface, palette): indexed PNGs stay 8-bit like on the badge."""
+    surface = pygame.image.load(path)
+    if surface.get_bitsize() != 8:
+        return surface.convert_alpha(), None
+    key = surface.get_colorkey()
+    clear = surface.map_rgb(key) if key is not None else None
+    palette = [(c.r, c.g, c.b, 0 if i == clear else 255) for i, c in enumerate(surface.get_palette())]
+    return surface, palette
+
+
+def _expand_palette(surface: pygame.Surface, palette: list) -> pygame.Surface:
+    """What to blit for an 8-bit surface whose palette has alpha."""
+    alphas = [colour[3] for colour in palette]
+    clear = [i for i, a in enumerate(alphas) if a == 0]
+    if len(clear) <= 1 and all(a in (0, 255) for a in alphas):
+        # one transparent entry at most: a colour key does it, no copy
+        surface.set_colorkey(clear[0] if clear else None)
+        return surface
+    surface.set_colorkey(None)
+    out = pygame.Surface(surface.get_size(), pygame.SRCALPHA)
+    out.blit(surface, (0, 0))
+    if numpy is not None:
+        lut = numpy.array(alphas + [255] * (256 - len(alphas)), numpy.uint8)
+        indexes = pygame.surfarray.pixels2d(surface)
+        alpha = pygame.surfarray.pixels_alpha(out)
+        alpha[:] = lut[indexes]
+        del indexes, alpha
+    else:
+        for y in range(out.get_height()):
+            for x in range(out.get_width()):
+                colour = out.get_at((x, y))
+                colour.a = alphas[surface.get_at_mapped((x, y))]
+                out.set_at((x, y), colour)
+    return out
+
+
+# Baked images (tools/bake_assets.py, badgeware/assets.py): a header, an
+# optional RGBA palette and raw RGB565/RGBA4444/4-bit/8-bit pixels.
+_BAKED_MAGIC = b"BIMG"
+_BAKED_VERSION = 1
+_BAKED_HEADER = "<4sBBHHHI"
+_BAKED_RGB565, _BAKED_RGBA4444, _BAKED_P8, _BAKED_P4 = 0, 1, 2, 3
+_stale_baked = set()
+
+
+def _decode_baked(data: bytes):
+    """(pixels, width, height, palette) of a baked image.
+
+    Palettized formats give one index byte per pixel and the RGBA palette;
+    the others give RGBA bytes and no palette.
+    """
+    magic, version, fmt, width, height, entries, _ = struct.unpack_from(_BAKED_HEADER, data)
+    if magic != _BAKED_MAGIC or version != _BAKED_VERSION:
+        raise ValueError("not a version 1 baked image")
+    pos = struct.calcsize(_BAKED_HEADER)
+    palette = [tuple(data[pos + i * 4:pos + i * 4 + 4]) for i in range(entries)]
+    pos += entries * 4
+    if fmt == _BAKED_P8:
+        return data[pos:pos + width * height], width, height, palette
+    if fmt == _BAKED_P4:
+        stride = (width + 1) // 2
+        packed = numpy.frombuffer(data, numpy.uint8, stride * height, pos).reshape(height, stride)
+        indexes = numpy.empty((height, stride * 2), numpy.uint8)
+        indexes[:, 0::2] = packed >> 4
+        indexes[:, 1::2] = packed & 0x0F
+        return numpy.ascontiguousarray(indexes[:, :width]).tobytes(), width, height, palette
+    else:
+        value = numpy.frombuffer(data, "<u2", width * height, pos).astype(numpy.uint32)
+        rgba = numpy.empty((width * height, 4), numpy.uint8)
+        if fmt == _BAKED_RGB565:
+            r, g, b = value >> 11, (value >> 5) & 0x3F, value & 0x1F
+            rgba[:, 0] = (r << 3) | (r >> 2)
+            rgba[:, 1] = (g << 2) | (g >> 4)
+            rgba[:, 2] = (b << 3) | (b >> 2)
+            rgba[:, 3] = 255
+        else:
+            for channel, shift in enumerate((12, 8, 4, 0)):
+                rgba[:, channel] = ((value >> shift) & 0x0F) * 17
+    return rgba.tobytes(), width, height, None
+
+
+def _load_baked(path: str):
+    """(surface, palette) from the baked copy of `path` (or `path` itself if it's a .bimg).
+
+    Returns None when there is no usable baked file: no numpy, none baked,
+    or a PNG edited since it was baked (warned about once).
+    """
+    if numpy is None:
+        return None
+    stem, ext = os.path.splitext(path)
+    baked = path if ext.lower() == ".bimg" else stem + ".bimg"
+    if baked in _stale_baked or not os.path.isfile(baked):
+        return None
+    with _real_open(baked, "rb") as f:
+        data = f.read()
+    if baked != path and os.path.isfile(path):
+        with _real_open(path, "rb") as f:
+            crc = zlib.crc32(f.read()) & 0xFFFFFFFF
+        if len(data) < 16 or struct.unpack_from(_BAKED_HEADER, data)[6] != crc:
+            _stale_baked.add(baked)
+            print(f"[Simulator] {os.path.basename(baked)} is older than its PNG; "
+                  f"rerun tools/bake_assets.py")
+            return None
+    pixels, width, height, palette = _decode_baked(data)
+    if palette is None:
+        return pygame.image.frombuffer(pixels, (width, height), "RGBA").convert_alpha(), None
+    surface = pygame.image.frombytes(pixels, (width, height), "P")
+    surface.set_palette([colour[:3] for colour in palette])
+    return surface, palette
 
 
 class SpriteSheet:
@@ -715,9 +914,11 @@ class SpriteSheet:
             self.frame_width,
             self.frame_height,
         )
+        if self.sheet.has_palette:
+            # sprites of a paletted sheet are paletted too, each with its own palette
+            return Image(_surface=self.sheet._surface.subsurface(rect).copy(), _palette=self.sheet._palette)
         image = pygame.Surface((self.frame_width, self.frame_height), pygame.SRCALPHA)
-        src = self.sheet._surface if isinstance(self.sheet, Image) else self.sheet
-        image.blit(src, (0, 0), rect)
+        image.blit(self.sheet._surface, (0, 0), rect)
         return Image(_surface=image)
 
     def animation(self, x: int = 0, y: int = 0, length: int = None):
@@ -1054,6 +1255,21 @@ display = Display()
 
 
 class State:
+    """Write-behind JSON state store.
+
+    Saves are snapshotted in memory and coalesced: a state is written at most
+    once per `flush_delay` seconds, from a background timer, via a temp file
+    that is renamed over the real one. `flush()` writes anything pending
+    immediately and runs when an app exits and when the simulator quits.
+    """
+
+    flush_delay = 1.0  # seconds
+
+    _snapshots = {}   # name -> latest JSON text (written or pending)
+    _pending = set()  # names saved since the last flush
+    _lock = threading.Lock()
+    _timer = None
+
     @staticmethod
     def _state_dir() -> str:
         root = SIM_ROOT or _find_sim_root(os.getcwd())
@@ -1070,10 +1286,15 @@ class State:
 
     @staticmethod
     def load(name: str, target) -> bool:
-        path = State._state_path(name)
+        with State._lock:
+            text = State._snapshots.get(name)
         try:
-            with open(path, "r", encoding="utf-8") as fh:
-                data = json.load(fh)
+            if text is None:
+                with open(State._state_path(name), "r", encoding="utf-8") as fh:
+                    text = fh.read()
+                with State._lock:
+                    State._snapshots.setdefault(name, text)
+            data = json.loads(text)
             if isinstance(target, dict) and isinstance(data, dict):
                 target.update(data)
             return True
@@ -1085,15 +1306,47 @@ class State:
 
     @staticmethod
     def save(name: str, data) -> bool:
-        path = State._state_path(name)
+        # Snapshot now: apps keep mutating `data` after saving it.
         try:
-            os.makedirs(os.path.dirname(path), exist_ok=True)
-            with open(path, "w", encoding="utf-8") as fh:
-                json.dump(data, fh)
-            return True
+            text = json.dumps(data)
         except Exception:
             traceback.print_exc()
             return False
+        with State._lock:
+            if State._snapshots.get(name) == text:
+                return True
+            State._snapshots[name] = text
+            State._pending.add(name)
+            if State._timer is None:
+                State._timer = threading.Timer(State.flush_delay, State.flush)
+                State._timer.daemon = True
+                State._timer.start()
+        return True
+
+    @staticmethod
+    def _write(name: str, text: str) -> None:
+        path = State._state_path(name)
+        tmp = path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as fh:
+                fh.write(text)
+            os.replace(tmp, path)
+        except Exception:
+            traceback.print_exc()
+
+    @staticmethod
+    def flush() -> None:
+        with State._lock:
+            if State._timer is not None:
+                State._timer.cancel()
+                State._timer = None
+            batch = [(name, State._snapshots[name]) for name in State._pending]
+            State._pending.clear()
+        for name, text in batch:
+            State._write(name, text)
+
+
+atexit.register(State.flush)
 
 
 def clamp(value: float, minimum: float, maximum: float) -> float:
@@ -1254,6 +1507,7 @@ class _MockNetwork:
 # -----------------------------------------------------------------------------
 
 # Store reference to real urllib.request before we create mocks
+import urllib.error as _real_urllib_error
 import urllib.request as _real_urllib_request
 
 class _MockUrequestResponse:
@@ -1261,7 +1515,10 @@ class _MockUrequestResponse:
     
     def __init__(self, real_response):
         self._response = real_response
+        self.status = real_response.status
         self.status_code = real_response.status
+        headers = getattr(real_response, "headers", None)
+        self.headers = {k.lower(): v for k, v in headers.items()} if headers else {}
     
     def read(self, size=-1):
         """Read response data."""
@@ -1286,21 +1543,161 @@ class _MockUrequestResponse:
         self.close()
 
 
+class _RecordedBody(BytesIO):
+    """In-memory response body captured while recording fixtures."""
+
+    def __init__(self, body: bytes, status: int):
+        super().__init__(body)
+        self.status = status
+
+
+class NetFixtures:
+    """Record/replay store for HTTP responses (see --net).
+
+    Each request is keyed on its method, URL and body. A fixture is a pair of
+    files in the fixture directory: `<key>.json` (url, status, content type)
+    and `<key>.body` (raw response bytes). In replay mode a local HTTP server
+    serves the fixtures with optional latency, bandwidth cap and random
+    failures so apps see badge-like WiFi without touching the internet.
+    """
+
+    def __init__(self, mode: str, root: str, latency_ms: int = 0,
+                 bandwidth_kbps: float = 0, fail_rate: float = 0.0,
+                 timeout: float = 15.0):
+        self.mode = mode
+        self.root = root
+        self.latency_ms = max(0, latency_ms)
+        self.bandwidth_kbps = max(0.0, bandwidth_kbps)
+        self.fail_rate = min(1.0, max(0.0, fail_rate))
+        self.timeout = timeout
+        self._port = None
+
+    @staticmethod
+    def key(url: str, data=None) -> str:
+        import hashlib
+        digest = hashlib.sha1()
+        digest.update(b"POST " if data is not None else b"GET ")
+        digest.update(url.encode("utf-8"))
+        if data is not None:
+            digest.update(b"\n")
+            digest.update(data if isinstance(data, bytes) else str(data).encode("utf-8"))
+        return digest.hexdigest()[:16]
+
+    def _paths(self, key: str):
+        base = os.path.join(self.root, key)
+        return base + ".json", base + ".body"
+
+    def save(self, url: str, data, status: int, content_type: str, body: bytes) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        meta_path, body_path = self._paths(self.key(url, data))
+        with open(body_path, "wb") as fh:
+            fh.write(body)
+        with open(meta_path, "w", encoding="utf-8") as fh:
+            json.dump({"url": url, "status": status, "content_type": content_type}, fh, indent=2)
+        print(f"[Simulator] Recorded {status} {url} ({len(body)} bytes)")
+
+    def lookup(self, key: str):
+        meta_path, body_path = self._paths(key)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as fh:
+                meta = json.load(fh)
+            with open(body_path, "rb") as fh:
+                return meta, fh.read()
+        except FileNotFoundError:
+            return None
+
+    def replay_url(self, url: str, data=None) -> str:
+        if self._port is None:
+            self._port = self._start_server()
+        return f"http://127.0.0.1:{self._port}/{self.key(url, data)}"
+
+    def _start_server(self) -> int:
+        import random
+        import time
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        fixtures = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _serve(self):
+                found = fixtures.lookup(self.path.lstrip("/"))
+                if fixtures.latency_ms:
+                    time.sleep(fixtures.latency_ms / 1000.0)
+                if found is None:
+                    self.send_error(404, "No fixture recorded (run with --net record)")
+                    return
+                meta, body = found
+                failing = random.random() < fixtures.fail_rate
+                if failing and random.random() < 0.5:
+                    self.send_error(503, "Injected failure")
+                    return
+                self.send_response(meta.get("status", 200))
+                self.send_header("Content-Type", meta.get("content_type") or "application/octet-stream")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                # An injected failure past this point drops the link mid-body.
+                cutoff = random.randint(0, len(body)) if failing else len(body)
+                chunk = 512
+                for start in range(0, cutoff, chunk):
+                    piece = body[start:min(start + chunk, cutoff)]
+                    self.wfile.write(piece)
+                    if fixtures.bandwidth_kbps:
+                        time.sleep(len(piece) / (fixtures.bandwidth_kbps * 1024.0))
+                if failing:
+                    self.close_connection = True
+
+            do_GET = _serve
+            do_POST = _serve
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        port = server.server_address[1]
+        print(f"[Simulator] Replaying HTTP fixtures from {self.root} on port {port}")
+        return port
+
+
+# Record/replay configuration, set from --net in main()
+_net_fixtures = None
+
+
 class _MockUrequest:
     """Mock urllib.urequest module for MicroPython compatibility."""
     
     @staticmethod
     def urlopen(url, data=None, headers=None):
         """Open a URL and return a response object."""
+        fixtures = _net_fixtures
+        target = url
+        if fixtures is not None and fixtures.mode == "replay":
+            target = fixtures.replay_url(url, data)
+        timeout = fixtures.timeout if fixtures is not None else None
+
         # Use the real urllib.request we saved earlier
         if headers:
-            req = _real_urllib_request.Request(url, data=data, headers=headers)
+            req = _real_urllib_request.Request(target, data=data, headers=headers)
         else:
-            req = _real_urllib_request.Request(url, data=data)
+            req = _real_urllib_request.Request(target, data=data)
         
         try:
-            response = _real_urllib_request.urlopen(req)
+            response = _real_urllib_request.urlopen(req, timeout=timeout)
+            if fixtures is not None and fixtures.mode == "record":
+                body = response.read()
+                fixtures.save(url, data, response.status, response.headers.get("Content-Type"), body)
+                response.close()
+                response = _RecordedBody(body, response.status)
             return _MockUrequestResponse(response)
+        except _real_urllib_error.HTTPError as e:
+            if e.code == 304:
+                # like MicroPython's urequest, hand back "Not Modified" as a response
+                return _MockUrequestResponse(e)
+            if fixtures is not None and fixtures.mode == "record":
+                fixtures.save(url, data, e.code, e.headers.get("Content-Type"), e.read())
+            print(f"[Simulator] HTTP Error: {e}")
+            raise
         except Exception as e:
             print(f"[Simulator] HTTP Error: {e}")
             raise
@@ -1352,6 +1749,10 @@ def run(update_func, fps: int = 60, init=None, on_exit=None):
                 break
             
             result = update_func()
+            # give background tasks (badgeware.tasks) their slice, if the app uses them
+            tasks = sys.modules.get("badgeware.tasks")
+            if tasks is not None:
+                tasks.step()
             screen.present()
             clock.tick(fps)
             
@@ -1367,10 +1768,43 @@ def run(update_func, fps: int = 60, init=None, on_exit=None):
                 on_exit()
             except Exception:
                 traceback.print_exc()
+        tasks = sys.modules.get("badgeware.tasks")
+        if tasks is not None:
+            tasks.cancel_all()
+        # idle keep-alive streams belong to this run's task loop
+        net = sys.modules.get("badgeware.net")
+        if net is not None:
+            net.close_all()
+        # as on the badge, resident extensions drop what they held for the app
+        prefetch = sys.modules.get("badgeware.prefetch")
+        if prefetch is not None:
+            prefetch.close_all()
+        text = sys.modules.get("badgeware.text")
+        if text is not None:
+            text.clear()
+        State.flush()
         # Clean up __pycache__ directory
         _cleanup_pycache()
     return result
 
+def _boot_module():
+    """badgeware.boot for --boot, importable before any app has been loaded."""
+    if "badgeware" not in sys.modules:
+        badgeware = ModuleType("badgeware")
+        badgeware.State = State
+        badgeware.file_exists = file_exists
+        badgeware.__path__ = [os.path.join(SIM_ROOT, "lib", "badgeware")]
+        sys.modules["badgeware"] = badgeware
+    return importlib.import_module("badgeware.boot")
+
+
+def _boot_phase(app_name: str) -> str:
+    if app_name == "startup":
+        return "cinematic"
+    if app_name == "menu":
+        return "menu"
+    return "app"
+
 # -----------------------------------------------------------------------------
 # Module loader
 # -----------------------------------------------------------------------------
@@ -1417,6 +1851,9 @@ def load_game_module(module_path: str) -> ModuleType:
     badgeware.display = display
     badgeware.State = State
     badgeware.clamp = clamp
+    # Pure-Python extensions (badgeware.net, ...) ship in /system/lib/badgeware
+    # and are shared with the badge, where main.py sets the same __path__.
+    badgeware.__path__ = [os.path.join(sim_root, "lib", "badgeware")]
     sys.modules["badgeware"] = badgeware
     
     # Set global reference for mock network timing
@@ -1447,6 +1884,15 @@ def load_game_module(module_path: str) -> ModuleType:
     
     # Also provide a top-level urequest for direct imports
     sys.modules["urequest"] = urequest_module
+
+    # Record/replay only sees urlopen traffic, so keep badgeware.net off raw sockets
+    if _net_fixtures is not None and _net_fixtures.mode != "live":
+        importlib.import_module("badgeware.net").KEEP_ALIVE = False
+
+    # Keep the HTTP cache next to the other badge root files instead of /cache
+    import tempfile
+    importlib.import_module("badgeware.httpcache").CACHE_DIR = os.path.join(
+        tempfile.gettempdir(), "badge_simulator_root", "cache")
     
     # Provide mock `urandom` module for MicroPython compatibility
     # Uses Python's standard random module
@@ -1764,7 +2210,7 @@ class PerformanceMonitor:
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Run a GitHub Badge game locally using Pygame.")
-    parser.add_argument("game", help="Path to the game .py, directory containing __init__.py, or a dotted module name.")
+    parser.add_argument("game", nargs="?", help="Path to the game .py, directory containing __init__.py, or a dotted module name.")
     parser.add_argument("--scale", type=int, default=4, help="Scale factor (default: 4)")
     parser.add_argument(
         "-C",
@@ -1789,7 +2235,69 @@ def main() -> None:
         action="store_true",
         help="Show live performance metrics (CPU and memory usage) in terminal.",
     )
+    parser.add_argument(
+        "--boot",
+        action="store_true",
+        help="Boot like the badge's main.py (startup cinematic or fast boot, then the menu) and log phase timings.",
+    )
+    parser.add_argument(
+        "--net",
+        choices=("live", "record", "replay"),
+        default="live",
+        help="HTTP mode: live internet (default), record responses to fixtures, or replay them offline.",
+    )
+    parser.add_argument(
+        "--net-fixtures",
+        dest="net_fixtures",
+        metavar="DIR",
+        default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "net"),
+        help="Directory for recorded HTTP fixtures (default: simulator/fixtures/net).",
+    )
+    parser.add_argument(
+        "--net-latency",
+        dest="net_latency",
+        type=int,
+        default=0,
+        metavar="MS",
+        help="Replay: delay before each response starts, in milliseconds.",
+    )
+    parser.add_argument(
+        "--net-bandwidth",
+        dest="net_bandwidth",
+        type=float,
+        default=0,
+        metavar="KBPS",
+        help="Replay: cap response bodies to this many kilobytes per second.",
+    )
+    parser.add_argument(
+        "--net-fail",
+        dest="net_fail",
+        type=float,
+        default=0.0,
+        metavar="RATE",
+        help="Replay: fraction of requests (0-1) that fail with a 503 or a dropped connection.",
+    )
+    parser.add_argument(
+        "--net-timeout",
+        dest="net_timeout",
+        type=float,
+        default=15.0,
+        metavar="SECONDS",
+        help="Socket timeout for simulated HTTP requests (default: 15).",
+    )
     args = parser.parse_args()
+    if args.game is None and not args.boot:
+        parser.error("a game is required unless --boot is given")
+    
+    global _net_fixtures
+    _net_fixtures = NetFixtures(
+        args.net,
+        os.path.abspath(args.net_fixtures),
+        latency_ms=args.net_latency,
+        bandwidth_kbps=args.net_bandwidth,
+        fail_rate=args.net_fail,
+        timeout=args.net_timeout,
+    )
     
     # Clean temporary files if requested
     if args.clean:
@@ -1844,8 +2352,22 @@ def main() -> None:
     if _perf_monitor:
         print("[Simulator] Memory profiler enabled - tracking memory growth (baseline set after app loads)")
     
-    # Main app loop - allows apps to launch other apps
-    current_app = args.game
+    # --boot follows main.py: cinematic (or the fast-boot app), then the menu
+    boot = None
+    boot_phase = None
+    if args.boot:
+        boot = _boot_module()
+        boot.start()
+        boot.mark("main")
+        boot.load_settings()
+        restore = boot.last_app()
+        if restore is not None:
+            current_app = map_system_path(restore)
+        else:
+            current_app = os.path.join(SIM_ROOT, "apps", "startup")
+    else:
+        # Main app loop - allows apps to launch other apps
+        current_app = args.game
     
     while True:
         # If current_app is a directory, append __init__.py
@@ -1894,7 +2416,22 @@ def main() -> None:
         try:
             init_func = getattr(module, "init", None)
             exit_func = getattr(module, "on_exit", None)
-            result = run(module.update, init=init_func, on_exit=exit_func)
+            update_func = module.update
+            if boot is not None:
+                boot_phase = _boot_phase(app_name)
+                if boot_phase == "app":
+                    boot.remember_app(f"/system/apps/{app_name}")
+                elif boot_phase == "menu":
+                    boot.remember_app(None)
+                if boot_phase != "cinematic":
+                    boot.mark(f"{boot_phase}_import")
+                    if not boot.done():
+                        update_func = boot.first_frame(update_func, f"{boot_phase}_frame")
+            result = run(update_func, init=init_func, on_exit=exit_func)
+            if boot_phase == "cinematic" and result is not None and result != "__RETURN_TO_MENU__":
+                # the cinematic finished: carry on to the menu like main.py
+                boot.mark("cinematic")
+                result = "__RETURN_TO_MENU__"
             
             # Check if user pressed Home button to return to menu
             if result == "__RETURN_TO_MENU__":
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""Bake PNG assets into the badge's raw image format.
+
+Image.load() on a PNG opens the file, inflates it and unfilters every row,
+which at 200 MHz is a visible part of an app's start-up and briefly needs
+the compressed and the decoded image in RAM together. A baked image is the
+decoded pixels behind a 16 byte header, ready to be read with a single
+readinto():
+
+    header   "<4sBBHHHI": b"BIMG", version, format, width, height,
+             palette entries, CRC-32 of the source PNG
+    palette  entries x RGBA8888 (palettized formats only)
+    pixels   rows top to bottom, each padded to a whole byte:
+               rgb565    16-bit little endian RRRRRGGGGGGBBBBB
+               rgba4444  16-bit little endian RRRRGGGGBBBBAAAA
+               p8        one palette index per pixel
+               p4        two per byte, left pixel in the high nibble
+
+By default each image gets the smallest lossless format, p4 for up to 16
+colours or p8 for up to 256, and images with more colours are left as
+PNGs; --lossy bakes those as rgba4444 (if anything is transparent) or
+rgb565, rounding the colours. The .bimg is written next to the PNG,
+which stays the source of truth, and the simulator ignores a baked file
+whose CRC no longer matches its PNG. The badge's firmware only loads
+PNGs, so baked files are a simulator-side cache: they're git-ignored and
+not copied to the badge.
+
+    python3 tools/bake_assets.py                      # apps' assets/, mona-sprites
+    python3 tools/bake_assets.py badge/apps/quest/assets/splash.png
+    python3 tools/bake_assets.py --check              # list stale bakes
+"""
+
+import argparse
+import glob
+import os
+import struct
+import sys
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import pngio  # noqa: E402
+
+# Keep in sync with badge/lib/badgeware/assets.py
+MAGIC = b"BIMG"
+VERSION = 1
+HEADER = "<4sBBHHHI"   # magic, version, format, width, height, palette entries, source CRC
+RGB565, RGBA4444, P8, P4 = 0, 1, 2, 3
+FORMATS = {"rgb565": RGB565, "rgba4444": RGBA4444, "p8": P8, "p4": P4}
+EXTENSION = ".bimg"
+
+
+def baked_path(path):
+    return os.path.splitext(path)[0] + EXTENSION
+
+
+def source_crc(path):
+    with open(path, "rb") as f:
+        return zlib.crc32(f.read()) & 0xFFFFFFFF
+
+
+def palette_of(image):
+    """The image's colours in first-seen order, or None if there are over 256."""
+    colours = {}
+    pixels = image.pixels
+    for i in range(0, len(pixels), 4):
+        colour = bytes(pixels[i:i + 4])
+        if colour not in colours:
+            if len(colours) == 256:
+                return None
+            colours[colour] = len(colours)
+    return colours
+
+
+def choose_format(image, colours, lossy=False):
+    if colours is not None:
+        return P4 if len(colours) <= 16 else P8
+    if not lossy:
+        raise ValueError("over 256 colours; bake with --lossy or --format to round them")
+    if any(image.pixels[i] != 255 for i in range(3, len(image.pixels), 4)):
+        return RGBA4444
+    return RGB565
+
+
+def encode(image, fmt, colours):
+    """(palette bytes, pixel bytes) for `image` in format `fmt`."""
+    pixels = image.pixels
+    width, height = image.width, image.height
+    if fmt in (P8, P4):
+        if colours is None or (fmt == P4 and len(colours) > 16):
+            raise ValueError("too many colours for {}".format("p4" if fmt == P4 else "p8"))
+        palette = b"".join(colours)
+        indexes = [colours[bytes(pixels[i:i + 4])] for i in range(0, len(pixels), 4)]
+        if fmt == P8:
+            return palette, bytes(indexes)
+        out = bytearray()
+        for y in range(height):
+            row = indexes[y * width:(y + 1) * width]
+            if width % 2:
+                row.append(0)
+            for x in range(0, len(row), 2):
+                out.append(row[x] << 4 | row[x + 1])
+        return palette, bytes(out)
+
+    out = bytearray(width * height * 2)
+    for i in range(width * height):
+        r, g, b, a = pixels[i * 4:i * 4 + 4]
+        if fmt == RGB565:
+            value = (r >> 3) << 11 | (g >> 2) << 5 | b >> 3
+        else:
+            value = (r >> 4) << 12 | (g >> 4) << 8 | (b >> 4) << 4 | a >> 4
+        out[i * 2] = value & 0xFF
+        out[i * 2 + 1] = value >> 8
+    return b"", bytes(out)
+
+
+def bake(path, fmt=None, lossy=False):
+    image = pngio.read(path)
+    colours = palette_of(image)
+    if fmt is None:
+        fmt = choose_format(image, colours, lossy)
+    palette, data = encode(image, fmt, colours)
+    entries = len(palette) // 4
+    out = baked_path(path)
+    with open(out, "wb") as f:
+        f.write(struct.pack(HEADER, MAGIC, VERSION, fmt, image.width, image.height, entries, source_crc(path)))
+        f.write(palette)
+        f.write(data)
+    name = next(k for k, v in FORMATS.items() if v == fmt)
+    print(f"  {os.path.relpath(path)}: {image.width}x{image.height} {name}, "
+          f"{os.path.getsize(path)} -> {os.path.getsize(out)} bytes "
+          f"(decoded RGBA {image.width * image.height * 4})")
+
+
+def is_stale(path):
+    """True if `path` has a baked file that no longer matches it."""
+    baked = baked_path(path)
+    if not os.path.isfile(baked):
+        return False
+    with open(baked, "rb") as f:
+        header = f.read(struct.calcsize(HEADER))
+    try:
+        magic, version, _, _, _, _, crc = struct.unpack(HEADER, header)
+    except struct.error:
+        return True
+    return magic != MAGIC or version != VERSION or crc != source_crc(path)
+
+
+def default_targets(root):
+    return sorted(glob.glob(os.path.join(root, "apps", "*", "assets"))) + [os.path.join(root, "assets", "mona-sprites")]
+
+
+def main():
+    root = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "badge")
+    parser = argparse.ArgumentParser(description="Bake PNG assets into badgeware's raw image format.")
+    parser.add_argument("paths", nargs="*",
+                        help="PNG files or directories of them (default: every badge/apps/*/assets and badge/assets/mona-sprites)")
+    parser.add_argument("--format", choices=sorted(FORMATS),
+                        help="Force a format instead of the smallest lossless one")
+    parser.add_argument("--lossy", action="store_true",
+                        help="Bake images with over 256 colours as rgb565/rgba4444 instead of skipping them")
+    parser.add_argument("--check", action="store_true",
+                        help="Only list PNGs edited since they were baked")
+    args = parser.parse_args()
+
+    pngs = []
+    for target in args.paths or default_targets(os.path.abspath(root)):
+        if os.path.isdir(target):
+            pngs += sorted(glob.glob(os.path.join(target, "*.png")))
+        else:
+            pngs.append(target)
+
+    if args.check:
+        stale = [path for path in pngs if is_stale(path)]
+        for path in stale:
+            print(f"  stale: {os.path.relpath(path)}")
+        print(f"{len(stale)} stale baked images")
+        sys.exit(1 if stale else 0)
+
+    fmt = FORMATS[args.format] if args.format else None
+    baked = 0
+    for path in pngs:
+        try:
+            bake(path, fmt, args.lossy)
+            baked += 1
+        except (OSError, ValueError) as e:
+            print(f"  skipping {path}: {e}")
+    print(f"baked {baked} of {len(pngs)} images")
+
+
+if __name__ == "__main__":
+    main()
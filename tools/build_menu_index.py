@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Build the menu's app index and icon atlas.
+
+Writes badge/apps/menu/apps.index (the installed apps and where each
+icon lives) and badge/apps/menu/icons.png (every 24x24 icon.png packed
+into one strip, the default icon first) so the menu starts with one file
+read and one image decode instead of probing every app directory.
+
+Run it after adding an app or changing an icon:
+
+    python3 tools/build_menu_index.py
+
+Icons of other sizes are left out of the atlas and loaded on their own.
+The badge also rebuilds the app list by itself when /system/apps changes,
+but only icons packed here come from the atlas.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import pngio  # noqa: E402
+
+ICON_SIZE = 24
+HIDDEN = ("menu", "startup")
+
+
+def build(root):
+    apps_dir = os.path.join(root, "apps")
+    menu_dir = os.path.join(apps_dir, "menu")
+
+    cells = []  # PNGs packed into the atlas, in slot order
+
+    def pack(path):
+        try:
+            image = pngio.read(path)
+        except (OSError, ValueError) as e:
+            print(f"  skipping {path}: {e}")
+            return None
+        if (image.width, image.height) != (ICON_SIZE, ICON_SIZE):
+            return None
+        cells.append(image)
+        return len(cells) - 1
+
+    default = pack(os.path.join(menu_dir, "default_icon.png"))
+    if default is None:
+        default = "/system/apps/menu/default_icon.png"
+
+    apps = []
+    for entry in sorted(os.listdir(apps_dir)):
+        path = os.path.join(apps_dir, entry)
+        if entry in HIDDEN or not os.path.isfile(os.path.join(path, "__init__.py")):
+            continue
+        icon_path = os.path.join(path, "icon.png")
+        if os.path.isfile(icon_path):
+            icon = pack(icon_path)
+            if icon is None:
+                icon = f"/system/apps/{entry}/icon.png"
+        else:
+            icon = default
+        apps.append({"name": entry, "path": entry, "icon": icon})
+
+    atlas = pngio.PNG(ICON_SIZE * len(cells), ICON_SIZE, bytearray(ICON_SIZE * ICON_SIZE * 4 * len(cells)))
+    stride = atlas.width * 4
+    for slot, cell in enumerate(cells):
+        for y in range(ICON_SIZE):
+            start = y * stride + slot * ICON_SIZE * 4
+            atlas.pixels[start:start + ICON_SIZE * 4] = cell.row(y)
+    if cells:
+        pngio.write(os.path.join(menu_dir, "icons.png"), atlas)
+
+    index = {
+        "key": None,  # the badge keys its own copy on the apps it finds
+        "atlas": "/system/apps/menu/icons.png" if cells else None,
+        "slots": len(cells),
+        "default": default,
+        "apps": apps,
+    }
+    with open(os.path.join(menu_dir, "apps.index"), "w") as f:
+        json.dump(index, f, indent=1)
+        f.write("\n")
+
+    packed = sum(1 for app in apps if isinstance(app["icon"], int))
+    print(f"{len(apps)} apps, {packed} icons in the atlas ({len(cells)} slots)")
+
+
+def main():
+    default_root = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "badge")
+    parser = argparse.ArgumentParser(description="Build the badge menu's app index and icon atlas.")
+    parser.add_argument("--root", default=default_root, help="Badge /system directory (default: badge/)")
+    args = parser.parse_args()
+    build(os.path.abspath(args.root))
+
+
+if __name__ == "__main__":
+    main()
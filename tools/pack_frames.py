@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""Pack a directory of animation frames for badgeware's FrameSequence.
+
+Apps used to Image.load() one full PNG per frame, which costs a file open
+and an inflate of the whole frame every time, even for frames that only
+differ from the last one in a small area (or not at all). This writes an
+index next to the frames that marks every frame as one of:
+
+  key     the frame's own PNG (first frame, every --key-interval frames,
+          and frames that changed over --key-ratio of their area)
+  delta   a PNG of just the rectangle that changed since the previous
+          frame, written as delta_NNNN.png and drawn over it at (x, y)
+  repeat  identical to the previous frame: nothing to load
+
+    python3 tools/pack_frames.py badge/apps/copilot-loop/frames
+
+The original frames stay where they are (the key frames still use them),
+so rerun this after editing any of them. Frames must be opaque: deltas
+are blitted over the previous frame. Deltas stay separate PNG files
+because the firmware's Image.load() only takes a path to a PNG.
+
+Only animations with some still background gain anything: the startup
+intro changes over its whole area on every frame, packs as nothing but
+key frames, and so isn't packed.
+"""
+
+import argparse
+import fnmatch
+import os
+import struct
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import pngio  # noqa: E402
+
+# Keep in sync with badge/lib/badgeware/frames.py
+MAGIC = b"FSEQ"
+VERSION = 1
+HEADER = "<4sBBHHH"    # magic, version, flags, width, height, frame count
+ENTRY = "<BxhhH"       # kind, x, y, name index
+KEY, DELTA, REPEAT = 0, 1, 2
+NO_NAME = 0xFFFF
+
+INDEX_NAME = "index.seq"
+
+
+def changed_rect(frame, prev):
+    """Bounding box (x, y, w, h) of the pixels that differ, or None."""
+    x0 = y0 = None
+    x1 = y1 = -1
+    stride = frame.width * 4
+    for y in range(frame.height):
+        row = frame.pixels[y * stride:(y + 1) * stride]
+        old = prev.pixels[y * stride:(y + 1) * stride]
+        if row == old:
+            continue
+        left = next(x for x in range(frame.width) if row[x * 4:x * 4 + 4] != old[x * 4:x * 4 + 4])
+        right = next(x for x in range(frame.width - 1, -1, -1) if row[x * 4:x * 4 + 4] != old[x * 4:x * 4 + 4])
+        x0 = left if x0 is None else min(x0, left)
+        x1 = max(x1, right)
+        if y0 is None:
+            y0 = y
+        y1 = y
+    if x0 is None:
+        return None
+    return x0, y0, x1 - x0 + 1, y1 - y0 + 1
+
+
+def crop(frame, x, y, w, h):
+    out = pngio.PNG(w, h, bytearray(w * h * 4))
+    for row in range(h):
+        start = ((y + row) * frame.width + x) * 4
+        out.pixels[row * w * 4:(row + 1) * w * 4] = frame.pixels[start:start + w * 4]
+    return out
+
+
+def pack(directory, pattern="*.png", key_interval=12, key_ratio=0.6):
+    names = sorted(n for n in os.listdir(directory)
+                   if fnmatch.fnmatch(n, pattern) and not n.startswith("delta_"))
+    if not names:
+        raise SystemExit(f"no frames matching {pattern} in {directory}")
+
+    # drop deltas left over from an earlier pack
+    for name in os.listdir(directory):
+        if name.startswith("delta_") and name.endswith(".png"):
+            os.remove(os.path.join(directory, name))
+
+    entries = []
+    files = []
+    prev = None
+    width = height = None
+    counts = {KEY: 0, DELTA: 0, REPEAT: 0}
+    for i, name in enumerate(names):
+        frame = pngio.read(os.path.join(directory, name))
+        if width is None:
+            width, height = frame.width, frame.height
+        elif (frame.width, frame.height) != (width, height):
+            raise SystemExit(f"{name} is {frame.width}x{frame.height}, expected {width}x{height}")
+        if any(frame.pixels[a] != 255 for a in range(3, len(frame.pixels), 4)):
+            raise SystemExit(f"{name} has transparent pixels; frames must be opaque")
+
+        kind, x, y, file = KEY, 0, 0, name
+        if prev is not None and i % key_interval:
+            rect = changed_rect(frame, prev)
+            if rect is None:
+                kind, file = REPEAT, None
+            elif rect[2] * rect[3] <= key_ratio * width * height:
+                kind, (x, y) = DELTA, rect[:2]
+                file = f"delta_{i:04d}.png"
+                pngio.write(os.path.join(directory, file), crop(frame, *rect))
+        if file is None:
+            index = NO_NAME
+        else:
+            index = len(files)
+            files.append(file)
+        entries.append((kind, x, y, index))
+        counts[kind] += 1
+        prev = frame
+
+    with open(os.path.join(directory, INDEX_NAME), "wb") as f:
+        f.write(struct.pack(HEADER, MAGIC, VERSION, 0, width, height, len(entries)))
+        for entry in entries:
+            f.write(struct.pack(ENTRY, *entry))
+        for file in files:
+            encoded = file.encode()
+            f.write(struct.pack("<B", len(encoded)) + encoded)
+
+    print(f"{directory}: {len(entries)} frames, {counts[KEY]} key, "
+          f"{counts[DELTA]} delta, {counts[REPEAT]} repeat")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack animation frames for badgeware.frames.FrameSequence.")
+    parser.add_argument("directory", help="Directory of frame PNGs (played in name order)")
+    parser.add_argument("--pattern", default="*.png", help="Frame file pattern (default: *.png)")
+    parser.add_argument("--key-interval", type=int, default=12,
+                        help="Force a key frame this often, bounding the cost of seeking (default: 12)")
+    parser.add_argument("--key-ratio", type=float, default=0.6,
+                        help="Store a frame whole when more than this fraction of it changed (default: 0.6)")
+    args = parser.parse_args()
+    pack(args.directory, args.pattern, args.key_interval, args.key_ratio)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""Minimal PNG reading and writing for the asset build tools.
+
+Only what the badge's assets use: non-interlaced images with 8-bit
+grayscale, RGB, RGBA or gray+alpha pixels, and 1/2/4/8-bit palettes (with
+tRNS transparency). Pixels are returned as a flat RGBA bytearray so the
+tools don't need Pillow or pygame.
+"""
+
+import struct
+import zlib
+
+SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# bytes per pixel of the unfiltered scanline data, by colour type (8-bit)
+_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+
+class PNG:
+    def __init__(self, width, height, pixels):
+        self.width = width
+        self.height = height
+        self.pixels = pixels  # RGBA, row major
+
+    def pixel(self, x, y):
+        i = (y * self.width + x) * 4
+        return tuple(self.pixels[i:i + 4])
+
+    def row(self, y):
+        return self.pixels[y * self.width * 4:(y + 1) * self.width * 4]
+
+
+def _chunks(data):
+    if data[:8] != SIGNATURE:
+        raise ValueError("not a PNG file")
+    pos = 8
+    while pos < len(data):
+        length, kind = struct.unpack(">I4s", data[pos:pos + 8])
+        yield kind, data[pos + 8:pos + 8 + length]
+        pos += 12 + length
+
+
+def _paeth(a, b, c):
+    p = a + b - c
+    pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+    if pa <= pb and pa <= pc:
+        return a
+    return b if pb <= pc else c
+
+
+def _unfilter(raw, stride, bpp, height):
+    rows = []
+    prev = bytearray(stride)
+    pos = 0
+    for _ in range(height):
+        kind = raw[pos]
+        line = bytearray(raw[pos + 1:pos + 1 + stride])
+        pos += 1 + stride
+        if kind == 1:
+            for i in range(bpp, stride):
+                line[i] = (line[i] + line[i - bpp]) & 0xFF
+        elif kind == 2:
+            for i in range(stride):
+                line[i] = (line[i] + prev[i]) & 0xFF
+        elif kind == 3:
+            for i in range(stride):
+                left = line[i - bpp] if i >= bpp else 0
+                line[i] = (line[i] + ((left + prev[i]) >> 1)) & 0xFF
+        elif kind == 4:
+            for i in range(stride):
+                left = line[i - bpp] if i >= bpp else 0
+                up_left = prev[i - bpp] if i >= bpp else 0
+                line[i] = (line[i] + _paeth(left, prev[i], up_left)) & 0xFF
+        elif kind != 0:
+            raise ValueError("bad PNG filter type {}".format(kind))
+        rows.append(line)
+        prev = line
+    return rows
+
+
+def read(path):
+    """Load a PNG file as a PNG object with RGBA pixels."""
+    with open(path, "rb") as f:
+        data = f.read()
+
+    header = None
+    palette = b""
+    alpha = b""
+    compressed = bytearray()
+    for kind, body in _chunks(data):
+        if kind == b"IHDR":
+            header = struct.unpack(">IIBBBBB", body)
+        elif kind == b"PLTE":
+            palette = body
+        elif kind == b"tRNS":
+            alpha = body
+        elif kind == b"IDAT":
+            compressed.extend(body)
+        elif kind == b"IEND":
+            break
+    if header is None:
+        raise ValueError("{}: missing IHDR".format(path))
+
+    width, height, depth, colour, _, _, interlace = header
+    if interlace:
+        raise ValueError("{}: interlaced PNGs are not supported".format(path))
+    if colour not in _CHANNELS or (depth != 8 and colour != 3):
+        raise ValueError("{}: unsupported PNG format ({}-bit, type {})".format(path, depth, colour))
+
+    channels = _CHANNELS[colour]
+    stride = (width * channels * depth + 7) // 8
+    rows = _unfilter(zlib.decompress(bytes(compressed)), stride, max(1, channels * depth // 8), height)
+
+    pixels = bytearray(width * height * 4)
+    out = 0
+    for line in rows:
+        if colour == 3:
+            per_byte = 8 // depth
+            mask = (1 << depth) - 1
+            for x in range(width):
+                shift = 8 - depth * (x % per_byte + 1)
+                index = (line[x // per_byte] >> shift) & mask
+                pixels[out:out + 3] = palette[index * 3:index * 3 + 3]
+                pixels[out + 3] = alpha[index] if index < len(alpha) else 255
+                out += 4
+            continue
+        for x in range(width):
+            p = line[x * channels:(x + 1) * channels]
+            if colour == 0:
+                pixels[out:out + 4] = bytes((p[0], p[0], p[0], 255))
+            elif colour == 2:
+                pixels[out:out + 4] = bytes((p[0], p[1], p[2], 255))
+            elif colour == 4:
+                pixels[out:out + 4] = bytes((p[0], p[0], p[0], p[1]))
+            else:
+                pixels[out:out + 4] = p
+            out += 4
+    return PNG(width, height, pixels)
+
+
+def _chunk(kind, body):
+    return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body) & 0xFFFFFFFF)
+
+
+def _filter_rows(rows, bpp):
+    """Filter each scanline with whichever PNG filter leaves the smallest residue."""
+    out = bytearray()
+    prev = bytes(len(rows[0])) if rows else b""
+    for line in rows:
+        stride = len(line)
+        candidates = [(0, bytes(line))]
+        sub = bytearray(stride)
+        up = bytearray(stride)
+        paeth = bytearray(stride)
+        for i in range(stride):
+            left = line[i - bpp] if i >= bpp else 0
+            up_left = prev[i - bpp] if i >= bpp else 0
+            sub[i] = (line[i] - left) & 0xFF
+            up[i] = (line[i] - prev[i]) & 0xFF
+            paeth[i] = (line[i] - _paeth(left, prev[i], up_left)) & 0xFF
+        candidates += [(1, sub), (2, up), (4, paeth)]
+        # smallest sum of residues as signed bytes is the usual heuristic
+        kind, data = min(candidates, key=lambda c: sum(b if b < 128 else 256 - b for b in c[1]))
+        out.append(kind)
+        out.extend(data)
+        prev = line
+    return out
+
+
+def write(path, image):
+    """Save a PNG object: palettized if it has at most 256 colours, else RGB(A)."""
+    pixels = image.pixels
+    colours = {}
+    for i in range(0, len(pixels), 4):
+        colour = bytes(pixels[i:i + 4])
+        if colour not in colours:
+            if len(colours) == 256:
+                colours = None
+                break
+            colours[colour] = len(colours)
+
+    chunks = []
+    if colours is not None:
+        header = struct.pack(">IIBBBBB", image.width, image.height, 8, 3, 0, 0, 0)
+        palette = b"".join(colour[:3] for colour in colours)
+        alpha = bytes(colour[3] for colour in colours).rstrip(b"\xff")
+        indexes = bytes(colours[bytes(pixels[i:i + 4])] for i in range(0, len(pixels), 4))
+        rows = [indexes[y * image.width:(y + 1) * image.width] for y in range(image.height)]
+        raw = _filter_rows(rows, 1)
+        chunks.append((b"PLTE", palette))
+        if alpha:
+            chunks.append((b"tRNS", alpha))
+    elif all(pixels[i] == 255 for i in range(3, len(pixels), 4)):
+        # opaque: drop the alpha channel
+        header = struct.pack(">IIBBBBB", image.width, image.height, 8, 2, 0, 0, 0)
+        rgb = bytearray(len(pixels) // 4 * 3)
+        for channel in range(3):
+            rgb[channel::3] = pixels[channel::4]
+        stride = image.width * 3
+        rows = [bytes(rgb[y * stride:(y + 1) * stride]) for y in range(image.height)]
+        raw = _filter_rows(rows, 3)
+    else:
+        header = struct.pack(">IIBBBBB", image.width, image.height, 8, 6, 0, 0, 0)
+        stride = image.width * 4
+        rows = [bytes(pixels[y * stride:(y + 1) * stride]) for y in range(image.height)]
+        raw = _filter_rows(rows, 4)
+
+    with open(path, "wb") as f:
+        f.write(SIGNATURE)
+        f.write(_chunk(b"IHDR", header))
+        for kind, body in chunks:
+            f.write(_chunk(kind, body))
+        f.write(_chunk(b"IDAT", zlib.compress(bytes(raw), 9)))
+        f.write(_chunk(b"IEND", b""))